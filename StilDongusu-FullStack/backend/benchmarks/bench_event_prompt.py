@@ -0,0 +1,86 @@
+"""Etkinlik stilisti prompt'unun boyutunu ve hazırlama süresini eski/yeni yöntemle karşılaştırır.
+
+Eski yöntem tüm giyim ürünlerini bütün alanlarıyla json.dumps ile prompt'a döker; yeni yöntem
+aday seçimi + önbellekli kompakt projeksiyon kullanır. Token sayısı varsayılan olarak ~4 karakter/token
+ile tahmin edilir; --count-tokens verilirse (GEMINI_API_KEY gerekir) Gemini'nin count_tokens'ı kullanılır.
+Uçtan uca süre, ölçülen hazırlama süresine --ms-per-1k-tokens ile modellenen girdi işleme süresi eklenerek hesaplanır.
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_event_prompt.py --sizes 10 1000 10000 100000
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.product_catalog import ProductCatalog
+from services import stylist_retrieval
+from services.gemini_service import PROMPT_EVENT_STYLIST
+from benchmarks.synthetic_catalog import generate_products
+
+REQUESTS = [
+    "Haftaya Kapadokya'da bir düğüne gideceğim",
+    "Cumartesi akşamı arkadaşlarla konsere gidiyoruz",
+    "Yazın plaj tatili için rahat bir şeyler",
+    "Pazartesi ofiste önemli bir toplantım var",
+]
+
+
+def legacy_prompt(user_request: str, catalog) -> str:
+    clothing = [p for p in catalog if "kitaplık" not in p["name"].lower() and "berjer" not in p["name"].lower()]
+    return PROMPT_EVENT_STYLIST.format(user_request=user_request, products_json=json.dumps(clothing, ensure_ascii=False))
+
+
+def compact_prompt(user_request: str, catalog) -> str:
+    candidates = stylist_retrieval.retrieve_candidates(catalog, user_request)
+    products_json = stylist_retrieval.catalog_projection.serialize(catalog, candidates)
+    return PROMPT_EVENT_STYLIST.format(user_request=user_request, products_json=products_json)
+
+
+def make_token_counter(use_api: bool):
+    if not use_api:
+        return lambda text: len(text) // 4
+    import google.generativeai as genai
+    genai.configure(api_key=os.environ["GEMINI_API_KEY"])
+    model = genai.GenerativeModel("gemini-1.5-flash-latest")
+    return lambda text: model.count_tokens(text).total_tokens
+
+
+def measure(build, catalog, count_tokens, repeats: int) -> dict:
+    build_ms, tokens = [], []
+    for _ in range(repeats):
+        for user_request in REQUESTS:
+            started = time.perf_counter()
+            prompt = build(user_request, catalog)
+            build_ms.append((time.perf_counter() - started) * 1000)
+            tokens.append(count_tokens(prompt))
+    return {"build_ms": sum(build_ms) / len(build_ms), "tokens": sum(tokens) / len(tokens)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000, 100000],
+                        help="Katalog boyutları; 10 gerçek products.json'u kullanır.")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=50.0)
+    parser.add_argument("--count-tokens", action="store_true")
+    args = parser.parse_args()
+
+    count_tokens = make_token_counter(args.count_tokens)
+    print(f"{'ürün':>8} | {'eski token':>11} {'eski hazırlık':>14} {'eski toplam':>12} | "
+          f"{'yeni token':>10} {'yeni hazırlık':>14} {'yeni toplam':>12}")
+    for size in args.sizes:
+        catalog = ProductCatalog.from_json("products.json") if size == 10 else ProductCatalog(generate_products(size))
+        row = []
+        for build in (legacy_prompt, compact_prompt):
+            result = measure(build, catalog, count_tokens, args.repeats)
+            total_ms = result["build_ms"] + result["tokens"] / 1000 * args.ms_per_1k_tokens
+            row.append(f"{result['tokens']:>10.0f} {result['build_ms']:>12.2f}ms {total_ms:>10.0f}ms")
+        print(f"{size:>8} | {row[0]} | {row[1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""N ürünün fit puanını (gerekçeli) almak için ürün başına istek ile toplu endpoint'i karşılaştırır.
+
+Sahte model her çağrıda sabit bir gecikme ve yanıt uzunluğuyla orantılı bir üretim süresi ekler;
+böylece toplu prompt'un daha uzun yanıtı da hesaba katılır. Her ölçümden önce puan önbelleği
+temizlenir, yani tüm gerekçeler modelden üretilir.
+
+Ek bağımlılıklar (httpx): pip install -r benchmarks/requirements.txt
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_fit_score_batch.py --sizes 1 5 10 20 50 --latency 0.4
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MODEL_BACKEND", "synthetic")
+os.environ.setdefault("RETURN_STORE_DB", "")
+
+import httpx
+
+import main
+from services.product_catalog import ProductCatalog
+from benchmarks.stub_server import install_synthetic_backend
+from benchmarks.synthetic_catalog import generate_products
+
+BODY_TYPE = "kum saati"
+
+
+async def unbatched(client, product_ids: list, concurrent: bool):
+    requests = [client.post("/api/fit-score", json={"user_body_type": BODY_TYPE, "product_id": pid}) for pid in product_ids]
+    if concurrent:
+        responses = await asyncio.gather(*requests)
+    else:
+        responses = [await r for r in requests]
+    assert all(r.status_code == 200 for r in responses)
+
+
+async def batched(client, product_ids: list):
+    response = await client.post("/api/fit-score/batch", json={"user_body_type": BODY_TYPE, "product_ids": product_ids, "include_reasoning": True})
+    assert response.status_code == 200
+    assert all(item["reasoning"] for item in response.json()["scores"])
+
+
+async def measure(run, repeats: int) -> float:
+    durations = []
+    for _ in range(repeats):
+        main.fit_score_engine.clear()
+        started = time.perf_counter()
+        await run()
+        durations.append(time.perf_counter() - started)
+    return sorted(durations)[len(durations) // 2] * 1000
+
+
+async def run_benchmark(args):
+    main.catalog = ProductCatalog(generate_products(max(args.sizes)))
+    install_synthetic_backend(args.latency, args.seconds_per_char)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        print(f"{'N':>5} | {'sıralı':>10} {'paralel':>10} {'toplu':>10} | {'model çağrısı (tekli/toplu)':>28}")
+        for size in args.sizes:
+            product_ids = list(range(1, size + 1))
+            sequential_ms = await measure(lambda: unbatched(client, product_ids, False), args.repeats)
+            concurrent_ms = await measure(lambda: unbatched(client, product_ids, True), args.repeats)
+            batched_ms = await measure(lambda: batched(client, product_ids), args.repeats)
+            chunks = -(-size // main.FIT_SCORE_PROMPT_CHUNK)
+            print(f"{size:>5} | {sequential_ms:>8.0f}ms {concurrent_ms:>8.0f}ms {batched_ms:>8.0f}ms | {size:>15} / {chunks}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 10, 20, 50])
+    parser.add_argument("--latency", type=float, default=0.4, help="Model çağrısı başına sabit gecikme (saniye).")
+    parser.add_argument("--seconds-per-char", type=float, default=0.0005, help="Yanıtın karakter başına üretim süresi.")
+    parser.add_argument("--repeats", type=int, default=3)
+    asyncio.run(run_benchmark(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,349 @@
+"""API route'ları için uçtan uca yük testi.
+
+Sentetik model arka ucuyla (bkz. stub_server.py) ayrı bir uvicorn süreci başlatır ve önce her
+route'u tek başına, ardından karışık trafik profillerini sabit eşzamanlılıkla (kapalı döngü) yükler.
+Her aşama için saniyedeki istek sayısı, p50/p95/p99 gecikme, hata sayısı ile sunucu süreç ağacının
+(görsel ön işleme süreçleri dahil) CPU kullanımı ve en yüksek RSS'i ölçülür. Görseller
+frontend/public/img altındaki gerçek ürün fotoğraflarıdır.
+
+Sonuçlar JSON olarak yazılır; --baseline ile önceki bir çalıştırmayla karşılaştırılır ve bir metrik
+--tolerance'tan fazla kötüleştiyse betik 1 ile çıkar. İstemci de aynı makinede çalıştığından sonuçlar
+yalnızca aynı makinede alınmış çalıştırmalarla karşılaştırılmalıdır.
+
+Ek bağımlılıklar (httpx): pip install -r benchmarks/requirements.txt
+
+Kullanım (backend klasöründen, yalnızca Linux):
+    python benchmarks/bench_load.py --catalog-size 10000 --duration 10 --concurrency 8
+    python benchmarks/bench_load.py --routes chat fit_score --profiles shopper --latency lognormal:0.8,0.5
+    python benchmarks/bench_load.py --baseline benchmarks/results/load-onceki.json --tolerance 0.15
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import threading
+import subprocess
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_upload_memory import BACKEND_DIR, free_port, wait_until_ready
+from benchmarks.synthetic_catalog import BODY_TYPES
+
+IMAGE_DIR = os.path.join(BACKEND_DIR, "..", "frontend", "public", "img")
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+IMAGE_TYPES = {".jpeg": "image/jpeg", ".jpg": "image/jpeg", ".png": "image/png", ".webp": "image/webp"}
+
+CHAT_MESSAGES = [
+    "Ürün bana küçük geldi, bir beden büyüğünü alabilir miyim?",
+    "Rengi fotoğraftakinden farklı çıktı, iade etmek istiyorum.",
+    "Dikiş yerinde sökük var, kusurlu ürün geldi.",
+    "Kumaşı beklediğim gibi değil, biraz ince.",
+    "Bu ürünü neyle kombinleyebilirim?",
+    "Pantolonun boyu uzun, paçası kısaltılabilir mi?",
+]
+EVENT_REQUESTS = [
+    "Cumartesi akşamı bir arkadaşımın düğününe davetliyim.",
+    "Hafta sonu sahilde bir gün geçireceğim.",
+    "Yeni işimde ilk gün, ofis için ne giymeliyim?",
+    "Kış akşamı bir konsere gidiyorum.",
+    "Bahçede bir doğum günü partisi var.",
+]
+
+# Karışık trafik profilleri: route -> ağırlık.
+PROFILES = {
+    "shopper": {"products": 45, "fit_score": 20, "chat": 12, "analyze_style": 10, "event_stylist": 8, "create_style_profile": 5},
+    "seller": {"return_analytics": 70, "products": 30},
+    "mixed": {"products": 30, "fit_score": 15, "chat": 15, "analyze_style": 10, "event_stylist": 10, "create_style_profile": 5,
+              "return_analytics": 15},
+}
+
+# Karşılaştırılan metrikler ve hangi yönün kötüleşme sayıldığı.
+COMPARED_METRICS = {"rps": "lower", "p50_ms": "higher", "p95_ms": "higher", "p99_ms": "higher"}
+COMPARED_RESOURCES = {"cpu_ms_per_request": "higher", "rss_peak_mb": "higher"}
+
+
+class Fixtures:
+    def __init__(self, catalog_size: int):
+        with open(os.path.join(BACKEND_DIR, "products.json"), encoding="utf-8") as f:
+            products = json.load(f)
+        first_synthetic = max(p["id"] for p in products) + 1
+        self.product_ids = [p["id"] for p in products] + list(range(first_synthetic, first_synthetic + catalog_size))
+        self.product_names = [p["name"] for p in products]
+        self.images = []
+        for name in sorted(os.listdir(IMAGE_DIR)):
+            content_type = IMAGE_TYPES.get(os.path.splitext(name)[1].lower())
+            if content_type:
+                with open(os.path.join(IMAGE_DIR, name), "rb") as f:
+                    self.images.append((name, f.read(), content_type))
+        if not self.images: raise RuntimeError(f"{IMAGE_DIR} altında görsel bulunamadı.")
+
+
+# Her route, rastgele ama gerçekçi bir istek üreten bir fonksiyondur: (method, path, httpx kwargs).
+def products_request(rng, fx):
+    return "GET", f"/api/products/{rng.choice(fx.product_ids)}", {}
+
+def fit_score_request(rng, fx):
+    body = {"user_body_type": rng.choice(BODY_TYPES), "product_id": rng.choice(fx.product_ids), "include_reasoning": rng.random() < 0.5}
+    return "POST", "/api/fit-score", {"json": body}
+
+def chat_request(rng, fx):
+    return "POST", "/api/chat", {"json": {"message": rng.choice(CHAT_MESSAGES), "product": rng.choice(fx.product_names)}}
+
+def analyze_style_request(rng, fx):
+    return "POST", "/api/analyze-style", {"files": {"file": rng.choice(fx.images)}}
+
+def event_stylist_request(rng, fx):
+    return "POST", "/api/event-stylist", {"json": {"user_request": rng.choice(EVENT_REQUESTS)}}
+
+def create_style_profile_request(rng, fx):
+    return "POST", "/api/create-style-profile", {"files": [("files", image) for image in rng.sample(fx.images, rng.randint(2, 4))]}
+
+def return_analytics_request(rng, fx):
+    return "GET", "/api/return-analytics", {"params": {"window": rng.choice(["hour", "day"])} if rng.random() < 0.3 else {}}
+
+ROUTES = {
+    "products": products_request,
+    "fit_score": fit_score_request,
+    "chat": chat_request,
+    "analyze_style": analyze_style_request,
+    "event_stylist": event_stylist_request,
+    "create_style_profile": create_style_profile_request,
+    "return_analytics": return_analytics_request,
+}
+
+
+def process_tree(pid: int) -> list:
+    pids, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        pids.append(current)
+        try:
+            for tid in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{tid}/children") as f:
+                    pending.extend(int(child) for child in f.read().split())
+        except OSError:
+            continue
+    return pids
+
+
+def tree_usage(pid: int):
+    """Süreç ağacının toplam CPU süresini (saniye) ve RSS'ini (KB) döndürür."""
+    cpu_ticks, rss_kb = 0, 0
+    for current in process_tree(pid):
+        try:
+            with open(f"/proc/{current}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            cpu_ticks += int(fields[11]) + int(fields[12])  # utime + stime
+            with open(f"/proc/{current}/status") as f:
+                rss_kb += next((int(line.split()[1]) for line in f if line.startswith("VmRSS:")), 0)
+        except OSError:
+            continue
+    return cpu_ticks / CLOCK_TICKS, rss_kb
+
+
+class ResourceSampler:
+    def __init__(self, pid: int, interval: float = 0.1):
+        self.pid = pid
+        self.interval = interval
+
+    def __enter__(self):
+        self._stop = threading.Event()
+        self.cpu_start, self.rss_peak_kb = tree_usage(self.pid)
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.rss_peak_kb = max(self.rss_peak_kb, tree_usage(self.pid)[1])
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        cpu_end, rss_kb = tree_usage(self.pid)
+        self.rss_peak_kb = max(self.rss_peak_kb, rss_kb)
+        self.rss_end_kb = rss_kb
+        self.cpu_seconds = cpu_end - self.cpu_start
+        self.wall_seconds = time.perf_counter() - self.started
+
+
+def percentile_ms(ordered: list, q: float) -> float:
+    if not ordered: return 0.0
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 2)
+
+
+def summarize(samples: list, duration: float) -> dict:
+    ordered = sorted(latency for latency, ok in samples)
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for _, ok in samples if not ok),
+        "rps": round(len(samples) / duration, 2),
+        "p50_ms": percentile_ms(ordered, 0.5),
+        "p95_ms": percentile_ms(ordered, 0.95),
+        "p99_ms": percentile_ms(ordered, 0.99),
+    }
+
+
+async def generate_load(client: httpx.AsyncClient, fx: Fixtures, weights: dict, concurrency: int, duration: float, seed: int) -> dict:
+    """`weights`'e göre route seçerek `duration` saniye boyunca `concurrency` işçiyle istek atar."""
+    names, route_weights = list(weights), list(weights.values())
+    samples = {name: [] for name in names}
+    deadline = time.perf_counter() + duration
+
+    async def worker(rng):
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights=route_weights)[0]
+            method, path, kwargs = ROUTES[name](rng, fx)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            samples[name].append((time.perf_counter() - started, ok))
+
+    await asyncio.gather(*(worker(random.Random(seed + i)) for i in range(concurrency)))
+    return samples
+
+
+async def run_phase(client, fx, server_pid: int, weights: dict, args) -> dict:
+    with ResourceSampler(server_pid) as usage:
+        samples = await generate_load(client, fx, weights, args.concurrency, args.duration, args.seed)
+    everything = [sample for route_samples in samples.values() for sample in route_samples]
+    result = summarize(everything, usage.wall_seconds)
+    result.update({
+        "cpu_percent": round(usage.cpu_seconds / usage.wall_seconds * 100, 1),
+        "cpu_ms_per_request": round(usage.cpu_seconds / max(1, len(everything)) * 1000, 3),
+        "rss_peak_mb": round(usage.rss_peak_kb / 1024, 1),
+        "rss_end_mb": round(usage.rss_end_kb / 1024, 1),
+        "routes": {name: summarize(route_samples, usage.wall_seconds) for name, route_samples in samples.items()},
+    })
+    return result
+
+
+async def run_benchmark(args, base_url: str, server_pid: int) -> dict:
+    fx = Fixtures(args.catalog_size)
+    phases = {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        # Isınma: her route bir kez çağrılır (ilk import'lar, süreç havuzu, önbellekler).
+        for name in set(args.routes) | {n for p in args.profiles for n in PROFILES[p]}:
+            method, path, kwargs = ROUTES[name](random.Random(args.seed), fx)
+            await client.request(method, path, **kwargs)
+        for name in args.routes:
+            phases[f"route:{name}"] = await run_phase(client, fx, server_pid, {name: 1}, args)
+            print_phase(f"route:{name}", phases[f"route:{name}"])
+        for name in args.profiles:
+            phases[f"profile:{name}"] = await run_phase(client, fx, server_pid, PROFILES[name], args)
+            print_phase(f"profile:{name}", phases[f"profile:{name}"])
+            for route, stats in phases[f"profile:{name}"]["routes"].items():
+                print_phase(f"  {route}", stats)
+    return phases
+
+
+def print_phase(label: str, stats: dict):
+    resources = f"{stats['cpu_percent']:>6.1f}% {stats['cpu_ms_per_request']:>8.2f}ms {stats['rss_peak_mb']:>7.1f}MB" if "cpu_percent" in stats else ""
+    print(f"{label:<28} {stats['rps']:>8.1f} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f} {stats['errors']:>6} {resources}")
+
+
+def compare(current: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> list:
+    """Taban çizgisine göre `tolerance` oranından fazla kötüleşen metrikleri döndürür."""
+    regressions = []
+
+    def check(label, metrics, now, before):
+        for metric, worse in metrics.items():
+            if metric not in now or metric not in before or not before[metric]: continue
+            change = (now[metric] - before[metric]) / before[metric]
+            if worse == "lower": change = -change
+            # Milisaniye altındaki oynamalar oran olarak büyük görünse de gürültüdür.
+            if metric.endswith("_ms") and abs(now[metric] - before[metric]) < min_delta_ms: continue
+            if change > tolerance: regressions.append((label, metric, before[metric], now[metric], change))
+
+    for phase, stats in current["phases"].items():
+        previous = baseline.get("phases", {}).get(phase)
+        if previous is None: continue
+        check(phase, {**COMPARED_METRICS, **COMPARED_RESOURCES}, stats, previous)
+        for route, route_stats in stats["routes"].items():
+            if route in previous.get("routes", {}) and phase.startswith("profile:"):
+                check(f"{phase}/{route}", COMPARED_METRICS, route_stats, previous["routes"][route])
+    return regressions
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--routes", nargs="*", choices=list(ROUTES), default=list(ROUTES), help="Tek başına yüklenecek route'lar.")
+    parser.add_argument("--profiles", nargs="*", choices=list(PROFILES), default=["shopper", "seller"], help="Çalıştırılacak karışık trafik profilleri.")
+    parser.add_argument("--duration", type=float, default=5.0, help="Aşama başına süre (saniye).")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--catalog-size", type=int, default=1000, help="Kataloğa eklenecek sentetik ürün sayısı.")
+    parser.add_argument("--latency", default="lognormal:0.3,0.4", help="Sentetik model gecikmesi (bkz. stub_server.py --latency).")
+    parser.add_argument("--seconds-per-char", type=float, default=0.0005)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--cold-caches", action="store_true", help="Analiz ve chat önbelleklerini kapatır; her istek modele gider.")
+    parser.add_argument("--output", help="Sonuç dosyası (varsayılan: benchmarks/results/load-<zaman>.json).")
+    parser.add_argument("--baseline", help="Karşılaştırılacak önceki sonuç dosyası.")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Kötüleşme sayılmadan izin verilen oran.")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="Bundan küçük gecikme farkları yok sayılır.")
+    args = parser.parse_args()
+
+    env = dict(os.environ, MODEL_BACKEND="synthetic", RETURN_STORE_DB="", ANALYSIS_CACHE_DB="")
+    if args.cold_caches: env.update(ANALYSIS_CACHE_MAX_ENTRIES="0", CHAT_CACHE_MAX_ENTRIES="0")
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen([sys.executable, "benchmarks/stub_server.py", "--port", str(port), "--latency", args.latency,
+                               "--seconds-per-char", str(args.seconds_per_char), "--seed", str(args.seed),
+                               "--catalog-size", str(args.catalog_size)], cwd=BACKEND_DIR, env=env)
+    try:
+        wait_until_ready(base_url, timeout=120)
+        print(f"{'aşama':<28} {'istek/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'hata':>6} {'CPU':>7} {'CPU/istek':>10} {'RSS':>9}")
+        phases = asyncio.run(run_benchmark(args, base_url, server.pid))
+    finally:
+        server.terminate()
+        server.wait()
+
+    results = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        },
+        "phases": phases,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"load-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\nSonuçlar: {output}")
+
+    if not args.baseline: return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    changed = [k for k, v in results["meta"]["args"].items() if baseline.get("meta", {}).get("args", {}).get(k, v) != v]
+    if changed: print(f"UYARI: Taban çizgisi farklı ayarlarla alınmış: {', '.join(changed)}")
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+    for label, metric, before, now, change in regressions:
+        print(f"GERİLEME {label:<36} {metric:<20} {before:>10} -> {now:<10} (%{change * 100:.0f})")
+    if regressions: sys.exit(1)
+    print(f"Taban çizgisine göre %{args.tolerance * 100:.0f}'den büyük gerileme yok.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Tekil ürün endpoint'inin (/api/products/{id}) saniyedeki istek sayısını ve gecikme dağılımını ölçer.
+
+--transport http: sahte modellerle ayrı bir uvicorn süreci başlatılır ve gerçek HTTP üzerinden
+ölçülür (istemci de Python olduğu için sonuç istemciyle de sınırlıdır).
+--transport asgi: uygulama aynı süreçte httpx.ASGITransport ile çağrılır; ağ maliyeti olmadan
+yalnızca FastAPI + serileştirme maliyeti ölçülür.
+
+Ek bağımlılıklar (httpx): pip install -r benchmarks/requirements.txt
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_product_rps.py --transport http --concurrency 4 --duration 5
+    python benchmarks/bench_product_rps.py --transport asgi --products 10000
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_upload_memory import BACKEND_DIR, free_port, wait_until_ready
+
+
+async def load(client: httpx.AsyncClient, paths: list, concurrency: int, duration: float) -> list:
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = await client.get(random.choice(paths))
+            assert response.status_code == 200, response.status_code
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def report(label: str, latencies: list, duration: float):
+    ordered = sorted(latencies)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    print(f"{label:<10} {len(ordered) / duration:>10.0f} istek/s   p50 {pick(0.5):>6.2f}ms   p99 {pick(0.99):>6.2f}ms")
+
+
+async def run(args, base_url: str, transport=None):
+    product_count = args.products if args.transport == "asgi" else 10
+    paths = [f"/api/products/{pid}" for pid in range(1, product_count + 1)]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, transport=transport, limits=limits, timeout=30) as client:
+        await load(client, paths, args.concurrency, 1.0)  # ısınma
+        report(f"{args.transport}", await load(client, paths, args.concurrency, args.duration), args.duration)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transport", choices=["http", "asgi"], default="http")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--products", type=int, default=10000, help="asgi modunda kullanılan sentetik katalog boyutu.")
+    args = parser.parse_args()
+
+    if args.transport == "asgi":
+        os.environ.setdefault("MODEL_BACKEND", "synthetic")
+        os.environ.setdefault("RETURN_STORE_DB", "")
+        import main as app_module
+        from services.product_catalog import ProductCatalog
+        from benchmarks.synthetic_catalog import generate_products
+        app_module.catalog = ProductCatalog(generate_products(args.products))
+        asyncio.run(run(args, "http://bench", httpx.ASGITransport(app=app_module.app)))
+        return
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen([sys.executable, "benchmarks/stub_server.py", "--port", str(port)], cwd=BACKEND_DIR)
+    try:
+        wait_until_ready(base_url)
+        asyncio.run(run(args, base_url))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
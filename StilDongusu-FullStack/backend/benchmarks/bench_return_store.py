@@ -0,0 +1,105 @@
+"""İade kaydının yazma hızını ve yeniden başlatmadaki kurtarma süresini ölçer.
+
+Üç açılış senaryosu karşılaştırılır: düzgün kapanış (yalnızca anlık görüntü), çökme sonrası
+(anlık görüntü + log kuyruğu) ve anlık görüntü olmadan tüm logun yeniden oynatılması.
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_return_store.py --count 1000000 --tail 50000
+"""
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.return_analytics import ReturnAnalytics
+from services.return_store import SQLiteReturnStore
+
+INTENTS = ["BEDEN", "RENK_STIL", "KUSURLU_URUN", "BEKLENTI_FARKI", "BELIRSIZ"]
+MESSAGES = ["Beden küçük geldi", "Rengi fotoğraftakinden farklı", "Dikişi sökük geldi", "Beklediğim gibi değil"]
+WEEK = 7 * 24 * 60 * 60
+
+
+def write_intents(store, analytics, count: int, products: int, rng: random.Random, start: float, span: float) -> float:
+    """Chat endpoint'inin yaptığı gibi sayaçlara ekleyip kuyruğa bırakır; kuyruğa bırakma süresini döndürür.
+    Kayıtların zamanları [start, start + span) aralığına sırayla yayılır."""
+    step = span / count
+    started = time.perf_counter()
+    for i in range(count):
+        product, intent = f"Ürün {rng.randrange(products)}", rng.choice(INTENTS)
+        message, timestamp = rng.choice(MESSAGES), start + i * step
+        seq = analytics.record(product, intent, message, timestamp)
+        store.append(seq, product, intent, message, timestamp)
+    return time.perf_counter() - started
+
+
+def wait_drained(store, expected: int):
+    while store.stats()["written"] < expected:
+        time.sleep(0.01)
+
+
+def recover(db_path: str) -> tuple:
+    analytics = ReturnAnalytics()
+    store = SQLiteReturnStore(db_path, snapshot_every=10 ** 12)
+    store.load(analytics)
+    return analytics, store.stats()["recovery"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--tail", type=int, default=50_000, help="Çökme senaryosunda son görüntüden sonra yazılan kayıt sayısı.")
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=512)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    week_ago = time.time() - WEEK
+    head = args.count - args.tail
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "return_intents.db")
+
+        analytics = ReturnAnalytics()
+        store = SQLiteReturnStore(db_path, batch_size=args.batch_size)
+        store.load(analytics)
+        store.start()
+        started = time.perf_counter()
+        enqueue_seconds = write_intents(store, analytics, head, args.products, rng, week_ago, WEEK * head / args.count)
+        store.close()
+        total_seconds = time.perf_counter() - started
+        stats = store.stats()
+        print(f"yazma: {head} kayıt | kuyruğa bırakma {head / enqueue_seconds:,.0f} kayıt/sn "
+              f"({enqueue_seconds / head * 1e6:.1f} µs/kayıt) | diske yazma {head / total_seconds:,.0f} kayıt/sn "
+              f"| ort. batch {stats['avg_batch_size']} | anlık görüntü {stats['snapshots']}")
+
+        _, recovery = recover(db_path)
+        print(f"düzgün kapanış sonrası açılış: {recovery['ms']:.0f}ms (oynatılan {recovery['replayed']})")
+
+        # Çökme: son görüntüden sonra `tail` kayıt yazılır ve kapanışta görüntü alınmaz.
+        analytics = ReturnAnalytics()
+        store = SQLiteReturnStore(db_path, batch_size=args.batch_size, snapshot_every=10 ** 12)
+        store.load(analytics)
+        store.start()
+        write_intents(store, analytics, args.tail, args.products, rng, week_ago + WEEK * head / args.count, WEEK * args.tail / args.count)
+        wait_drained(store, args.tail)
+        expected_total = analytics.total_returns
+
+        recovered, recovery = recover(db_path)
+        assert recovered.total_returns == expected_total
+        print(f"çökme sonrası açılış (görüntü + {args.tail} kayıt): {recovery['ms']:.0f}ms (oynatılan {recovery['replayed']})")
+
+        conn = sqlite3.connect(db_path)
+        with conn:
+            conn.execute("DELETE FROM return_snapshots")
+        conn.close()
+        recovered, recovery = recover(db_path)
+        assert recovered.total_returns == expected_total
+        print(f"görüntüsüz tam oynatma ({recovered.total_returns} kayıt): {recovery['ms']:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Sunucunun soğuk açılış süresini ölçer.
+
+İki ölçüm yapar:
+  1. `python -X importtime -c "import main"` çıktısından main'in toplam import süresini, main'in
+     doğrudan import ettiği modüllerin ve kendi süresi en yüksek modüllerin dökümünü,
+  2. `uvicorn main:app` sürecinin başlatılmasından ilk /api/products/1 isteğine 200 dönmesine kadar
+     geçen süreyi (ilk istek süresi). Bu ölçüm --runs kez tekrarlanır ve medyanı raporlanır.
+
+Sunucu gerçek giriş noktasıyla, sahte bir GEMINI_API_KEY ile başlatılır; model istemcisi hiç çağrı
+yapılmadığı için ağa çıkılmaz. --catalog-size ile geçici bir sentetik products.json (PRODUCTS_PATH)
+kullanılır; --snapshot verilirse ilk çalıştırma katalog snapshot'ını yazar, sonrakiler ondan yükler.
+Medyan --target saniyeyi aşarsa betik 1 ile çıkar.
+
+Ek bağımlılıklar (httpx): pip install -r benchmarks/requirements.txt
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_startup.py --runs 5 --target 1.0
+    python benchmarks/bench_startup.py --catalog-size 100000 --snapshot --runs 3
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_load import RESULTS_DIR, git_commit
+from benchmarks.bench_upload_memory import BACKEND_DIR, free_port
+from benchmarks.synthetic_catalog import generate_products
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def server_env(products_path: str = None, snapshot_path: str = None) -> dict:
+    env = dict(os.environ, GEMINI_API_KEY=os.getenv("GEMINI_API_KEY", "bench-startup"), RETURN_STORE_DB="",
+               ANALYSIS_CACHE_DB="")
+    if products_path: env["PRODUCTS_PATH"] = products_path
+    env["CATALOG_SNAPSHOT_PATH"] = snapshot_path or ""
+    return env
+
+
+def import_profile(env: dict, top: int) -> dict:
+    """main import'unun -X importtime dökümü: toplam süre, doğrudan import'lar ve en pahalı modüller (ms)."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, len(indent) // 2, int(self_us) / 1000, int(cumulative_us) / 1000))
+    total = next((cumulative for name, _, _, cumulative in modules if name == "main"), 0.0)
+    # main'in doğrudan import ettikleri bir seviye içeridedir; döküm çocuklardan sonra yazılır.
+    direct = [m for m in modules if m[1] == 1]
+    return {
+        "total_ms": round(total, 1),
+        "direct": [{"module": n, "cumulative_ms": round(c, 1)} for n, _, _, c in sorted(direct, key=lambda m: -m[3])[:top]],
+        "self": [{"module": n, "self_ms": round(s, 1)} for n, _, s, _ in sorted(modules, key=lambda m: -m[2])[:top]],
+        "loaded_heavy": sorted({n.split(".")[0] for n, *_ in modules if n.split(".")[0] in ("google", "grpc", "PIL")}),
+    }
+
+
+def time_to_first_request(env: dict, timeout: float) -> dict:
+    """Sunucu sürecini başlatır ve ilk başarılı isteğe kadar geçen süreyi ölçer."""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/api/products/1"
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+                              cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        with httpx.Client(timeout=1.0) as client:
+            while time.perf_counter() - started < timeout:
+                if server.poll() is not None: raise RuntimeError(f"Sunucu {server.returncode} koduyla kapandı.")
+                try:
+                    sent = time.perf_counter()
+                    response = client.get(url)
+                    if response.status_code == 200:
+                        now = time.perf_counter()
+                        return {"first_request_s": round(now - started, 3), "first_request_ms": round((now - sent) * 1000, 1)}
+                except httpx.HTTPError:
+                    pass
+                time.sleep(0.01)
+        raise RuntimeError("Sunucu zamanında başlamadı.")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5, help="İlk istek ölçümünün tekrar sayısı.")
+    parser.add_argument("--target", type=float, default=1.0, help="İlk istek süresi medyanı için üst sınır (saniye).")
+    parser.add_argument("--catalog-size", type=int, default=0, help="0 ise products.json, değilse bu boyutta sentetik katalog.")
+    parser.add_argument("--snapshot", action="store_true", help="Katalog snapshot'ını (CATALOG_SNAPSHOT_PATH) etkinleştirir.")
+    parser.add_argument("--top", type=int, default=12, help="Import dökümünde gösterilecek modül sayısı.")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--output", help="Sonuç dosyası (varsayılan: benchmarks/results/startup-<zaman>.json).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        products_path = None
+        if args.catalog_size:
+            products_path = os.path.join(tmp, "products.json")
+            with open(products_path, "w", encoding="utf-8") as f:
+                json.dump(generate_products(args.catalog_size), f, ensure_ascii=False)
+        env = server_env(products_path, os.path.join(tmp, "catalog.snapshot") if args.snapshot else None)
+
+        profile = import_profile(env, args.top)
+        print(f"import main: {profile['total_ms']:.0f} ms (yüklenen ağır paketler: {', '.join(profile['loaded_heavy']) or '-'})")
+        print(f"  {'doğrudan import':<48} {'toplam ms':>10}")
+        for row in profile["direct"]:
+            print(f"  {row['module']:<48} {row['cumulative_ms']:>10.1f}")
+        print(f"  {'modül (kendi süresi)':<48} {'ms':>10}")
+        for row in profile["self"]:
+            print(f"  {row['module']:<48} {row['self_ms']:>10.1f}")
+
+        runs = []
+        for i in range(args.runs):
+            run = time_to_first_request(env, args.timeout)
+            runs.append(run)
+            print(f"çalıştırma {i + 1}: ilk istek {run['first_request_s']:.3f} sn (isteğin kendisi {run['first_request_ms']:.1f} ms)")
+
+    median = statistics.median(r["first_request_s"] for r in runs)
+    results = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k != "output"},
+        },
+        "import": profile,
+        "runs": runs,
+        "first_request_median_s": median,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"startup-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\nİlk istek medyanı: {median:.3f} sn (hedef {args.target:.3f} sn)\nSonuçlar: {output}")
+    if median > args.target:
+        print(f"HEDEF AŞILDI: ilk istek medyanı {median:.3f} sn > {args.target:.3f} sn")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Akışlı (SSE) ve akışsız analyze-style / event-stylist endpoint'lerinin ilk bayt ve toplam sürelerini karşılaştırır.
+
+Sahte model ilk parçadan önce sabit bir gecikme, sonra her parça için karakter başına üretim süresi
+uygular; akışsız çağrı aynı toplam süreyi tek seferde bekler. Akışlı endpoint'ler için ilk olay
+(analiz ya da ilk kombin), ilk tavsiye alanı ve akışın sonu ayrı ayrı ölçülür. Her yüklemede yeni
+bir gürültü görseli kullanıldığı için analiz önbelleği devreye girmez.
+
+Ek bağımlılıklar (httpx): pip install -r benchmarks/requirements.txt
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_streaming.py --latency 0.5 --seconds-per-char 0.003 --repeats 5
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+import httpx
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_upload_memory import BACKEND_DIR, free_port, wait_until_ready
+
+
+def make_image() -> bytes:
+    output = io.BytesIO()
+    Image.effect_noise((256, 256), 80).convert("RGB").save(output, format="JPEG")
+    return output.getvalue()
+
+
+def timed_request(client: httpx.Client, path: str, marks: dict, **kwargs) -> dict:
+    """İsteği akış olarak okur; ilk bayt, `marks` içindeki olayların ilk görüldüğü an ve bitiş süresini döndürür."""
+    result = {}
+    started = time.perf_counter()
+    with client.stream("POST", path, **kwargs) as response:
+        assert response.status_code == 200, response.status_code
+        for line in response.iter_lines():
+            now = (time.perf_counter() - started) * 1000
+            result.setdefault("ttfb", now)
+            if line.startswith("event: "):
+                assert line != "event: error", line
+                name = marks.get(line[len("event: "):])
+                if name: result.setdefault(name, now)
+    result["total"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def median_of(runs: list) -> dict:
+    return {key: sorted(run[key] for run in runs)[len(runs) // 2] for key in runs[0]}
+
+
+def report(label: str, result: dict, columns: list):
+    cells = " ".join(f"{result[c]:>9.0f}ms" if c in result else f"{'-':>11}" for c in columns)
+    print(f"{label:<28} {cells}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.5, help="Model çağrısı başına ilk parçaya kadar geçen süre.")
+    parser.add_argument("--seconds-per-char", type=float, default=0.003, help="Yanıtın karakter başına üretim süresi.")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen([sys.executable, "benchmarks/stub_server.py", "--port", str(port),
+                               "--latency", str(args.latency), "--seconds-per-char", str(args.seconds_per_char)], cwd=BACKEND_DIR)
+    try:
+        wait_until_ready(base_url)
+        scenarios = [
+            ("analyze-style", "/api/analyze-style", {}, lambda: {"files": {"file": ("s.jpg", make_image(), "image/jpeg")}}),
+            ("analyze-style/stream", "/api/analyze-style/stream", {"analysis": "first_event", "advice_field": "first_advice"},
+             lambda: {"files": {"file": ("s.jpg", make_image(), "image/jpeg")}}),
+            ("event-stylist", "/api/event-stylist", {}, lambda: {"json": {"user_request": "Cumartesi akşamı arkadaş yemeği"}}),
+            ("event-stylist/stream", "/api/event-stylist/stream", {"combination": "first_event"},
+             lambda: {"json": {"user_request": "Cumartesi akşamı arkadaş yemeği"}}),
+        ]
+        columns = ["ttfb", "first_event", "first_advice", "total"]
+        print(f"{'endpoint':<28} {'ilk bayt':>11} {'ilk olay':>11} {'ilk tavsiye':>11} {'toplam':>11}")
+        with httpx.Client(base_url=base_url, timeout=120) as client:
+            for label, path, marks, make_kwargs in scenarios:
+                timed_request(client, path, marks, **make_kwargs())  # ısınma
+                runs = [timed_request(client, path, marks, **make_kwargs()) for _ in range(args.repeats)]
+                report(label, median_of(runs), columns)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Eski lineer find_matching_products ile indeksli StyleMatcher'ı karşılaştırır.
+
+Kullanım (backend klasöründen):
+    python benchmarks/bench_style_matcher.py --sizes 10000 100000 1000000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.product_catalog import ProductCatalog
+from services.style_matcher import StyleMatcher
+from benchmarks.synthetic_catalog import generate_products, STYLE_TAGS, COLOR_TAGS, SEASON_TAGS
+
+
+def linear_find_matching_products(analysis_data: dict, products_db: list) -> list:
+    """Baseline: indeks öncesi gemini_service.find_matching_products."""
+    matched_products = []
+    style_tags = set(analysis_data.get("inferred_style", {}).get("style_tags", []))
+    if not style_tags: return products_db[:3]
+    for product in products_db:
+        if style_tags.intersection(set(product.get("style_tags", []))):
+            matched_products.append(product)
+    return matched_products if matched_products else products_db[:3]
+
+
+def make_queries(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [{
+        "inferred_style": {"style_tags": rng.sample(STYLE_TAGS, 2), "color_tags": rng.sample(COLOR_TAGS, 1)},
+        "contextual_use": {"seasons": rng.sample(SEASON_TAGS[:4], 2)},
+    } for _ in range(count)]
+
+
+def time_queries(func, queries: list) -> dict:
+    durations = []
+    for query in queries:
+        started = time.perf_counter()
+        func(query)
+        durations.append((time.perf_counter() - started) * 1000)
+    durations.sort()
+    return {
+        "p50_ms": round(statistics.median(durations), 3),
+        "p99_ms": round(durations[int(len(durations) * 0.99) - 1], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--skip-linear", action="store_true", help="Lineer baseline'ı ölçme.")
+    args = parser.parse_args()
+
+    queries = make_queries(args.queries)
+    print(f"{'ürün':>10} {'kurulum':>10} {'indeks p50':>11} {'indeks p99':>11} {'lineer p50':>11} {'lineer p99':>11}")
+    for size in args.sizes:
+        products = generate_products(size)
+        started = time.perf_counter()
+        matcher = StyleMatcher(ProductCatalog(products))
+        build_ms = (time.perf_counter() - started) * 1000
+
+        indexed = time_queries(lambda q: matcher.match(q, limit=10), queries)
+        linear = {"p50_ms": "-", "p99_ms": "-"}
+        if not args.skip_linear:
+            linear = time_queries(lambda q: linear_find_matching_products(q, products), queries)
+        print(f"{size:>10} {build_ms:>8.0f}ms {indexed['p50_ms']:>9}ms {indexed['p99_ms']:>9}ms "
+              f"{linear['p50_ms']:>9}ms {linear['p99_ms']:>9}ms")
+        del matcher, products
+
+
+if __name__ == "__main__":
+    main()
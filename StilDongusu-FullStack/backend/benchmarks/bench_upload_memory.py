@@ -0,0 +1,110 @@
+"""Yükleme boyutu büyüdükçe sunucunun RSS'inin sabit kaldığını ölçer.
+
+Sahte modellerle bir sunucu başlatır, artan boyutlarda JPEG'leri /api/analyze-style'a
+eşzamanlı olarak yükler ve her tur boyunca sunucu sürecinin RSS'ini örnekler.
+
+Ek bağımlılıklar (httpx): pip install -r benchmarks/requirements.txt
+
+Kullanım (backend klasöründen, yalnızca Linux):
+    python benchmarks/bench_upload_memory.py --sizes-mb 1 4 8 12 --concurrency 4
+"""
+import io
+import os
+import sys
+import time
+import socket
+import argparse
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from PIL import Image
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def read_rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def make_jpeg(target_bytes: int) -> bytes:
+    """Gürültü görseli, JPEG'de piksel başına ~1 bayt tuttuğu için hedef boyuta yakın bir dosya üretir."""
+    side = int(target_bytes ** 0.5)
+    img = Image.effect_noise((side, side), 80).convert("RGB")
+    output = io.BytesIO()
+    img.save(output, format="JPEG", quality=95)
+    return output.getvalue()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            httpx.get(f"{base_url}/api/products/1", timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError("Sunucu zamanında başlamadı.")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 4, 8, 12])
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen([sys.executable, "benchmarks/stub_server.py", "--port", str(port)], cwd=BACKEND_DIR)
+    try:
+        wait_until_ready(base_url)
+        # Havuzların ve ilk import'ların maliyeti ölçüme karışmasın diye bir ısınma isteği atılır.
+        warmup = make_jpeg(256 * 1024)
+        httpx.post(f"{base_url}/api/analyze-style", files={"file": ("w.jpg", warmup, "image/jpeg")}, timeout=60)
+        baseline_kb = read_rss_kb(server.pid)
+        print(f"Başlangıç RSS: {baseline_kb / 1024:.1f} MB")
+        print(f"{'yükleme':>10} {'eşzamanlı':>10} {'tepe RSS':>10} {'artış':>9} {'süre':>8}")
+
+        for size_mb in args.sizes_mb:
+            payload = make_jpeg(int(size_mb * 1024 * 1024))
+            peak_kb = read_rss_kb(server.pid)
+            done = threading.Event()
+
+            def sample():
+                nonlocal peak_kb
+                while not done.is_set():
+                    peak_kb = max(peak_kb, read_rss_kb(server.pid))
+                    time.sleep(0.005)
+
+            sampler = threading.Thread(target=sample)
+            sampler.start()
+            started = time.perf_counter()
+            with ThreadPoolExecutor(args.concurrency) as pool:
+                # Dosya sonuna farklı bir bayt eklenir ki analiz önbelleği devreye girmesin.
+                bodies = [payload + bytes([i % 256]) for i in range(args.concurrency)]
+                responses = list(pool.map(lambda body: httpx.post(
+                    f"{base_url}/api/analyze-style", files={"file": ("u.jpg", body, "image/jpeg")}, timeout=120), bodies))
+            elapsed = time.perf_counter() - started
+            done.set()
+            sampler.join()
+            statuses = {r.status_code for r in responses}
+            print(f"{len(payload) / 1024 / 1024:>8.1f}MB {args.concurrency:>10} {peak_kb / 1024:>8.1f}MB "
+                  f"{(peak_kb - baseline_kb) / 1024:>7.1f}MB {elapsed:>7.2f}s  durum={sorted(statuses)}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Yerel niyet sınıflandırıcısını etiketli mesajlar üzerinde değerlendirir.
+
+Her eşik için kapsama (emin olunan mesaj oranı = atlanabilecek model çağrısı), emin olunan
+mesajlardaki doğruluk ve sınıflandırma süresi raporlanır. --db verilirse etiketler yerine
+iade kaydı veritabanındaki (RETURN_STORE_DB) modelin bulduğu niyetler kullanılır.
+
+Kullanım (backend klasöründen):
+    python benchmarks/eval_intent_classifier.py --thresholds 0.6 0.75 0.9
+    python benchmarks/eval_intent_classifier.py --db return_intents.db
+"""
+import os
+import sys
+import time
+import sqlite3
+import argparse
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.intent_classifier import IntentClassifier, UNKNOWN_INTENT
+
+LABELED_MESSAGES = [
+    ("Beden küçük geldi", "BEDEN"),
+    ("Bedeni çok büyük, üzerimde bol duruyor", "BEDEN"),
+    ("Kalıbı dar, omuzlardan sıkıyor", "BEDEN"),
+    ("M beden aldım ama S gibi geldi", "BEDEN"),
+    ("Ayakkabının numarası küçük", "BEDEN"),
+    ("Pantolon boyu kısa geldi, ölçüler tutmuyor", "BEDEN"),
+    ("Üzerime olmadı, bedenini değiştirmek istiyorum", "BEDEN"),
+    ("Ölçü tablosuna göre aldım yine de uymadı", "BEDEN"),
+    ("Çok dar geldi giyemiyorum", "BEDEN"),
+    ("Rengi fotoğraftakinden farklı", "RENK_STIL"),
+    ("Renk çok soluk duruyor", "RENK_STIL"),
+    ("Bej diye aldım sarıya çalıyor rengi", "RENK_STIL"),
+    ("Tarzıma uymadı açıkçası", "RENK_STIL"),
+    ("Bana hiç yakışmadı", "RENK_STIL"),
+    ("Deseni görseldeki gibi değil", "RENK_STIL"),
+    ("Tonu beklediğimden koyu", "RENK_STIL"),
+    ("Hiçbir şeyle kombinleyemedim, stilime uygun değil", "RENK_STIL"),
+    ("Dikişleri sökük geldi", "KUSURLU_URUN"),
+    ("Ürün yırtık geldi", "KUSURLU_URUN"),
+    ("Üzerinde leke var", "KUSURLU_URUN"),
+    ("Fermuarı bozuk, çalışmıyor", "KUSURLU_URUN"),
+    ("Kitaplığın bir rafı kırık geldi", "KUSURLU_URUN"),
+    ("Kumaşta delik var", "KUSURLU_URUN"),
+    ("Düğmesi kopuk ve ipi kaçmış", "KUSURLU_URUN"),
+    ("Kargoda hasar görmüş, çizik var", "KUSURLU_URUN"),
+    ("Defolu ürün gönderilmiş", "KUSURLU_URUN"),
+    ("Beklediğim gibi çıkmadı", "BEKLENTI_FARKI"),
+    ("Kalitesiz bir ürün, çok ucuz duruyor", "BEKLENTI_FARKI"),
+    ("Kumaşı çok ince", "BEKLENTI_FARKI"),
+    ("Hayal kırıklığı yaşadım", "BEKLENTI_FARKI"),
+    ("Gösterildiği gibi değil, kalitesi düşük", "BEKLENTI_FARKI"),
+    ("Düşündüğüm kadar şık değil", "BEKLENTI_FARKI"),
+    ("Sandığım gibi bir ürün değil", "BEKLENTI_FARKI"),
+    ("Fiyatına göre çok basit duruyor, beğenmedim", "BEKLENTI_FARKI"),
+    ("İade etmek istiyorum", UNKNOWN_INTENT),
+    ("Merhaba, siparişim hakkında bilgi alabilir miyim?", UNKNOWN_INTENT),
+    ("Vazgeçtim", UNKNOWN_INTENT),
+    ("Bunu geri göndermek istiyorum nasıl yapabilirim", UNKNOWN_INTENT),
+    ("Hediye almıştım ama kullanılmayacak", UNKNOWN_INTENT),
+    ("Beden uygun ama rengi farklı geldi", "RENK_STIL"),
+    ("Rengi güzel ama bedeni küçük", "BEDEN"),
+    ("Kumaşı kaliteli ama bedeni büyük", "BEDEN"),
+]
+
+
+def load_logged_messages(db_path: str) -> list:
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT message, intent FROM return_intents").fetchall()
+    finally:
+        conn.close()
+
+
+def evaluate(samples: list, threshold: float) -> dict:
+    classifier = IntentClassifier(threshold=threshold, mode="shadow")
+    confident, correct = 0, 0
+    confusion = Counter()
+    started = time.perf_counter()
+    for message, expected in samples:
+        predicted = classifier.confident(message)
+        if predicted is None: continue
+        confident += 1
+        if predicted == expected: correct += 1
+        else: confusion[(expected, predicted)] += 1
+    elapsed = time.perf_counter() - started
+    return {
+        "coverage": confident / len(samples),
+        "accuracy": correct / confident if confident else 0.0,
+        "avoided": confident,
+        "us_per_message": elapsed / len(samples) * 1e6,
+        "confusion": confusion,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.6, 0.75, 0.9])
+    parser.add_argument("--db", help="Modelin etiketlediği mesajların okunacağı iade kaydı veritabanı.")
+    args = parser.parse_args()
+
+    samples = load_logged_messages(args.db) if args.db else LABELED_MESSAGES
+    print(f"{len(samples)} mesaj")
+    print(f"{'eşik':>6} | {'kapsama':>8} {'doğruluk':>9} {'atlanan çağrı':>14} {'µs/mesaj':>9}")
+    for threshold in args.thresholds:
+        result = evaluate(samples, threshold)
+        print(f"{threshold:>6.2f} | {result['coverage']:>7.1%} {result['accuracy']:>9.1%} "
+              f"{result['avoided']:>14} {result['us_per_message']:>9.1f}")
+        for (expected, predicted), count in result["confusion"].most_common(5):
+            print(f"{'':>8} hata: {expected} -> {predicted} ({count})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""API sunucusunu Gemini yerine sentetik model arka ucuyla (MODEL_BACKEND=synthetic) başlatır.
+
+Sentetik arka uç prompt'a göre sabit JSON döndürür; gecikme dağılımı, karakter başına üretim süresi,
+hata ve bozuk yanıt oranı ayarlanabilir (bkz. services/model_backend.py).
+
+Kullanım (backend klasöründen):
+    python benchmarks/stub_server.py --port 8100 --latency 0.05
+    python benchmarks/stub_server.py --latency lognormal:0.8,0.5 --failure-rate 0.02 --seed 1
+    python benchmarks/stub_server.py --catalog-size 100000
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MODEL_BACKEND", "synthetic")
+
+
+def install_synthetic_backend(latency="fixed:0", seconds_per_output_char: float = 0.0, failure_rate: float = 0.0,
+                              malformed_rate: float = 0.0, seed=None):
+    """Aynı süreçte import edilmiş uygulamanın model arka ucunu sentetik arka uçla değiştirir."""
+    from services import gemini_service
+    from services.model_backend import SyntheticBackend
+    gemini_service.set_backend(SyntheticBackend(latency, seconds_per_output_char, failure_rate, malformed_rate, seed))
+
+
+def install_synthetic_catalog(size: int):
+    """products.json'daki ürünlere `size` sentetik ürün ekler. Gerçek ürünler korunur; sentetik
+    arka ucun kombin yanıtlarındaki isimler katalogda bulunmaya devam eder."""
+    import main as app_module
+    from services.product_catalog import ProductCatalog
+    from services.style_matcher import StyleMatcher
+    from benchmarks.synthetic_catalog import generate_products
+    products = list(app_module.catalog)
+    first_id = max(p["id"] for p in products) + 1
+    for offset, product in enumerate(generate_products(size)):
+        product["id"] = first_id + offset
+        products.append(product)
+    app_module.catalog = ProductCatalog(products)
+    app_module.style_matcher = StyleMatcher(app_module.catalog)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", default="0", help="İlk parçaya kadar gecikme: saniye ya da 'uniform:a,b', 'lognormal:medyan,sigma', 'exp:ortalama'.")
+    parser.add_argument("--seconds-per-char", type=float, default=0.0, help="Yanıtın karakter başına üretim süresi.")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Hata fırlatan çağrıların oranı.")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Kesilmiş (bozuk JSON) yanıtların oranı.")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--catalog-size", type=int, default=0, help="Kataloğa eklenecek sentetik ürün sayısı.")
+    args = parser.parse_args()
+
+    import uvicorn
+    import main as app_module
+    install_synthetic_backend(args.latency, args.seconds_per_char, args.failure_rate, args.malformed_rate, args.seed)
+    if args.catalog_size: install_synthetic_catalog(args.catalog_size)
+    uvicorn.run(app_module.app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import random
+
+# Benchmark'lar için products.json şemasına uyan sentetik katalog üretir.
+
+STYLE_TAGS = ["bohem", "klasik", "minimalist", "günlük", "rahat", "modern", "ofis", "smart-casual", "spor", "şehirli",
+              "şık", "gece", "özel gün", "feminen", "davet", "sokak modası", "oversize", "retro", "90lar", "vintage",
+              "rock", "zamansız", "romantik", "yazlık", "endüstriyel"]
+COLOR_TAGS = ["bej", "krem", "toprak", "siyah", "antrasit", "beyaz", "yeşil", "zümrüt", "gri", "mavi", "denim",
+              "sarı", "hardal", "pembe", "kırmızı", "lacivert", "kahverengi", "bordo", "haki", "mor"]
+SEASON_TAGS = ["ilkbahar", "yaz", "sonbahar", "kış", "tüm mevsimler"]
+MATERIALS = ["keten", "pamuk", "deri", "saten", "denim", "viskon", "yün", "kadife", "polyester", "kaşmir"]
+BODY_TYPES = ["armut", "elma", "kum saati", "dikdörtgen", "tümü"]
+ITEM_TYPES = {
+    "Gömlek": ("giyim", "ust_giyim"), "Hoodie": ("giyim", "ust_giyim"), "Kazak": ("giyim", "ust_giyim"),
+    "Pantolon": ("giyim", "alt_giyim"), "Jean": ("giyim", "alt_giyim"), "Etek": ("giyim", "alt_giyim"),
+    "Sneaker": ("giyim", "ayakkabi"), "Bot": ("giyim", "ayakkabi"), "Elbise": ("giyim", "elbise"),
+    "Ceket": ("giyim", "dis_giyim"), "Berjer": ("mobilya", "oturma"), "Kitaplık": ("mobilya", "depolama"),
+}
+
+# Etiket vokabülerini büyütmek için varyantlar; gerçek kataloglarda etiket sayısı ürün sayısıyla birlikte artar.
+TAG_VARIANTS = 40
+
+
+def generate_products(count: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    styles = STYLE_TAGS + [f"{t} {i}" for t in STYLE_TAGS for i in range(TAG_VARIANTS)]
+    colors = COLOR_TAGS + [f"{c} {i}" for c in COLOR_TAGS for i in range(TAG_VARIANTS // 4)]
+    item_types = list(ITEM_TYPES)
+    products = []
+    for product_id in range(1, count + 1):
+        item_type = rng.choice(item_types)
+        category, subcategory = ITEM_TYPES[item_type]
+        color = rng.choice(COLOR_TAGS)
+        products.append({
+            "id": product_id,
+            "name": f"{color.title()} {rng.choice(MATERIALS).title()} {item_type} {product_id}",
+            "category": category,
+            "subcategory": subcategory,
+            "price": f"{rng.randint(200, 6000)}.00 TL",
+            "image": "static/img/gomlek1.webp",
+            "style_tags": rng.sample(styles, rng.randint(2, 6)),
+            "color_tags": [color] + rng.sample(colors, rng.randint(0, 2)),
+            "season_tags": rng.sample(SEASON_TAGS, rng.randint(1, 3)),
+            "cut_style": "düz kesim",
+            "material": rng.choice(MATERIALS),
+            "uygun_vucut_tipleri": rng.sample(BODY_TYPES, rng.randint(1, 3)),
+        })
+    return products
@@ -1,24 +1,70 @@
 import os
 import sys
 import json
-from fastapi import FastAPI, File, UploadFile, HTTPException
+import time
+import asyncio
+import orjson
+from fastapi import FastAPI, File, Form, UploadFile, HTTPException, Query, Request, Response, Header
+from fastapi.responses import ORJSONResponse, StreamingResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from collections import Counter, defaultdict
-from typing import List
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from pydantic import ValidationError
 
-from services import gemini_service
-from models.chat_models import ChatRequest, VisualComboRequest, FitScoreRequest, EventStylistRequest
+from services import gemini_service, model_executor, metrics
+from services.model_executor import run_model_call, stream_model_call, ModelCallTimeout
+from services.json_stream import IncrementalJSONParser
+from services.stage_pipeline import Stage, StagePipeline, StageTimeout
+from services.product_catalog import ProductCatalog
+from services.style_matcher import StyleMatcher
+from services.analysis_cache import analysis_cache
+from services.chat_cache import chat_cache
+from services.fit_score import fit_score_engine
+from services.intent_classifier import intent_classifier
+from services.image_preprocess import image_preprocessor
+from services.return_analytics import ReturnAnalytics, WINDOWS
+from services.return_store import create_return_store
+from services.trend_scheduler import TrendAnalysisScheduler
+from services.metrics import MetricsMiddleware, stage_seconds
+from services import profiler
+from services.profiler import ProfilingMiddleware, ProfilerBusy
+from services.upload_limits import UploadSizeLimitMiddleware, UploadTooLarge, InvalidImage, read_image_upload
+from models.gemini_schemas import StyleAdvice, Combination, EventCombinations
+from models.chat_models import ChatRequest, VisualComboRequest, FitScoreRequest, FitScoreBatchRequest, EventStylistRequest
+from models.response_models import (
+    Product, ProductSearchResponse, ProductBatchResponse, FitScoreResponse, FitScoreBatchResponse,
+    AnalyzeStyleResponse, ChatResponse, StyleProfileResponse, EventStylistResponse,
+    ReturnAnalyticsResponse, StrategicOverviewResponse,
+)
 from dotenv import load_dotenv
 
 load_dotenv()
 
-app = FastAPI(title="StilDöngüsü API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Daha önce kurulmuş bir arka uç (ör. benchmark'ların sentetik modeli) korunur.
+    if gemini_service.backend is None: gemini_service.configure_model_backend(API_KEY)
+    warm_up = asyncio.create_task(asyncio.to_thread(gemini_service.warm_up_backend)) if gemini_service.MODEL_WARMUP else None
+    await asyncio.to_thread(return_store.load, return_analytics)
+    return_store.start()
+    if gemini_service.is_configured: trend_scheduler.start()
+    yield
+    if warm_up is not None: await warm_up
+    await trend_scheduler.stop()
+    await asyncio.to_thread(return_store.close)
+    model_executor.executor.shutdown()
+    image_preprocessor.shutdown()
+
+app = FastAPI(title="StilDöngüsü API", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 origins = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
 ]
 
+app.add_middleware(UploadSizeLimitMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilingMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -28,141 +74,527 @@ app.add_middleware(
 )
 
 API_KEY = os.getenv("GEMINI_API_KEY")
-if API_KEY:
-    gemini_service.configure_gemini(API_KEY)
 
-with open('products.json', 'r', encoding='utf-8') as f:
-    products_db = json.load(f)
+PRODUCTS_PATH = os.getenv("PRODUCTS_PATH", "products.json")
+catalog = ProductCatalog.from_json(PRODUCTS_PATH)
+style_matcher = StyleMatcher(catalog)
+FIT_SCORE_BATCH_MAX = int(os.getenv("FIT_SCORE_BATCH_MAX", "200"))
+FIT_SCORE_PROMPT_CHUNK = int(os.getenv("FIT_SCORE_PROMPT_CHUNK", "20"))
+PRODUCTS_BATCH_MAX = int(os.getenv("PRODUCTS_BATCH_MAX", "200"))
+ANALYZE_ADVICE_TIMEOUT = float(os.getenv("ANALYZE_ADVICE_TIMEOUT", "30"))
+ANALYZE_FIT_SCORE_TIMEOUT = float(os.getenv("ANALYZE_FIT_SCORE_TIMEOUT", "10"))
+ANALYZE_FIT_SCORE_TOP = int(os.getenv("ANALYZE_FIT_SCORE_TOP", "3"))
+
+return_analytics = ReturnAnalytics()
+return_store = create_return_store()
+
+def build_trend_input() -> dict:
+    return {
+        "sales_trends": {"Bej Keten Gömlek": -25, "Deri Biker Ceket": 40},
+        "top_searches": ["oversize ceket", "keten pantolon", "yazlık elbise"],
+        "recent_return_feedback_summary": return_analytics.feedback_summary()
+    }
+
+async def compute_strategic_overview() -> dict:
+    result = await run_model_call("trend_analysis", gemini_service.get_trend_analysis, build_trend_input())
+    return result.get("strategic_overview", {})
 
-return_intents_db = [] 
+trend_scheduler = TrendAnalysisScheduler(return_analytics, compute_strategic_overview)
 
-@app.post("/api/analyze-style")
-async def analyze_style_api(file: UploadFile = File(...)):
-    if not API_KEY: raise HTTPException(status_code=500, detail="Sunucu yapılandırma hatası.")
-    if not file.content_type.startswith("image/"): raise HTTPException(status_code=400, detail="Lütfen bir resim dosyası yükleyin.")
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def read_style_upload(file: UploadFile):
     try:
-        image_bytes = await file.read()
-        analysis_data = gemini_service.analyze_image_style(image_bytes)
-        matched_products = gemini_service.find_matching_products(analysis_data, products_db)
-        style_advice_data = gemini_service.get_style_advice(analysis_data.get('item_description'), matched_products)
-        return { "image_analysis": analysis_data, "style_advice": style_advice_data, "matched_products": matched_products }
+        return await read_image_upload(file)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidImage:
+        raise HTTPException(status_code=400, detail="Lütfen bir resim dosyası yükleyin.")
+
+async def analyze_upload(upload) -> dict:
+    # Aynı görsel daha önce analiz edildiyse model çağrısı atlanır
+    with stage_seconds.time("analyze_style", "cache_lookup"):
+        analysis_data = await asyncio.to_thread(analysis_cache.lookup, upload.sha256)
+    if analysis_data is None:
+        started_at = time.perf_counter()
+        with stage_seconds.time("analyze_style", "preprocess"):
+            processed_bytes = await image_preprocessor.process(upload.source)
+        phash, analysis_data = await asyncio.to_thread(analysis_cache.lookup_similar, processed_bytes)
+        if analysis_data is None:
+            analysis_data = await run_model_call("analyze_style", gemini_service.analyze_image_style, processed_bytes)
+            await asyncio.to_thread(analysis_cache.store, upload.sha256, phash, analysis_data, time.perf_counter() - started_at)
+    return analysis_data
+
+# analyze-style aşamaları: analiz -> eşleştirme -> {tavsiye, fit puanları}. Tavsiye yalnızca ürün
+# açıklaması ile eşleşen ürün isimlerine ihtiyaç duyduğu için fit puanlarıyla eşzamanlı çalışır;
+# ikisi de zorunlu değildir, zaman aşımında yanıt onlarsız (partial) döner.
+async def analysis_stage(results: dict):
+    return await analyze_upload(results["upload"])
+
+async def matching_stage(results: dict):
+    return gemini_service.find_matching_products(results["analysis"], style_matcher)
+
+async def advice_stage(results: dict):
+    return await run_model_call("analyze_style", gemini_service.get_style_advice, results["analysis"].get('item_description'), results["matching"])
+
+async def fit_scores_stage(results: dict):
+    if not results["body_type"]: return None
+    products = results["matching"][:ANALYZE_FIT_SCORE_TOP]
+    entries = await score_products(results["body_type"], products, include_reasoning=False)
+    return [{"product_id": p["id"], **entry} for p, entry in zip(products, entries)]
+
+analyze_style_pipeline = StagePipeline([
+    Stage("analysis", analysis_stage),
+    Stage("matching", matching_stage, deps=("analysis",)),
+    Stage("advice", advice_stage, deps=("matching",), timeout=ANALYZE_ADVICE_TIMEOUT, required=False),
+    Stage("fit_scores", fit_scores_stage, deps=("matching",), timeout=ANALYZE_FIT_SCORE_TIMEOUT, required=False),
+], name="analyze_style")
+
+@app.post("/api/analyze-style", response_model=AnalyzeStyleResponse)
+async def analyze_style_api(response: Response, file: UploadFile = File(...), body_type: Optional[str] = Form(None)):
+    """Görseli analiz eder, eşleşen ürünleri ve stil tavsiyesini döndürür. `body_type` verilirse ilk
+    eşleşmelerin fit puanları da eklenir. Aşama süreleri Server-Timing başlığında döner."""
+    if not gemini_service.is_configured: raise HTTPException(status_code=500, detail="Sunucu yapılandırma hatası.")
+    with stage_seconds.time("analyze_style", "upload"):
+        upload = await read_style_upload(file)
+    try:
+        result = await analyze_style_pipeline.run(upload=upload, body_type=body_type)
+    except (ModelCallTimeout, StageTimeout) as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analiz sırasında hata: {str(e)}")
+    finally:
+        upload.close()
+    response.headers["Server-Timing"] = result.server_timing()
+    return {
+        "image_analysis": result.get("analysis"),
+        "style_advice": result.get("advice"),
+        "matched_products": result.get("matching"),
+        "fit_scores": result.get("fit_scores"),
+        "partial": result.partial,
+        "failed_stages": result.failed,
+    }
+
+@app.get("/api/analyze-style/stats")
+async def get_analyze_style_stats():
+    """analyze-style aşamalarının süre dağılımı, zaman aşımı ve kısmi yanıt sayıları."""
+    return analyze_style_pipeline.stats()
+
+@app.post("/api/analyze-style/stream")
+async def analyze_style_stream_api(file: UploadFile = File(...)):
+    """analyze-style'ın SSE sürümü: görsel analizi ve eşleşen ürünler hazır olur olmaz, tavsiye ise
+    alan alan gönderilir. Olaylar: analysis, products, advice_field, advice, done (hata olursa error)."""
+    if not gemini_service.is_configured: raise HTTPException(status_code=500, detail="Sunucu yapılandırma hatası.")
+    with stage_seconds.time("analyze_style", "upload"):
+        upload = await read_style_upload(file)
+
+    async def events():
+        started = time.perf_counter()
+        elapsed_ms = lambda: round((time.perf_counter() - started) * 1000, 1)
+        timings = {}
+        try:
+            analysis_data = await analyze_upload(upload)
+            timings["analysis_ms"] = elapsed_ms()
+            yield sse_event("analysis", analysis_data)
+            matched_products = gemini_service.find_matching_products(analysis_data, style_matcher)
+            yield sse_event("products", matched_products)
+
+            parser, text = IncrementalJSONParser(), ""
+            async for chunk in stream_model_call("analyze_style", gemini_service.stream_style_advice, analysis_data.get('item_description'), matched_products):
+                text += chunk
+                for kind, key, value in parser.feed(chunk):
+                    if kind != "field": continue
+                    timings.setdefault("first_advice_field_ms", elapsed_ms())
+                    yield sse_event("advice_field", {"key": key, "value": value})
+            # Son tavsiye akış bitince tüm metinden StyleAdvice ile doğrulanır; akışsız sürümle aynıdır.
+            advice = gemini_service.parse_gemini_json_response(text, StyleAdvice)
+            yield sse_event("advice", advice)
+            timings["total_ms"] = elapsed_ms()
+            yield sse_event("done", {"timings": timings})
+        except ModelCallTimeout as e:
+            yield sse_event("error", {"status": 504, "detail": str(e)})
+        except Exception as e:
+            yield sse_event("error", {"status": 500, "detail": f"Analiz sırasında hata: {str(e)}"})
+        finally:
+            upload.close()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+def record_return(product_name: str, intent: str, message: str):
+    recorded_at = time.time()
+    seq = return_analytics.record(product_name, intent, message, recorded_at)
+    return_store.append(seq, product_name, intent, message, recorded_at)
 
-@app.post("/api/chat")
+@app.post("/api/chat", response_model=ChatResponse)
 async def chat_api(chat_request: ChatRequest):
-    if not API_KEY: raise HTTPException(status_code=500, detail="Sunucu yapılandırma hatası.")
+    if not gemini_service.is_configured: raise HTTPException(status_code=500, detail="Sunucu yapılandırma hatası.")
+    started = time.perf_counter()
+    product, message = chat_request.product, chat_request.message
     try:
-        reply_data = gemini_service.get_chatbot_reply(chat_request.message)
+        reply_data = chat_cache.lookup(product, message)
+        cached = reply_data is not None
+        local_intent = intent_classifier.confident(message) if not cached and intent_classifier.mode != "off" else None
+        if local_intent and intent_classifier.mode == "answer":
+            # Niyet açıkça belliyse model hiç çağrılmadan şablon yanıt verilir.
+            reply_data = intent_classifier.template_reply(local_intent)
+            record_return(product, local_intent, message)
+            return reply_data
+
+        if not cached:
+            reply_data = await run_model_call("chat", gemini_service.get_chatbot_reply, message)
+            intent_classifier.observe_model_intent(local_intent, reply_data.get("detected_intent"))
+            # record modunda emin olunan yerel niyet modelinkinin yerine geçer; model çağrısı
+            # başarısız olursa hiçbir şey kaydedilmez. Yanıt single-flight ile eşzamanlı isteklerle
+            # paylaşıldığı için değiştirilmez, kopyalanır.
+            if local_intent and intent_classifier.mode == "record": reply_data = {**reply_data, "detected_intent": local_intent}
+            chat_cache.store(product, message, reply_data)
         if reply_data.get("detected_intent"):
-            return_intents_db.append({"product_name": chat_request.product, "intent": reply_data["detected_intent"], "message": chat_request.message})
+            record_return(product, reply_data["detected_intent"], message)
+        chat_cache.observe(cached, time.perf_counter() - started)
         return reply_data
+    except ModelCallTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chatbot hatası: {str(e)}")
 
-@app.post("/api/create-style-profile")
+@app.post("/api/create-style-profile", response_model=StyleProfileResponse)
 async def create_style_profile_api(files: List[UploadFile] = File(...)):
-    if not API_KEY: raise HTTPException(status_code=500, detail="Sunucu yapılandırma hatası.")
+    if not gemini_service.is_configured: raise HTTPException(status_code=500, detail="Sunucu yapılandırma hatası.")
     if len(files) < 2: raise HTTPException(status_code=400, detail="En az 2 resim yükleyin.")
-    image_bytes_list = [await file.read() for file in files if file.content_type.startswith("image/")]
-    if len(image_bytes_list) != len(files): raise HTTPException(status_code=400, detail="Lütfen sadece resim dosyaları yükleyin.")
+    uploads = []
+    try:
+        for file in files:
+            uploads.append(await read_image_upload(file))
+    except UploadTooLarge as e:
+        for upload in uploads: upload.close()
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidImage:
+        for upload in uploads: upload.close()
+        raise HTTPException(status_code=400, detail="Lütfen sadece resim dosyaları yükleyin.")
     try:
-        return await app.loop.run_in_executor(None, gemini_service.create_style_profile, image_bytes_list)
+        processed_list = await asyncio.gather(*(image_preprocessor.process(u.source) for u in uploads))
+        return await run_model_call("create_style_profile", gemini_service.create_style_profile, list(processed_list))
+    except ModelCallTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Stil profili oluşturma hatası: {str(e)}")
+    finally:
+        for upload in uploads: upload.close()
+
+@app.get("/api/products/match", response_model=ProductSearchResponse)
+async def match_products_api(style_tags: List[str] = Query([]), color_tags: List[str] = Query([]), seasons: List[str] = Query([]), category: str = None, limit: int = Query(6, ge=1, le=50), offset: int = Query(0, ge=0)):
+    """Analiz sonucundaki etiketlerle eşleşen ürünleri sayfalı ve puan sıralı döndürür."""
+    query = {"style_tags": style_tags, "color_tags": color_tags, "season_tags": seasons}
+    return style_matcher.search(query, limit=limit, offset=offset, category=category)
+
+@app.get("/api/products", response_model=ProductBatchResponse)
+async def get_products(ids: str = Query(..., description="Virgülle ayrılmış ürün id'leri, örn. 1,2,3")):
+    """Listeleme sayfaları için birden çok ürünü istenen sırayla tek istekte döndürür."""
+    try:
+        product_ids = list(dict.fromkeys(int(pid) for pid in ids.split(",") if pid.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Ürün id'leri virgülle ayrılmış sayılar olmalı.")
+    if len(product_ids) > PRODUCTS_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"Tek istekte en fazla {PRODUCTS_BATCH_MAX} ürün istenebilir.")
+    # Ürünlerin önceden serileştirilmiş baytları birleştirilir; yanıt yeniden serileştirilmez.
+    encoded = [catalog.product_json(pid) for pid in product_ids]
+    missing = [pid for pid, e in zip(product_ids, encoded) if e is None]
+    body = b'{"products":[' + b",".join(e for e in encoded if e is not None) + b'],"missing_ids":' + orjson.dumps(missing) + b"}"
+    return Response(body, media_type="application/json")
 
-@app.get("/api/products/{product_id}")
+@app.get("/api/products/{product_id}", response_model=Product)
 async def get_product(product_id: int):
-    product = next((p for p in products_db if p["id"] == product_id), None)
-    if not product: raise HTTPException(status_code=404, detail="Ürün bulunamadı.")
-    return product
+    encoded = catalog.product_json(product_id)
+    if encoded is None: raise HTTPException(status_code=404, detail="Ürün bulunamadı.")
+    return Response(encoded, media_type="application/json")
 
-@app.post("/api/fit-score")
+async def complete_fit_score(user_body_type: str, product: dict, entry: dict) -> dict:
+    """Önbellekte eksik olan gerekçeyi (llm modunda puanı da) modelden alıp saklar."""
+    if fit_score_engine.mode == "llm":
+        result = await run_model_call("fit_score", gemini_service.get_fit_score, user_body_type, product)
+    else:
+        result = await run_model_call("fit_score", gemini_service.get_fit_reasoning, user_body_type, product, entry["fit_score"])
+    return fit_score_engine.store(user_body_type, product, result.get("fit_score"), result.get("reasoning"))
+
+@app.post("/api/fit-score", response_model=FitScoreResponse)
 async def get_fit_score_api(request: FitScoreRequest):
-    if not API_KEY: raise HTTPException(status_code=500, detail="Sunucu yapılandırma hatası.")
-    product = next((p for p in products_db if p["id"] == request.product_id), None)
+    product = catalog.get(request.product_id)
     if not product: raise HTTPException(status_code=404, detail="Ürün bulunamadı.")
+    entry = fit_score_engine.get(request.user_body_type, product)
+    if not fit_score_engine.needs_model(entry, request.include_reasoning): return entry
+    if not gemini_service.is_configured: raise HTTPException(status_code=500, detail="Sunucu yapılandırma hatası.")
     try:
-        return gemini_service.get_fit_score(request.user_body_type, product)
+        return await complete_fit_score(request.user_body_type, product, entry)
+    except ModelCallTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Fit Puanı oluşturma hatası: {str(e)}")
 
-# main.py dosyasında, sadece bu fonksiyonu güncelleyin.
+async def score_products(user_body_type: str, products: list, include_reasoning: bool) -> list:
+    """Ürünlerin puanlarını önbellekten alır; eksikleri (gerekçeler istenmedikçe yalnızca llm modunda)
+    FIT_SCORE_PROMPT_CHUNK'lık gruplar halinde tek prompt'ta modelden üretir."""
+    entries = [fit_score_engine.get(user_body_type, p) for p in products]
+    pending = [i for i, entry in enumerate(entries) if fit_score_engine.needs_model(entry, include_reasoning)]
+    if not pending: return entries
+    if not gemini_service.is_configured: raise HTTPException(status_code=500, detail="Sunucu yapılandırma hatası.")
+    chunks = [pending[i:i + FIT_SCORE_PROMPT_CHUNK] for i in range(0, len(pending), FIT_SCORE_PROMPT_CHUNK)]
+    results = await asyncio.gather(*(
+        run_model_call("fit_score", gemini_service.get_fit_scores_batch, user_body_type,
+                       [(products[i], entries[i]["fit_score"]) for i in chunk])
+        for chunk in chunks
+    ), return_exceptions=True)
+    for chunk, result in zip(chunks, results):
+        # Bir grubun üretilememesi diğer puanları düşürmez; o ürünlerin gerekçesi boş kalır.
+        if isinstance(result, Exception):
+            print(f"Toplu Fit Puanı Hatası: {result}", file=sys.stderr)
+            continue
+        for i in chunk:
+            generated = result.get(products[i]["id"])
+            if generated:
+                entries[i] = fit_score_engine.store(user_body_type, products[i], generated.get("fit_score"), generated["reasoning"])
+    return entries
+
+@app.post("/api/fit-score/batch", response_model=FitScoreBatchResponse)
+async def get_fit_score_batch_api(request: FitScoreBatchRequest):
+    """Bir vücut tipi için birden çok ürünün puanını tek istekte döndürür; gerekçeler istenmedikçe model çağrılmaz."""
+    if len(request.product_ids) > FIT_SCORE_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"Tek istekte en fazla {FIT_SCORE_BATCH_MAX} ürün puanlanabilir.")
+    product_ids = list(dict.fromkeys(request.product_ids))
+    missing = [pid for pid in product_ids if catalog.get(pid) is None]
+    products = [catalog.get(pid) for pid in product_ids if pid not in missing]
+    entries = await score_products(request.user_body_type, products, request.include_reasoning)
+    return {
+        "user_body_type": request.user_body_type,
+        "scores": [{"product_id": p["id"], **entry} for p, entry in zip(products, entries)],
+        "missing_product_ids": missing
+    }
+
+@app.get("/api/fit-score/stats")
+async def get_fit_score_stats():
+    """Fit puanı önbelleğinin isabet oranını ve üretilen gerekçe sayısını döndürür."""
+    return fit_score_engine.stats()
 
-@app.post("/api/event-stylist")
+def enrich_combination(combo: dict):
+    """Kombindeki ürün isimlerini katalogdaki tam ürün objeleriyle değiştirir; hiçbiri bulunamazsa None."""
+    # Katalogdaki isim indeksinden tam ürün objelerini bul
+    enriched_items = catalog.find_by_names(combo.get("items", []))
+    if not enriched_items: return None
+    return {
+        "title": combo["title"],
+        "vibe": combo["vibe"],
+        "items": enriched_items  # İsim listesi yerine obje listesi
+    }
+
+def validate_combination(value):
+    """Akıştan gelen tek kombini Combination şemasıyla doğrular; uymuyorsa None (kombin atlanır)."""
+    try:
+        return Combination.model_validate(value).model_dump()
+    except ValidationError:
+        return None
+
+@app.post("/api/event-stylist", response_model=EventStylistResponse)
 async def event_stylist_api(request: EventStylistRequest):
     """Kullanıcının isteğine göre kombin önerileri sunar ve ürün detaylarını ekler."""
-    if not API_KEY:
+    if not gemini_service.is_configured:
         raise HTTPException(status_code=500, detail="Sunucu yapılandırma hatası.")
     try:
         # Adım 1: Gemini'den metin tabanlı kombin önerilerini al
-        combinations_from_gemini = gemini_service.get_event_style_combinations(request.user_request, products_db)
+        combinations_from_gemini = await run_model_call("event_stylist", gemini_service.get_event_style_combinations, request.user_request, catalog)
 
         # Adım 2: Gelen isimleri tam ürün objeleriyle zenginleştir
-        enriched_combinations = []
-        for combo in combinations_from_gemini.get("combinations", []):
-            enriched_items = []
-            for item_name in combo.get("items", []):
-                # Veritabanında tam ürün objesini bul
-                product_obj = next((p for p in products_db if p["name"].strip().lower() == item_name.strip().lower()), None)
-                if product_obj:
-                    enriched_items.append(product_obj)
-            
-            # Eğer ürünler bulunduysa, yeni kombini listeye ekle
-            if enriched_items:
-                enriched_combinations.append({
-                    "title": combo["title"],
-                    "vibe": combo["vibe"],
-                    "items": enriched_items  # İsim listesi yerine obje listesi
-                })
+        enriched_combinations = [c for c in map(enrich_combination, combinations_from_gemini.get("combinations", [])) if c]
 
         return {"combinations": enriched_combinations}
 
+    except ModelCallTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         print(f"Stilist Hatası: {e}", file=sys.stderr)
         raise HTTPException(status_code=500, detail=f"Stilist önerisi oluşturulurken bir hata oluştu: {str(e)}")
 
-@app.get("/api/return-analytics")
-async def get_return_analytics():
-    product_analysis = []
-    
-    # Ürünlere göre iadeleri grupla (bu kısım doğru)
-    returns_by_product = defaultdict(list)
-    if return_intents_db:
-        for intent_data in return_intents_db:
-            returns_by_product[intent_data["product_name"]].append(intent_data)
-        
-        for product_name, returns in returns_by_product.items():
-            counts = Counter(r["intent"] for r in returns)
-            product_analysis.append({
-                "product_name": product_name,
-                "total_returns": len(returns),
-                "reasons": sorted([{"intent": i, "count": c, "percentage": round((c / len(returns)) * 100, 1)} for i, c in counts.items()], key=lambda x: x['percentage'], reverse=True)
-            })
-
-    # DÜZELTME: "recent_return_feedback_summary" oluştururken,
-    # 'product_analysis' yerine orijinal veriyi içeren 'returns_by_product' sözlüğünü kullanıyoruz.
-    simulated_data = {
-        "sales_trends": {"Bej Keten Gömlek": -25, "Deri Biker Ceket": 40},
-        "top_searches": ["oversize ceket", "keten pantolon", "yazlık elbise"],
-        "recent_return_feedback_summary": {
-            product_name: [r["message"] for r in returns] 
-            for product_name, returns in returns_by_product.items()
-        }
+@app.post("/api/event-stylist/stream")
+async def event_stylist_stream_api(request: EventStylistRequest):
+    """event-stylist'in SSE sürümü: her kombin model yazmayı bitirdiği anda `combination` olayı olarak gönderilir."""
+    if not gemini_service.is_configured: raise HTTPException(status_code=500, detail="Sunucu yapılandırma hatası.")
+
+    async def events():
+        started = time.perf_counter()
+        elapsed_ms = lambda: round((time.perf_counter() - started) * 1000, 1)
+        timings, sent, seen = {}, 0, 0
+        try:
+            parser, text = IncrementalJSONParser(), ""
+            async for chunk in stream_model_call("event_stylist", gemini_service.stream_event_style_combinations, request.user_request, catalog):
+                text += chunk
+                for kind, key, value in parser.feed(chunk):
+                    if kind != "item" or key != "combinations": continue
+                    seen += 1
+                    combo = validate_combination(value)
+                    combination = combo and enrich_combination(combo)
+                    if not combination: continue
+                    timings.setdefault("first_combination_ms", elapsed_ms())
+                    sent += 1
+                    yield sse_event("combination", combination)
+            if not parser.finished:
+                # Akışta zaten işlenmiş kombinler tekrar gönderilmez.
+                for combo in gemini_service.parse_gemini_json_response(text, EventCombinations)["combinations"][seen:]:
+                    combination = enrich_combination(combo)
+                    if combination:
+                        sent += 1
+                        yield sse_event("combination", combination)
+            timings["total_ms"] = elapsed_ms()
+            yield sse_event("done", {"count": sent, "timings": timings})
+        except ModelCallTimeout as e:
+            yield sse_event("error", {"status": 504, "detail": str(e)})
+        except Exception as e:
+            print(f"Stilist Hatası: {e}", file=sys.stderr)
+            yield sse_event("error", {"status": 500, "detail": f"Stilist önerisi oluşturulurken bir hata oluştu: {str(e)}"})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+@app.get("/api/return-analytics", response_model=ReturnAnalyticsResponse)
+async def get_return_analytics(window: Optional[str] = Query(None, pattern="^(" + "|".join(WINDOWS) + ")$")):
+    """İade analizini döndürür; `window` verilirse (hour/day/week) yalnızca o dönemin iadeleri sayılır."""
+    if window:
+        summary = return_analytics.window_analysis(window)
+    else:
+        summary = {"total_returns": return_analytics.total_returns, "product_analysis": return_analytics.product_analysis()}
+
+    # Stratejik analiz arka planda üretilir; burada yalnızca önbellekteki sonuç okunur.
+    trend = trend_scheduler.get()
+    return {
+        "total_returns": summary["total_returns"],
+        "product_analysis": summary["product_analysis"],
+        "window": window,
+        "strategic_overview": trend["strategic_overview"],
+        "strategic_overview_meta": trend["meta"]
     }
 
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match virgülle ayrılmış bir liste olabilir; karşılaştırma zayıftır (W/ öneki yok sayılır), `*` her şeyle eşleşir."""
+    if not if_none_match: return False
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag == "*" or tag.removeprefix("W/") == f'"{etag}"' for tag in tags)
+
+@app.get("/api/return-analytics/strategic-overview", response_model=StrategicOverviewResponse)
+async def get_strategic_overview(request: Request):
+    """Önbellekteki stratejik analizi ETag ile döndürür; değişmediyse 304."""
+    trend = trend_scheduler.get()
+    etag = trend["meta"]["etag"]
+    if etag and etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": f'"{etag}"'})
+    headers = {"ETag": f'"{etag}"'} if etag else {}
+    return ORJSONResponse(trend, headers=headers)
+
+@app.post("/api/return-analytics/strategic-overview/refresh", response_model=StrategicOverviewResponse)
+async def refresh_strategic_overview(wait: bool = True):
+    """Stratejik analizi hemen yeniden üretir; `wait=false` ise yenilemeyi arka planda başlatır."""
+    if not gemini_service.is_configured: raise HTTPException(status_code=500, detail="Sunucu yapılandırma hatası.")
+    task = trend_scheduler.refresh()
+    if wait: await task
+    return trend_scheduler.get()
+
+@app.get("/api/model-calls/stats")
+async def get_model_call_stats():
+    """Endpoint başına kuyruk derinliği ve model çağrısı istatistiklerini döndürür."""
+    return model_executor.get_stats()
+
+@app.get("/api/model-responses/stats")
+async def get_model_response_stats():
+    """Model yanıtlarının şema başına ayrıştırma yöntemi, hata oranı ve ayrıştırma süresi."""
+    return gemini_service.get_parse_stats()
+
+@app.get("/api/model-backend/stats")
+async def get_model_backend_stats():
+    """Etkin model arka ucu (gemini/record/replay/synthetic) ve çağrı sayıları."""
+    return gemini_service.get_backend_stats()
+
+@app.get("/api/model-calls/single-flight")
+async def get_single_flight_stats():
+    """Aynı fonksiyon ve argümanlarla eşzamanlı gelip tek model çağrısında birleştirilen istek sayılarını endpoint başına döndürür."""
+    return model_executor.get_single_flight_stats()
+
+@app.get("/api/analysis-cache/stats")
+async def get_analysis_cache_stats():
+    """Görsel analiz önbelleğinin isabet oranını ve kazandırdığı süreyi döndürür."""
+    return analysis_cache.stats()
+
+@app.get("/api/chat-cache/stats")
+async def get_chat_cache_stats():
+    """Chat yanıt önbelleğinin isabet oranını ve önbellekli/önbelleksiz yanıt sürelerini döndürür."""
+    return chat_cache.stats()
+
+@app.get("/api/intent-classifier/stats")
+async def get_intent_classifier_stats():
+    """Yerel niyet sınıflandırıcısının kapsamasını, modelle uyumunu ve atlanan model çağrılarını döndürür."""
+    return intent_classifier.stats()
+
+@app.get("/api/return-store/stats")
+async def get_return_store_stats():
+    """İade kaydının yazma kuyruğunu, toplu yazma ve açılıştaki kurtarma istatistiklerini döndürür."""
+    return return_store.stats()
+
+@app.get("/api/image-preprocess/stats")
+async def get_image_preprocess_stats():
+    """Ön işlemede kazanılan baytları ve aşama başına ortalama süreleri döndürür."""
+    return image_preprocessor.stats()
+
+# Servislerin /stats sözlükleri /metrics okunurken göstergelere çevrilir; alt anahtarları etikete dönüşen seviyeler verilir.
+metrics.registry.register_stats("model_calls", model_executor.get_stats, {"endpoints": "endpoint"})
+metrics.registry.register_stats("model_single_flight", model_executor.get_single_flight_stats, {"by_kind": "endpoint"})
+metrics.registry.register_stats("model_responses", gemini_service.get_parse_stats, {"by_schema": "schema"})
+metrics.registry.register_stats("model_backend", gemini_service.get_backend_stats, {"avg_ms": "kind"})
+metrics.registry.register_stats("analysis_cache", analysis_cache.stats)
+metrics.registry.register_stats("chat_cache", chat_cache.stats, {"latency_ms": "cache"})
+metrics.registry.register_stats("intent_classifier", intent_classifier.stats, {"by_intent": "intent"})
+metrics.registry.register_stats("fit_score", fit_score_engine.stats)
+metrics.registry.register_stats("image_preprocess", image_preprocessor.stats, {"avg_stage_ms": "stage"})
+metrics.registry.register_stats("analyze_style", analyze_style_pipeline.stats, {"stages": "stage"})
+metrics.registry.register_stats("return_store", return_store.stats)
+metrics.registry.register_stats("profiler", profiler.request_monitor.stats)
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Tüm metrikler Prometheus metin formatında."""
+    if not metrics.METRICS_ENABLED: raise HTTPException(status_code=404, detail="Metrikler kapalı (METRICS_ENABLED=0).")
+    return Response(metrics.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# --- Yönetici: profiler ---
+# PROFILER_ADMIN_TOKEN tanımlı değilse bu endpoint'ler yoktur (404); istekler X-Admin-Token taşımalıdır.
+
+def require_admin(token: Optional[str]):
+    if not profiler.PROFILER_ADMIN_TOKEN: raise HTTPException(status_code=404, detail="Not Found")
+    if not profiler.is_admin(token): raise HTTPException(status_code=403, detail="Yetkisiz.")
+
+def profile_response(profile, format: str):
+    if format == "collapsed": return PlainTextResponse(profile.collapsed())
+    return profile.speedscope()
+
+@app.get("/api/admin/profile", include_in_schema=False)
+async def run_profiler(seconds: float = Query(10, gt=0), mode: str = Query("cpu", pattern="^(cpu|wall)$"),
+                       format: str = Query("speedscope", pattern="^(speedscope|collapsed)$"),
+                       x_admin_token: Optional[str] = Header(None)):
+    """Tüm thread'leri `seconds` saniye örnekler; speedscope JSON ya da flamegraph (collapsed) döndürür."""
+    require_admin(x_admin_token)
     try:
-        strategic_overview = gemini_service.get_trend_analysis(simulated_data)
-    except Exception as e:
-        print(f"Stratejik Trend Analizi Hatası: {e}")
-        strategic_overview = {"strategic_overview": {
-            "trend_alarm": f"Analiz hatası: {e}",
-            "stock_optimization": "N/A",
-            "product_development": "N/A"
-        }}
+        profile = await asyncio.to_thread(profiler.sampling_profiler.run, min(seconds, profiler.PROFILER_MAX_SECONDS), mode)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return profile_response(profile, format)
 
-    return {
-        "total_returns": len(return_intents_db),
-        "product_analysis": sorted(product_analysis, key=lambda x: x['total_returns'], reverse=True),
-        "strategic_overview": strategic_overview.get("strategic_overview", {})
-    }
\ No newline at end of file
+@app.get("/api/admin/profiles/{profile_id}", include_in_schema=False)
+async def get_request_profile(profile_id: str, format: str = Query("speedscope", pattern="^(speedscope|collapsed)$"),
+                              x_admin_token: Optional[str] = Header(None)):
+    """`X-Profile: 1` ile profillenen isteğin sonucu (kimlik yanıttaki X-Profile-Id başlığındadır)."""
+    require_admin(x_admin_token)
+    profile = profiler.request_monitor.profiles.get(profile_id)
+    if profile is None: raise HTTPException(status_code=404, detail="Profil bulunamadı.")
+    return profile_response(profile, format)
+
+@app.get("/api/admin/slow-requests", include_in_schema=False)
+async def get_slow_requests(x_admin_token: Optional[str] = Header(None)):
+    """SLOW_REQUEST_THRESHOLD'u aşan son isteklerin süreleri ve örneklenen yığınları."""
+    require_admin(x_admin_token)
+    return {**profiler.request_monitor.stats(), "requests": list(profiler.request_monitor.slow_log)}
@@ -12,6 +12,12 @@ class VisualComboRequest(BaseModel):
 class FitScoreRequest(BaseModel):
     user_body_type: str
     product_id: int
+    include_reasoning: bool = True
+
+class FitScoreBatchRequest(BaseModel):
+    user_body_type: str
+    product_ids: List[int]
+    include_reasoning: bool = False
 
 class EventStylistRequest(BaseModel):
     user_request: str
\ No newline at end of file
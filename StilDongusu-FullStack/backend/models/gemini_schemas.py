@@ -0,0 +1,91 @@
+import re
+from pydantic import BaseModel, ConfigDict, field_validator
+from typing import List, Optional
+
+# Gemini yanıtlarının endpoint başına beklenen şekli. Prompt'larda istenmeyen ek alanlar
+# korunur (extra="allow"); yalnızca endpoint'lerin kullandığı alanlar zorunlu tutulur.
+
+
+class _ModelOutput(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+
+def _coerce_score(value):
+    # Model puanı "8", "8/10" ya da "8 puan" gibi metin olarak da döndürebiliyor.
+    if isinstance(value, str):
+        match = re.search(r"\d+", value)
+        return int(match.group()) if match else value
+    return value
+
+
+class InferredStyle(_ModelOutput):
+    style_tags: List[str] = []
+    color_tags: List[str] = []
+    justification: str = ""
+
+class ContextualUse(_ModelOutput):
+    seasons: List[str] = []
+    environment: List[str] = []
+    formality: str = ""
+
+class ImageAnalysis(_ModelOutput):
+    category: str
+    item_description: str
+    inferred_style: InferredStyle = InferredStyle()
+    contextual_use: ContextualUse = ContextualUse()
+
+class StyleAdvice(_ModelOutput):
+    title: str
+    vibe_description: str
+    combination_logic: str
+    pro_tip: str
+
+class ChatbotReply(_ModelOutput):
+    detected_intent: str
+    reply_text: str
+    is_return_prevented: bool = False
+
+class StyleShare(_ModelOutput):
+    style: str
+    percentage: float
+
+class StyleProfile(_ModelOutput):
+    style_profile: List[StyleShare]
+    dominant_colors: List[str] = []
+    summary: str = ""
+
+class FitScore(_ModelOutput):
+    fit_score: int
+    reasoning: str
+
+    _coerce = field_validator("fit_score", mode="before")(_coerce_score)
+
+class FitReasoning(_ModelOutput):
+    reasoning: str
+
+class FitScoreBatch(_ModelOutput):
+    # Sonuçlar tek tek doğrulanır; hatalı bir eleman tüm grubu yeniden ürettirmez.
+    results: List[dict] = []
+
+class FitScoreBatchItem(_ModelOutput):
+    product_id: int
+    fit_score: Optional[int] = None
+    reasoning: str
+
+    _coerce = field_validator("fit_score", mode="before")(_coerce_score)
+
+class Combination(_ModelOutput):
+    title: str
+    vibe: str = ""
+    items: List[str]
+
+class EventCombinations(_ModelOutput):
+    combinations: List[Combination]
+
+class StrategicOverview(_ModelOutput):
+    trend_alarm: str
+    stock_optimization: str
+    product_development: str
+
+class TrendAnalysis(_ModelOutput):
+    strategic_overview: StrategicOverview
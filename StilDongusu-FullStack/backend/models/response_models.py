@@ -0,0 +1,102 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Dict, List, Optional
+
+from models.gemini_schemas import ImageAnalysis, StyleAdvice, ChatbotReply, StyleProfile, StrategicOverview
+
+# Endpoint yanıtlarının şekli. FastAPI bu modellerle yanıtı pydantic-core üzerinden doğrulayıp
+# serileştirir (jsonable_encoder'ın sözlükleri tek tek gezmesi yerine).
+
+
+class Product(BaseModel):
+    # Katalogdaki ek alanlar yanıttan düşmesin
+    model_config = ConfigDict(extra="allow")
+
+    id: int
+    name: str
+    category: str
+    subcategory: str
+    price: str
+    image: str
+    style_tags: List[str] = []
+    color_tags: List[str] = []
+    season_tags: List[str] = []
+    cut_style: Optional[str] = None
+    material: Optional[str] = None
+    uygun_vucut_tipleri: List[str] = []
+
+class MatchedProduct(Product):
+    match_score: Optional[float] = None
+
+class ProductSearchResponse(BaseModel):
+    total: int
+    offset: int
+    limit: int
+    items: List[MatchedProduct]
+
+class ProductBatchResponse(BaseModel):
+    products: List[Product]
+    missing_ids: List[int]
+
+class FitScoreResponse(BaseModel):
+    fit_score: Optional[int] = None
+    reasoning: Optional[str] = None
+
+class ProductFitScore(FitScoreResponse):
+    product_id: int
+
+class FitScoreBatchResponse(BaseModel):
+    user_body_type: str
+    scores: List[ProductFitScore]
+    missing_product_ids: List[int]
+
+class AnalyzeStyleResponse(BaseModel):
+    image_analysis: ImageAnalysis
+    style_advice: Optional[StyleAdvice] = None
+    matched_products: List[MatchedProduct]
+    fit_scores: Optional[List[ProductFitScore]] = None
+    partial: bool = False
+    failed_stages: Dict[str, str] = {}
+
+class ChatResponse(ChatbotReply):
+    pass
+
+class StyleProfileResponse(StyleProfile):
+    pass
+
+class EventCombination(BaseModel):
+    title: str
+    vibe: str
+    items: List[Product]
+
+class EventStylistResponse(BaseModel):
+    combinations: List[EventCombination]
+
+class IntentShare(BaseModel):
+    intent: str
+    count: int
+    percentage: float
+
+class ProductReturnAnalysis(BaseModel):
+    product_name: str
+    total_returns: int
+    reasons: List[IntentShare]
+
+class StrategicOverviewMeta(BaseModel):
+    status: str
+    etag: Optional[str] = None
+    version: Optional[int] = None
+    computed_at: Optional[float] = None
+    stale: bool
+    refreshing: bool
+    last_error: Optional[str] = None
+
+class StrategicOverviewResponse(BaseModel):
+    strategic_overview: StrategicOverview
+    meta: StrategicOverviewMeta
+
+class ReturnAnalyticsResponse(BaseModel):
+    total_returns: int
+    product_analysis: List[ProductReturnAnalysis]
+    window: Optional[str] = None
+    strategic_overview: StrategicOverview
+    strategic_overview_meta: StrategicOverviewMeta
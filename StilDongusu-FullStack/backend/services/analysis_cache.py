@@ -0,0 +1,188 @@
+import io
+import os
+import sys
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+# Görsel analiz sonuçlarını görselin içerik özetiyle (sha256) anahtarlayan önbellek.
+# Bellekte LRU + TTL ile tutulur; ANALYSIS_CACHE_DB verilirse SQLite'a da yazılır ve
+# yeniden başlatmalardan sonra oradan geri yüklenir. ANALYSIS_CACHE_PHASH_DISTANCE > 0 ise
+# birebir aynı olmayan ama algısal olarak aynı görseller (yeniden sıkıştırma, boyut farkı) da eşleşir.
+
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "1024"))
+ANALYSIS_CACHE_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+ANALYSIS_CACHE_TTL = float(os.getenv("ANALYSIS_CACHE_TTL", str(24 * 60 * 60)))
+ANALYSIS_CACHE_DB = os.getenv("ANALYSIS_CACHE_DB", "")
+ANALYSIS_CACHE_PHASH_DISTANCE = int(os.getenv("ANALYSIS_CACHE_PHASH_DISTANCE", "0"))
+
+_HASH_SIZE = 8
+
+
+def perceptual_hash(image_bytes: bytes) -> int:
+    """64 bitlik fark hash'i (dHash): gri tonlamalı 9x8 küçültmede komşu pikselleri karşılaştırır."""
+    from PIL import Image
+    img = Image.open(io.BytesIO(image_bytes))
+    img.draft("L", (_HASH_SIZE * 4, _HASH_SIZE * 4))
+    pixels = list(img.convert("L").resize((_HASH_SIZE + 1, _HASH_SIZE), Image.Resampling.BILINEAR).getdata())
+    value = 0
+    for row in range(_HASH_SIZE):
+        for col in range(_HASH_SIZE):
+            left = pixels[row * (_HASH_SIZE + 1) + col]
+            right = pixels[row * (_HASH_SIZE + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+# SQLite INTEGER işaretli 64 bittir; üst biti 1 olan hash'ler işaretli karşılığıyla saklanır.
+def _to_db_phash(phash):
+    if phash is None: return None
+    return phash - (1 << 64) if phash >= 1 << 63 else phash
+
+
+def _from_db_phash(value):
+    if value is None: return None
+    return value + (1 << 64) if value < 0 else value
+
+
+class _Entry:
+    __slots__ = ("payload", "phash", "expires_at", "saved_seconds", "size")
+
+    def __init__(self, payload: str, phash, expires_at: float, saved_seconds: float):
+        self.payload = payload
+        self.phash = phash
+        self.expires_at = expires_at
+        self.saved_seconds = saved_seconds
+        self.size = len(payload.encode("utf-8"))
+
+
+class AnalysisCache:
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float, db_path: str = "", phash_distance: int = 0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.phash_distance = phash_distance
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._db = None
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "near_duplicate_hits": 0, "misses": 0, "evictions": 0, "latency_saved_seconds": 0.0}
+        if db_path:
+            self._open_db(db_path)
+
+    def _open_db(self, db_path: str):
+        try:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS analysis_cache (key TEXT PRIMARY KEY, phash INTEGER, payload TEXT, expires_at REAL, saved_seconds REAL)")
+            self._db.execute("DELETE FROM analysis_cache WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"UYARI: Analiz önbelleği diski açılamadı, yalnızca bellek kullanılacak: {e}", file=sys.stderr)
+            self._db = None
+
+    def lookup(self, key: str):
+        """İçerik anahtarıyla (sha256) bellekte, sonra diskte arar; yoksa None döner."""
+        now = time.time()
+        with self._lock:
+            entry = self._get_memory(key, now)
+            if entry is not None:
+                return self._hit("memory_hits", entry)
+            entry = self._get_disk(key, now)
+            if entry is not None:
+                self._put_memory(key, entry)
+                return self._hit("disk_hits", entry)
+            if self.phash_distance <= 0:
+                self._stats["misses"] += 1
+        return None
+
+    def lookup_similar(self, image_bytes: bytes):
+        """Birebir eşleşme yoksa algısal hash ile arar; (algısal hash, analiz) döndürür."""
+        if self.phash_distance <= 0: return None, None
+        try:
+            phash = perceptual_hash(image_bytes)
+        except Exception as e:
+            print(f"UYARI: Algısal hash hesaplanamadı: {e}", file=sys.stderr)
+            phash = None
+        with self._lock:
+            if phash is not None:
+                entry = self._find_near_duplicate(phash, time.time())
+                if entry is not None:
+                    return phash, self._hit("near_duplicate_hits", entry)
+            self._stats["misses"] += 1
+        return phash, None
+
+    def store(self, key: str, phash, analysis: dict, elapsed_seconds: float):
+        entry = _Entry(json.dumps(analysis, ensure_ascii=False), phash, time.time() + self.ttl_seconds, elapsed_seconds)
+        if entry.size > self.max_bytes: return
+        with self._lock:
+            self._put_memory(key, entry)
+            if self._db is not None:
+                try:
+                    self._db.execute("INSERT OR REPLACE INTO analysis_cache VALUES (?, ?, ?, ?, ?)",
+                                     (key, _to_db_phash(phash), entry.payload, entry.expires_at, entry.saved_seconds))
+                    self._db.commit()
+                except Exception as e:
+                    print(f"UYARI: Analiz önbelleği diske yazılamadı: {e}", file=sys.stderr)
+
+    def _hit(self, kind: str, entry: _Entry) -> dict:
+        self._stats[kind] += 1
+        self._stats["latency_saved_seconds"] += entry.saved_seconds
+        return json.loads(entry.payload)
+
+    def _get_memory(self, key: str, now: float):
+        entry = self._entries.get(key)
+        if entry is None: return None
+        if entry.expires_at < now:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _get_disk(self, key: str, now: float):
+        if self._db is None: return None
+        row = self._db.execute("SELECT phash, payload, expires_at, saved_seconds FROM analysis_cache WHERE key = ? AND expires_at >= ?", (key, now)).fetchone()
+        return _Entry(row[1], _from_db_phash(row[0]), row[2], row[3]) if row else None
+
+    def _find_near_duplicate(self, phash: int, now: float):
+        for key, entry in reversed(self._entries.items()):
+            if entry.phash is None or entry.expires_at < now: continue
+            if (entry.phash ^ phash).bit_count() <= self.phash_distance:
+                self._entries.move_to_end(key)
+                return entry
+        return None
+
+    def _put_memory(self, key: str, entry: _Entry):
+        if key in self._entries: self._remove(key)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+            self._stats["evictions"] += 1
+
+    def _remove(self, key: str):
+        self._bytes -= self._entries.pop(key).size
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"] + self._stats["near_duplicate_hits"]
+            lookups = hits + self._stats["misses"]
+            return {
+                **self._stats,
+                "latency_saved_seconds": round(self._stats["latency_saved_seconds"], 3),
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "disk_tier": self._db is not None,
+            }
+
+
+analysis_cache = AnalysisCache(
+    max_entries=ANALYSIS_CACHE_MAX_ENTRIES,
+    max_bytes=ANALYSIS_CACHE_MAX_BYTES,
+    ttl_seconds=ANALYSIS_CACHE_TTL,
+    db_path=ANALYSIS_CACHE_DB,
+    phash_distance=ANALYSIS_CACHE_PHASH_DISTANCE,
+)
@@ -0,0 +1,159 @@
+import os
+import time
+import random
+import hashlib
+import threading
+from collections import OrderedDict, deque
+
+from services.stats_utils import percentile
+from services.product_catalog import tokenize, normalize_tag
+
+# ReturnLogic chatbot'u için yanıt önbelleği. İade şikayetleri büyük ölçüde tekrar ettiği için
+# ("beden küçük geldi", "rengi farklı") aynı ürün için daha önce yanıtlanmış bir mesaj modele
+# tekrar gönderilmez. İki katman vardır:
+#   - birebir: normalize edilmiş metin (Türkçe karakterler katlanmış, noktalama atılmış)
+#   - yakın kopya: kelime ve kelime ikilileri üzerinden MinHash + LSH ile aday bulunur, adayın
+#     gerçek Jaccard benzerliği CHAT_CACHE_SIMILARITY eşiğini geçerse isabet sayılır.
+# Kayıtlar ürün bazında ayrılır; bir ürüne verilen yanıt başka bir ürünün şikayetine dönmez.
+
+CHAT_CACHE_MAX_ENTRIES = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "4096"))
+CHAT_CACHE_TTL = float(os.getenv("CHAT_CACHE_TTL", str(24 * 60 * 60)))
+CHAT_CACHE_SIMILARITY = float(os.getenv("CHAT_CACHE_SIMILARITY", "0.8"))
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+LATENCY_SAMPLES = 1000
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240601)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(MINHASH_PERMUTATIONS)]
+_ROWS_PER_BAND = MINHASH_PERMUTATIONS // LSH_BANDS
+
+
+def normalize_message(message: str) -> str:
+    return " ".join(tokenize(message))
+
+
+def shingles(normalized: str) -> frozenset:
+    """Kelimeler ve ardışık kelime ikilileri; tek kelimelik anlam farkları ("küçük"/"büyük") benzerliği belirgin düşürür."""
+    words = normalized.split()
+    return frozenset(words + [f"{a} {b}" for a, b in zip(words, words[1:])])
+
+
+def minhash(features: frozenset) -> tuple:
+    hashes = [int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "big") for f in features]
+    if not hashes: return ()
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def _bands(signature: tuple):
+    for band in range(LSH_BANDS):
+        yield band, signature[band * _ROWS_PER_BAND:(band + 1) * _ROWS_PER_BAND]
+
+
+class _Entry:
+    __slots__ = ("scope", "normalized", "features", "signature", "reply", "expires_at")
+
+    def __init__(self, scope, normalized, features, signature, reply, expires_at):
+        self.scope = scope
+        self.normalized = normalized
+        self.features = features
+        self.signature = signature
+        self.reply = reply
+        self.expires_at = expires_at
+
+
+class ChatReplyCache:
+    def __init__(self, max_entries: int = CHAT_CACHE_MAX_ENTRIES, ttl_seconds: float = CHAT_CACHE_TTL,
+                 similarity: float = CHAT_CACHE_SIMILARITY):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+        self._entries = OrderedDict()
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._stats = {"exact_hits": 0, "near_duplicate_hits": 0, "misses": 0, "evictions": 0}
+        self._latency = {"cached": deque(maxlen=LATENCY_SAMPLES), "uncached": deque(maxlen=LATENCY_SAMPLES)}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def lookup(self, product_name: str, message: str):
+        """Önbellekteki yanıtı (detected_intent, reply_text, ...) döndürür; yoksa None."""
+        if not self.enabled: return None
+        scope, normalized = normalize_tag(product_name), normalize_message(message)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get((scope, normalized))
+            if entry is not None and entry.expires_at >= now:
+                self._entries.move_to_end((scope, normalized))
+                self._stats["exact_hits"] += 1
+                return dict(entry.reply)
+            entry = self._find_near_duplicate(scope, shingles(normalized), now) if self.similarity < 1 else None
+            if entry is not None:
+                self._entries.move_to_end((entry.scope, entry.normalized))
+                self._stats["near_duplicate_hits"] += 1
+                return dict(entry.reply)
+            self._stats["misses"] += 1
+            return None
+
+    def _find_near_duplicate(self, scope: str, features: frozenset, now: float):
+        if not features: return None
+        candidates = set()
+        for band in _bands(minhash(features)):
+            candidates.update(self._buckets.get((scope,) + band, ()))
+        best, best_score = None, self.similarity
+        for key in candidates:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at < now: continue
+            score = len(features & entry.features) / len(features | entry.features)
+            if score >= best_score: best, best_score = entry, score
+        return best
+
+    def store(self, product_name: str, message: str, reply: dict):
+        if not self.enabled or not reply.get("detected_intent"): return
+        scope, normalized = normalize_tag(product_name), normalize_message(message)
+        features = shingles(normalized)
+        entry = _Entry(scope, normalized, features, minhash(features), dict(reply), time.time() + self.ttl_seconds)
+        key = (scope, normalized)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            if entry.signature:
+                for band in _bands(entry.signature):
+                    self._buckets.setdefault((scope,) + band, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None or not entry.signature: return
+        for band in _bands(entry.signature):
+            bucket_key = (entry.scope,) + band
+            bucket = self._buckets.get(bucket_key)
+            if bucket is None: continue
+            bucket.discard(key)
+            if not bucket: del self._buckets[bucket_key]
+
+    def observe(self, cached: bool, seconds: float):
+        """Chat isteğinin toplam süresini önbellekten dönen/dönmeyen olarak ayrı ayrı kaydeder."""
+        self._latency["cached" if cached else "uncached"].append(seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self._stats["exact_hits"] + self._stats["near_duplicate_hits"]
+            lookups = hits + self._stats["misses"]
+            return {
+                "entries": len(self._entries),
+                **self._stats,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "similarity_threshold": self.similarity,
+                "latency_ms": {
+                    kind: {"count": len(samples), "p50": round(percentile(samples, 0.5) * 1000, 2), "p99": round(percentile(samples, 0.99) * 1000, 2)}
+                    for kind, samples in self._latency.items()
+                },
+            }
+
+
+chat_cache = ChatReplyCache()
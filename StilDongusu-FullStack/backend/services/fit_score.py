@@ -0,0 +1,134 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+from services.product_catalog import normalize_tag, ProductCatalog
+
+# Vücut tipi uygunluk puanı. PROMPT_FIT_SCORE yalnızca vücut tipine ve ürünün üç alanına
+# (cut_style, material, uygun_vucut_tipleri) bağlı olduğu için sonuç bu anahtarın saf bir
+# fonksiyonudur: (normalize vücut tipi, ürün id, ürün sürümü) başına bir kez hesaplanıp saklanır.
+# "local" modunda sayısal puan kurallarla anında üretilir, model yalnızca gerekçe metni için
+# ve ilk istendiğinde çağrılır. "llm" modunda puan da modelden alınır (yine önbelleklenir).
+
+FIT_SCORE_MODE = os.getenv("FIT_SCORE_MODE", "local")
+FIT_SCORE_CACHE_SIZE = int(os.getenv("FIT_SCORE_CACHE_SIZE", "50000"))
+FIT_FIELDS = ("cut_style", "material", "uygun_vucut_tipleri")
+
+# Ürün uygun vücut tiplerinde açıkça listelenmişse / "tümü" ise / listelenmemişse başlangıç puanı
+BASE_LISTED = 8
+BASE_ALL = 7
+BASE_UNLISTED = 4
+BASE_UNSPECIFIED = 5
+
+# Kesim ve materyal anahtar kelimelerinin vücut tipine göre puan etkisi (normalize edilmiş metin üzerinde).
+CUT_RULES = {
+    "a-kesim": {"armut": 2, "elma": 1, "kum saati": 1},
+    "oversize": {"elma": 1, "dikdortgen": 1, "kum saati": -1},
+    "dar": {"armut": -1, "elma": -1, "kum saati": 1},
+    "duz kesim": {"dikdortgen": 1, "elma": 1},
+    "beli lastikli": {"kum saati": 1, "elma": -1},
+    "mom-fit": {"armut": 1, "kum saati": 1},
+    "maxi": {"armut": 1, "dikdortgen": 1},
+    "biker": {"dikdortgen": 1, "kum saati": 1, "armut": -1},
+    "bol": {"elma": 1, "kum saati": -1},
+}
+MATERIAL_RULES = {
+    "saten": {"elma": -1, "kum saati": 1},
+    "viskon": {"armut": 1, "elma": 1},
+    "keten": {"elma": 1},
+    "denim": {"kum saati": 1, "elma": -1},
+    "deri": {"dikdortgen": 1},
+}
+
+
+def product_fit_version(product: dict) -> str:
+    """Puanı etkileyen alanların özeti; bu alanlar değişince eski puan ve gerekçe kullanılmaz."""
+    payload = json.dumps([product.get(f) for f in FIT_FIELDS], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+def _rule_delta(rules: dict, text: str, body_type: str) -> int:
+    # Anahtar kelimeler tam kelime olarak aranır ("dar" "daraltılmış"ta eşleşmez).
+    text = f" {normalize_tag(text)} "
+    return sum(effects.get(body_type, 0) for keyword, effects in rules.items() if f" {keyword} " in text)
+
+
+def local_fit_score(body_type: str, product: dict) -> int:
+    """Kurallara dayalı 1-10 arası puan; `body_type` normalize edilmiş olmalıdır."""
+    suitable = {normalize_tag(t) for t in product.get("uygun_vucut_tipleri") or []}
+    if body_type in suitable: score = BASE_LISTED
+    elif ProductCatalog.ALL_BODY_TYPES in suitable: score = BASE_ALL
+    elif suitable: score = BASE_UNLISTED
+    else: score = BASE_UNSPECIFIED
+    score += _rule_delta(CUT_RULES, product.get("cut_style") or "", body_type)
+    score += _rule_delta(MATERIAL_RULES, product.get("material") or "", body_type)
+    return max(1, min(10, score))
+
+
+class FitScoreEngine:
+    def __init__(self, mode: str = FIT_SCORE_MODE, max_entries: int = FIT_SCORE_CACHE_SIZE):
+        self.mode = mode if mode in ("local", "llm") else "local"
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "reasoning_hits": 0, "reasoning_generated": 0}
+
+    @staticmethod
+    def key(body_type: str, product: dict) -> tuple:
+        return normalize_tag(body_type), product["id"], product_fit_version(product)
+
+    def get(self, body_type: str, product: dict) -> dict:
+        """Önbellekteki (ya da yerel modda anında hesaplanan) puanı döndürür.
+        `fit_score` llm modunda henüz üretilmemişse, `reasoning` ise henüz üretilmemişse None olur."""
+        key = self.key(body_type, product)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                if entry["reasoning"] is not None: self._stats["reasoning_hits"] += 1
+                return dict(entry)
+            self._stats["misses"] += 1
+        score = local_fit_score(key[0], product) if self.mode == "local" else None
+        entry = {"fit_score": score, "reasoning": None}
+        if score is not None: self._put(key, entry)
+        return dict(entry)
+
+    def needs_model(self, entry: dict, with_reasoning: bool = True) -> bool:
+        return entry["fit_score"] is None or (with_reasoning and entry["reasoning"] is None)
+
+    def store(self, body_type: str, product: dict, fit_score, reasoning: str):
+        """Modelden gelen gerekçeyi (llm modunda puanı da) saklar ve birleşik sonucu döndürür."""
+        key = self.key(body_type, product)
+        with self._lock:
+            entry = self._entries.get(key) or {"fit_score": None, "reasoning": None}
+        entry = {"fit_score": entry["fit_score"] if entry["fit_score"] is not None else fit_score, "reasoning": reasoning}
+        self._put(key, entry)
+        self._stats["reasoning_generated"] += 1
+        return dict(entry)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _put(self, key: tuple, entry: dict):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                "mode": self.mode,
+                "entries": len(self._entries),
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+
+fit_score_engine = FitScoreEngine()
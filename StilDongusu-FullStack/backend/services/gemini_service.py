@@ -1,14 +1,32 @@
 import os
-import json
-import google.generativeai as genai
-from PIL import Image
 import io
 import sys
+import json
+import time
+from pydantic import ValidationError
+from services import stylist_retrieval
+from services.model_backend import create_model_backend, MODEL_BACKEND
+from services.response_parser import response_parser, ModelResponseError
+from services.metrics import stage_seconds, model_backend_seconds, model_prompt_chars, model_prompt_images, model_response_chars
+from models.gemini_schemas import (
+    ImageAnalysis, StyleAdvice, ChatbotReply, StyleProfile, FitScore, FitReasoning,
+    FitScoreBatch, FitScoreBatchItem, EventCombinations, TrendAnalysis,
+)
 
-vision_model = None
-text_model = None
+# Model çağrıları MODEL_BACKEND ile seçilen arka uca gider (bkz. services/model_backend.py).
+backend = None
 is_configured = False
 
+# Arka uç sunucu açılışında (lifespan) kurulur; SDK import'u gibi ağır hazırlıklar ise açılışı
+# bekletmeden arka planda yapılır. MODEL_WARMUP=0 ile bu hazırlık ilk model çağrısına bırakılır.
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "1") != "0"
+
+# JSON modunda model yanıtı doğrudan JSON olarak üretir (kod çiti, açıklama metni olmaz).
+# Ayrıştırılamayan ya da şemaya uymayan yanıtlar için en fazla MODEL_JSON_RETRIES kez yeniden istenir.
+MODEL_JSON_MODE = os.getenv("MODEL_JSON_MODE", "1") != "0"
+MODEL_JSON_RETRIES = int(os.getenv("MODEL_JSON_RETRIES", "1"))
+JSON_RETRY_REMINDER = "\nÖNEMLİ: Önceki yanıtın geçerli JSON değildi. Yalnızca istenen formatta, eksiksiz ve geçerli bir JSON nesnesi döndür."
+
 # --- PROMPT'LAR ---
 
 PROMPT_ANALYZE_IMAGE = """
@@ -20,6 +38,7 @@ SENARYO: Sen, dünya standartlarında bir moda ve iç mimari gurusu olan "Stil G
   "item_description": "Objenin fiziksel özelliklerini içeren detaylı tanım.",
   "inferred_style": {{
     "style_tags": ["ana stil etiketi", "ikincil stil etiketi"],
+    "color_tags": ["baskın renk", "ikincil renk"],
     "justification": "Bu stil etiketlerini seçme sebebini açıklayan kısa metin."
   }},
   "contextual_use": {{
@@ -61,6 +80,37 @@ VERİLER:
 }}
 """
 
+PROMPT_FIT_REASONING = """
+SENARYO: Sen bir kişisel stil danışmanısın. Bir ürünün kullanıcının vücut tipine uygunluk puanı hesaplandı; bu puanın gerekçesini kısa, profesyonel ve cesaretlendirici bir dille açıklayacaksın. Puanı değiştirme. Sadece JSON formatında cevap ver.
+
+VERİLER:
+- Kullanıcı Vücut Tipi: {user_body_type}
+- Ürün Kesimi: {product_cut}
+- Ürün Materyali: {product_material}
+- Ürünün Önerildiği Vücut Tipleri: {product_fit_types}
+- Uygunluk Puanı: {fit_score}/10
+
+İSTENEN JSON FORMATI:
+{{
+  "reasoning": "Bu puanın nedenini açıklayan kısa metin."
+}}
+"""
+
+PROMPT_FIT_SCORE_BATCH = """
+SENARYO: Sen bir kişisel stil danışmanısın. Bir kullanıcının vücut tipi ile birden fazla ürünün özelliklerini karşılaştırarak her ürün için kısa bir gerekçe üreteceksin. Ürünlerde "fit_score" verilmişse puanı değiştirme, yalnızca gerekçesini yaz; verilmemişse 10 üzerinden bir puan da ver. Her ürün için tam olarak bir sonuç döndür ve "product_id" değerini aynen koru. Sadece JSON formatında cevap ver.
+
+VERİLER:
+- Kullanıcı Vücut Tipi: {user_body_type}
+- Ürünler (JSON formatında): {products_json}
+
+İSTENEN JSON FORMATI:
+{{
+  "results": [
+    {{"product_id": 1, "fit_score": "10 üzerinden puan (örn: 8)", "reasoning": "Kısa, profesyonel ve cesaretlendirici gerekçe."}}
+  ]
+}}
+"""
+
 PROMPT_EVENT_STYLIST = """
 SENARYO: Sen, dünya çapında bir stilistsin. Bir müşteri sana bir etkinlik veya mekan için ne giymesi gerektiğini soruyor. Müşterinin isteğini ve eldeki ürün listesini analiz ederek, ona 3 farklı, tam ve yaratıcı kombin önerisi sunacaksın. Her kombinin bir başlığı, bir "vibe" açıklaması ve hangi ürünlerden oluştuğu belirtilmeli. Sadece JSON formatında cevap ver.
 
@@ -108,50 +158,101 @@ VERİLER:
 
 # --- FONKSİYONLAR ---
 
-def configure_gemini(api_key: str):
-    global vision_model, text_model, is_configured
+def configure_model_backend(api_key: str = None):
+    """MODEL_BACKEND'e göre arka ucu kurar; gemini/record için `api_key` gerekir."""
+    new_backend = create_model_backend(api_key, MODEL_BACKEND, json_mode=MODEL_JSON_MODE)
+    if new_backend is not None:
+        set_backend(new_backend)
+        print(f"Bilgi: Model servisi '{new_backend.name}' arka ucu ile yapılandırıldı.")
+
+def set_backend(new_backend):
+    global backend, is_configured
+    backend = new_backend
+    is_configured = new_backend is not None
+
+def warm_up_backend():
+    """Arka ucun istemcisini (gemini için SDK ve model nesneleri) ilk model çağrısından önce hazırlar."""
+    warm_up = getattr(backend, "warm_up", None)
+    if warm_up is None: return
+    started = time.perf_counter()
     try:
-        genai.configure(api_key=api_key)
-        model_name = 'gemini-1.5-flash-latest'
-        vision_model = genai.GenerativeModel(model_name)
-        text_model = genai.GenerativeModel(model_name)
-        is_configured = True
-        print(f"Bilgi: Gemini servisi '{model_name}' modeli ile başarıyla yapılandırıldı.")
+        warm_up()
     except Exception as e:
-        print(f"HATA: Gemini servisi yapılandırılamadı: {e}", file=sys.stderr)
-        is_configured = False
+        print(f"HATA: Model arka ucu hazırlanamadı: {e}", file=sys.stderr)
+        return
+    print(f"Bilgi: Model arka ucu {time.perf_counter() - started:.2f} sn'de hazırlandı.")
 
-def parse_gemini_json_response(response_text: str) -> dict:
-    try:
-        json_start_index = response_text.find('{')
-        json_end_index = response_text.rfind('}')
-        if json_start_index == -1 or json_end_index == -1:
-            raise ValueError("Yanıt metninde JSON nesnesi bulunamadı.")
-        json_string = response_text[json_start_index : json_end_index + 1]
-        return json.loads(json_string)
-    except (json.JSONDecodeError, ValueError) as e:
-        print(f"JSON Ayrıştırma Hatası: {e}\n--- Sorunlu Metin ---\n{response_text[:500]}...", file=sys.stderr)
-        raise ValueError("Gemini'den gelen yanıt geçerli bir JSON formatı içermiyor.")
+def get_backend_stats() -> dict:
+    return backend.stats() if backend is not None else {"backend": None}
 
-def analyze_image_style(image_bytes: bytes) -> dict:
-    if not is_configured: raise Exception("Gemini servisi yapılandırılmamış.")
+def _record_prompt(contents, kind: str):
+    parts = contents if isinstance(contents, list) else [contents]
+    model_prompt_chars.observe(sum(len(p) for p in parts if isinstance(p, str)), kind)
+    images = sum(1 for p in parts if not isinstance(p, str))
+    if images: model_prompt_images.inc(kind, amount=images)
+
+def _call_backend(contents, kind: str) -> str:
+    _record_prompt(contents, kind)
+    with model_backend_seconds.time(backend.name, kind):
+        text = backend.generate(contents, kind)
+    model_response_chars.observe(len(text or ""), kind)
+    return text
+
+def generate(contents, kind: str) -> str:
+    """Arka ucu çağırıp yanıt metnini döndürür; `kind` "text" ya da "vision"dır. Eşzamanlı aynı
+    çağrılar bu fonksiyona gelmeden model_executor'da birleştirilir."""
+    return _call_backend(contents, kind)
+
+def generate_stream(contents, kind: str):
+    """Yanıtı geldikçe metin parçaları halinde verir. Akışlar paylaşılamadığı için birleştirilmez."""
+    _record_prompt(contents, kind)
+    chars = 0
+    with model_backend_seconds.time(backend.name, kind):
+        for text in backend.generate_stream(contents, kind):
+            if not text: continue
+            chars += len(text)
+            yield text
+    model_response_chars.observe(chars, kind)
+
+def parse_gemini_json_response(response_text: str, schema=None) -> dict:
+    return response_parser.parse(response_text, schema)
+
+def generate_json(contents, kind: str, schema) -> dict:
+    """generate() yanıtını `schema`ya göre ayrıştırır; başarısız olursa prompt'a bir uyarı ekleyip yeniden ister."""
+    text = generate(contents, kind)
+    for attempt in range(MODEL_JSON_RETRIES + 1):
+        try:
+            return parse_gemini_json_response(text, schema)
+        except ModelResponseError:
+            if attempt == MODEL_JSON_RETRIES: raise
+        response_parser.record_retry(schema)
+        if isinstance(contents, list): contents = [*contents, JSON_RETRY_REMINDER]
+        else: contents = contents + JSON_RETRY_REMINDER
+        text = generate(contents, kind)
+
+def get_parse_stats() -> dict:
+    return {"json_mode": MODEL_JSON_MODE, "max_retries": MODEL_JSON_RETRIES, **response_parser.stats()}
+
+def _decode_image(image_bytes: bytes):
+    from PIL import Image
+    # Piksel verisi hemen çözülür; aksi halde çözme maliyeti model çağrısının içinde kalır.
     img = Image.open(io.BytesIO(image_bytes))
-    response = vision_model.generate_content([PROMPT_ANALYZE_IMAGE, img])
-    return parse_gemini_json_response(response.text)
-
-def find_matching_products(analysis_data: dict, products_db: list) -> list:
-    matched_products = []
-    style_tags = set(analysis_data.get("inferred_style", {}).get("style_tags", []))
-    if not style_tags: return products_db[:3]
-    for product in products_db:
-        if style_tags.intersection(set(product.get("style_tags", []))):
-            matched_products.append(product)
-    return matched_products if matched_products else products_db[:3]
+    img.load()
+    return img
 
-def get_style_advice(description: str, matched_products: list) -> dict:
+def analyze_image_style(image_bytes: bytes) -> dict:
     if not is_configured: raise Exception("Gemini servisi yapılandırılmamış.")
+    with stage_seconds.time("analyze_style", "pil_decode"):
+        img = _decode_image(image_bytes)
+    return generate_json([PROMPT_ANALYZE_IMAGE, img], "vision", ImageAnalysis)
+
+def find_matching_products(analysis_data: dict, style_matcher, limit: int = 6, offset: int = 0) -> list:
+    """Analizdeki kategoride, stil/renk/mevsim etiketlerine göre puanlanmış ilk `limit` ürünü döndürür."""
+    return style_matcher.match(analysis_data, limit=limit, offset=offset)
+
+def _style_advice_prompt(description: str, matched_products: list) -> str:
     names = [p['name'] for p in matched_products]
-    prompt = f"""
+    return f"""
 SENARYO: Sen, ilham veren bir stil danışmanısın. Bir ana parça ve ona uygun ürünler için bir hikaye anlat. Sadece JSON formatında cevap ver.
 GİRDİLER:
 - Ana Parça: {description}
@@ -164,8 +265,15 @@ GİRDİLER:
     "pro_tip": "Kombini tamamlayacak uzman ipucu."
 }}
 """
-    response = text_model.generate_content(prompt)
-    return parse_gemini_json_response(response.text)
+
+def get_style_advice(description: str, matched_products: list) -> dict:
+    if not is_configured: raise Exception("Gemini servisi yapılandırılmamış.")
+    return generate_json(_style_advice_prompt(description, matched_products), "text", StyleAdvice)
+
+def stream_style_advice(description: str, matched_products: list):
+    """Stil tavsiyesini generate_content(stream=True) ile parça parça üretir."""
+    if not is_configured: raise Exception("Gemini servisi yapılandırılmamış.")
+    yield from generate_stream(_style_advice_prompt(description, matched_products), "text")
 
 def get_chatbot_reply(user_message: str) -> dict:
     if not is_configured: raise Exception("Gemini servisi yapılandırılmamış.")
@@ -184,16 +292,14 @@ GİRDİ:
   "is_return_prevented": true
 }}
 """
-    response = text_model.generate_content(prompt)
-    return parse_gemini_json_response(response.text)
+    return generate_json(prompt, "text", ChatbotReply)
 
 def create_style_profile(image_bytes_list: list) -> dict:
     if not is_configured: raise Exception("Gemini servisi yapılandırılmamış.")
     prompt_parts = [PROMPT_CREATE_STYLE_PROFILE]
-    for image_bytes in image_bytes_list:
-        prompt_parts.append(Image.open(io.BytesIO(image_bytes)))
-    response = vision_model.generate_content(prompt_parts)
-    return parse_gemini_json_response(response.text)
+    with stage_seconds.time("create_style_profile", "pil_decode"):
+        prompt_parts.extend(_decode_image(image_bytes) for image_bytes in image_bytes_list)
+    return generate_json(prompt_parts, "vision", StyleProfile)
 
 def get_fit_score(user_body_type: str, product: dict) -> dict:
     if not is_configured: raise Exception("Gemini servisi yapılandırılmamış.")
@@ -203,18 +309,59 @@ def get_fit_score(user_body_type: str, product: dict) -> dict:
         product_material=product.get("material", "belirtilmemiş"),
         product_fit_types=product.get("uygun_vucut_tipleri", [])
     )
-    response = text_model.generate_content(prompt)
-    return parse_gemini_json_response(response.text)
+    return generate_json(prompt, "text", FitScore)
+
+def get_fit_reasoning(user_body_type: str, product: dict, fit_score: int) -> dict:
+    """Yerel olarak hesaplanan puan için yalnızca gerekçe metnini üretir."""
+    if not is_configured: raise Exception("Gemini servisi yapılandırılmamış.")
+    prompt = PROMPT_FIT_REASONING.format(
+        user_body_type=user_body_type,
+        product_cut=product.get("cut_style", "belirtilmemiş"),
+        product_material=product.get("material", "belirtilmemiş"),
+        product_fit_types=product.get("uygun_vucut_tipleri", []),
+        fit_score=fit_score
+    )
+    return generate_json(prompt, "text", FitReasoning)
+
+def get_fit_scores_batch(user_body_type: str, items: list) -> dict:
+    """Birden çok ürünü tek prompt'ta puanlar; `items` (ürün, bilinen puan ya da None) çiftleridir.
+    Sonuç product_id -> {"fit_score", "reasoning"} sözlüğüdür; modelin atladığı ürünler sözlükte yer almaz."""
+    if not is_configured: raise Exception("Gemini servisi yapılandırılmamış.")
+    products = []
+    for product, fit_score in items:
+        entry = {
+            "product_id": product["id"],
+            "cut": product.get("cut_style", "belirtilmemiş"),
+            "material": product.get("material", "belirtilmemiş"),
+            "fit_types": product.get("uygun_vucut_tipleri", []),
+        }
+        if fit_score is not None: entry["fit_score"] = fit_score
+        products.append(entry)
+    prompt = PROMPT_FIT_SCORE_BATCH.format(user_body_type=user_body_type, products_json=json.dumps(products, ensure_ascii=False, separators=(",", ":")))
+    results = generate_json(prompt, "text", FitScoreBatch)["results"]
+    by_id = {}
+    for result in results:
+        try:
+            item = FitScoreBatchItem.model_validate(result)
+        except ValidationError:
+            continue
+        by_id[item.product_id] = {"fit_score": item.fit_score, "reasoning": item.reasoning}
+    return by_id
+
+def _event_stylist_prompt(user_request: str, catalog) -> str:
+    candidates = stylist_retrieval.retrieve_candidates(catalog, user_request)
+    products_json = stylist_retrieval.catalog_projection.serialize(catalog, candidates)
+    return PROMPT_EVENT_STYLIST.format(user_request=user_request, products_json=products_json)
+
+def get_event_style_combinations(user_request: str, catalog) -> dict:
+    if not is_configured: raise Exception("Gemini servisi yapılandırılmamış.")
+    return generate_json(_event_stylist_prompt(user_request, catalog), "text", EventCombinations)
 
-def get_event_style_combinations(user_request: str, products_db: list) -> dict:
+def stream_event_style_combinations(user_request: str, catalog):
     if not is_configured: raise Exception("Gemini servisi yapılandırılmamış.")
-    clothing = [p for p in products_db if "kitaplık" not in p["name"].lower() and "berjer" not in p["name"].lower()]
-    prompt = PROMPT_EVENT_STYLIST.format(user_request=user_request, products_json=json.dumps(clothing, ensure_ascii=False))
-    response = text_model.generate_content(prompt)
-    return parse_gemini_json_response(response.text)
+    yield from generate_stream(_event_stylist_prompt(user_request, catalog), "text")
 
 def get_trend_analysis(simulated_data: dict) -> dict:
     if not is_configured: raise Exception("Gemini servisi yapılandırılmamış.")
     prompt = PROMPT_TREND_ANALYSIS.format(simulated_data=json.dumps(simulated_data, ensure_ascii=False))
-    response = text_model.generate_content(prompt)
-    return parse_gemini_json_response(response.text)
\ No newline at end of file
+    return generate_json(prompt, "text", TrendAnalysis)
\ No newline at end of file
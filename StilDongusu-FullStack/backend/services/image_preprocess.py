@@ -0,0 +1,134 @@
+import io
+import os
+import sys
+import time
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Yüklenen fotoğrafları modele göndermeden önce küçültüp yeniden sıkıştırır.
+# JPEG'ler Image.draft ile doğrudan küçültülmüş ölçekte decode edilir; EXIF yönü uygulanır,
+# uzun kenar IMAGE_MAX_EDGE'e indirilir ve sonuç kompakt JPEG/WebP olarak kodlanır.
+# CPU yoğun iş, event loop'u bloklamamak için ayrı bir process havuzunda çalışır. Havuz fork ile
+# değil forkserver (yoksa spawn) ile başlatılır: çok thread'li sunucudan fork edilen süreç, o an
+# başka thread'lerin tuttuğu kilitleri kilitli halde devralabilir. İşçiler preprocess_image'ı
+# modülü import ederek bulur.
+
+IMAGE_MAX_EDGE = int(os.getenv("IMAGE_MAX_EDGE", "1024"))
+IMAGE_OUTPUT_FORMAT = os.getenv("IMAGE_OUTPUT_FORMAT", "JPEG").upper()
+IMAGE_OUTPUT_QUALITY = int(os.getenv("IMAGE_OUTPUT_QUALITY", "85"))
+IMAGE_PREPROCESS_WORKERS = int(os.getenv("IMAGE_PREPROCESS_WORKERS", "2"))
+
+STAGES = ("decode", "orient", "resize", "encode")
+
+
+def _read_source(source) -> bytes:
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return f.read()
+    return source
+
+
+def preprocess_image(source, max_edge: int = IMAGE_MAX_EDGE, output_format: str = IMAGE_OUTPUT_FORMAT,
+                     quality: int = IMAGE_OUTPUT_QUALITY):
+    """(işlenmiş baytlar, istatistik sözlüğü) döndürür. `source` bayt ya da diske alınmış dosyanın yoludur."""
+    from PIL import Image, ImageOps
+    timings = {}
+    on_disk = isinstance(source, str)
+    original_bytes = os.path.getsize(source) if on_disk else len(source)
+    started = time.perf_counter()
+    img = Image.open(source if on_disk else io.BytesIO(source))
+    original_size = img.size
+    # draft yalnızca JPEG'de etkilidir; hedefin en az 2 katı çözünürlükte decode ederek kaliteyi korur.
+    img.draft("RGB", (max_edge * 2, max_edge * 2))
+    img.load()
+    timings["decode"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    img = ImageOps.exif_transpose(img)
+    timings["orient"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if max(img.size) > max_edge:
+        img.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+    timings["resize"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if img.mode not in ("RGB", "L"):
+        # Şeffaf alanlar beyaz zemine oturtulur; JPEG alfa kanalı taşıyamaz.
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A"))
+        img = background
+    output = io.BytesIO()
+    img.save(output, format=output_format, quality=quality, optimize=output_format == "JPEG")
+    processed = output.getvalue()
+    timings["encode"] = time.perf_counter() - started
+
+    # Yeniden kodlama küçültmediyse ve görsel zaten uygun boyuttaysa orijinal korunur.
+    if not on_disk and len(processed) >= original_bytes and img.size == original_size:
+        processed = source
+
+    return processed, {
+        "original_bytes": original_bytes,
+        "output_bytes": len(processed),
+        "original_size": list(original_size),
+        "output_size": list(img.size),
+        "stage_ms": {stage: round(seconds * 1000, 2) for stage, seconds in timings.items()},
+    }
+
+
+class ImagePreprocessor:
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._pool = None
+        self._lock = threading.Lock()
+        self._totals = {"images": 0, "failed": 0, "original_bytes": 0, "output_bytes": 0}
+        self._stage_ms = {stage: 0.0 for stage in STAGES}
+
+    def _get_pool(self):
+        if self._pool is None and self.workers > 0:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(method))
+        return self._pool
+
+    async def process(self, source) -> bytes:
+        """Görseli havuzda işler; `source` bayt ya da diske alınmış yüklemenin yoludur."""
+        loop = asyncio.get_running_loop()
+        try:
+            processed, stats = await loop.run_in_executor(self._get_pool(), preprocess_image, source)
+        except Exception as e:
+            # Decode edilemeyen görseller olduğu gibi modele gönderilir; hatayı model tarafı raporlar.
+            print(f"UYARI: Görsel ön işleme başarısız, orijinal kullanılacak: {e}", file=sys.stderr)
+            with self._lock:
+                self._totals["failed"] += 1
+            return await asyncio.to_thread(_read_source, source)
+        self._record(stats)
+        return processed
+
+    def _record(self, stats: dict):
+        with self._lock:
+            self._totals["images"] += 1
+            self._totals["original_bytes"] += stats["original_bytes"]
+            self._totals["output_bytes"] += stats["output_bytes"]
+            for stage, ms in stats["stage_ms"].items():
+                self._stage_ms[stage] += ms
+
+    def stats(self) -> dict:
+        with self._lock:
+            images = self._totals["images"]
+            return {
+                **self._totals,
+                "bytes_saved": self._totals["original_bytes"] - self._totals["output_bytes"],
+                "avg_stage_ms": {stage: round(ms / images, 2) if images else 0.0 for stage, ms in self._stage_ms.items()},
+                "max_edge": IMAGE_MAX_EDGE,
+                "output_format": IMAGE_OUTPUT_FORMAT,
+            }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+image_preprocessor = ImagePreprocessor(IMAGE_PREPROCESS_WORKERS)
@@ -0,0 +1,112 @@
+import os
+import re
+import time
+from collections import Counter
+
+from services.product_catalog import normalize_text
+
+# ReturnLogic mesajları için yerel niyet ön sınıflandırıcısı. Türkçe karakterleri katlanmış
+# metin üzerinde derlenmiş anahtar kelime kalıpları çalışır; yalnızca tek bir niyet açık ara
+# öne çıktığında "emin" sayılır, belirsiz mesajlar her zaman modele bırakılır.
+# INTENT_CLASSIFIER_MODE:
+#   off     - sınıflandırıcı kullanılmaz
+#   shadow  - sınıflandırılır ama yalnızca modelin niyetiyle uyumu ölçülür
+#   record  - emin olunan niyet modelinkinin yerine kaydedilir; kayıt model yanıtı geldikten sonra yapılır
+#   answer  - emin olunan mesajlara şablon yanıt verilir, model hiç çağrılmaz
+
+INTENT_CLASSIFIER_MODE = os.getenv("INTENT_CLASSIFIER_MODE", "shadow")
+INTENT_CLASSIFIER_THRESHOLD = float(os.getenv("INTENT_CLASSIFIER_THRESHOLD", "0.75"))
+MODES = ("off", "shadow", "record", "answer")
+UNKNOWN_INTENT = "BELIRSIZ"
+# Paydaya eklenen sabit: tek bir zayıf (ağırlık 1) eşleşme 0.67'de kalır, güçlü bir eşleşme
+# ya da aynı niyete iki zayıf eşleşme 0.8'e çıkar.
+SMOOTHING = 0.5
+
+# (kalıp, ağırlık); kalıplar normalize_text çıktısına (küçük harf, ç->c, ş->s ...) uygulanır.
+INTENT_PATTERNS = {
+    "BEDEN": [
+        (r"\bbeden", 2), (r"\bkucuk\b|\bkucuk geld", 1), (r"\bbuyuk\b|\bbuyuk geld", 1),
+        (r"\bdar\b|\bdar geld", 1), (r"\bbol\b|\bbol geld", 1), (r"\bolcu", 2), (r"\bkalib", 2), (r"\bkalip", 2),
+        (r"\bnumara", 2), (r"\buymad", 1), (r"\boturmad", 1), (r"\b(kisa|uzun) geld", 1), (r"\bsikiyor|\bsikti\b", 1),
+    ],
+    "RENK_STIL": [
+        (r"\brengi?\b|\brenk", 2), (r"\btonu\b|\btonda", 1), (r"\bsoluk", 1), (r"\b(fotograf|gorsel|resim)(teki|deki)", 1),
+        (r"\btarzim", 2), (r"\byakismad", 2), (r"\bstil", 1), (r"\bdesen", 1), (r"\bkombin", 1),
+    ],
+    "KUSURLU_URUN": [
+        (r"\byirt", 2), (r"\bsok(uk|ul)", 2), (r"\bleke", 2), (r"\bdelik", 2), (r"(?<!hayal )\bkir(ik|il)", 2), (r"\bhasar", 2),
+        (r"\bdefo", 2), (r"\bbozuk", 2), (r"\bfermuar", 1), (r"\bdugme", 1), (r"\bcizi", 2), (r"\bkusur", 2),
+        (r"\bboya(si)? (akti|cikti)", 2), (r"\bip(lik|ligi|i)? (cikti|kacti|kacmis)", 2), (r"\bcalismiyor", 2),
+    ],
+    "BEKLENTI_FARKI": [
+        (r"\bbekledigim", 2), (r"\bbeklentimi", 2), (r"\bkalitesiz", 2), (r"\bkalite", 1), (r"\bkumas", 1),
+        (r"\bince\b", 1), (r"\bucuz (dur|gorun)", 2), (r"\bhayal kirikl", 2), (r"\bbegenmedim", 1),
+        (r"\bgosterildigi gibi degil", 2), (r"\b(dusundugum|umdugum|sandigim)", 2), (r"\bbasit dur", 1),
+    ],
+}
+
+# "answer" modunda kullanılan yanıtlar; BEDEN ve RENK_STIL'de model prompt'undaki gibi Stil Analisti tanıtılır.
+REPLY_TEMPLATES = {
+    "BEDEN": "Yaşadığınız beden sorunu için çok üzgünüz. Bir sonraki alışverişinizde doğru bedeni seçebilmeniz için [STIL_ANALISTI_LINK] ile vücut tipinize en uygun kalıpları görebilirsiniz. Dilerseniz ürünü farklı bir bedenle ücretsiz değiştirebiliriz.",
+    "RENK_STIL": "Ürünün beklediğiniz gibi görünmemesine üzüldük. [STIL_ANALISTI_LINK] ile tarzınıza ve renk paletinize uygun alternatifleri keşfedebilirsiniz; dilerseniz ürünü farklı bir renkle değiştirebiliriz.",
+    "KUSURLU_URUN": "Size kusurlu bir ürün ulaştığı için çok özür dileriz. Ürününüzü ücretsiz olarak hemen yenisiyle değiştirelim ya da dilerseniz iadenizi öncelikli olarak işleme alalım.",
+    "BEKLENTI_FARKI": "Ürünün beklentinizi karşılamamasına gerçekten üzüldük. Geri bildiriminizi ürün ekibimize ilettik; dilerseniz benzer ürünler arasından size uygun alternatifler önerebiliriz.",
+}
+
+
+class IntentClassifier:
+    def __init__(self, patterns: dict = None, threshold: float = INTENT_CLASSIFIER_THRESHOLD, mode: str = INTENT_CLASSIFIER_MODE):
+        self.threshold = threshold
+        self.mode = mode if mode in MODES else "off"
+        self._patterns = [(intent, re.compile(pattern), weight)
+                          for intent, rules in (patterns or INTENT_PATTERNS).items() for pattern, weight in rules]
+        self._stats = Counter()
+        self._classify_seconds = 0.0
+
+    def classify(self, message: str) -> tuple:
+        """(niyet, güven) döndürür; hiçbir kalıp eşleşmezse (BELIRSIZ, 0.0)."""
+        started = time.perf_counter()
+        text = normalize_text(message)
+        scores = Counter()
+        for intent, pattern, weight in self._patterns:
+            if pattern.search(text): scores[intent] += weight
+        self._classify_seconds += time.perf_counter() - started
+        self._stats["classified"] += 1
+        if not scores: return UNKNOWN_INTENT, 0.0
+        intent, top = scores.most_common(1)[0]
+        return intent, top / (sum(scores.values()) + SMOOTHING)
+
+    def confident(self, message: str):
+        """Mesaj eşik üzerinde tek bir niyete işaret ediyorsa o niyeti, yoksa None döndürür."""
+        intent, confidence = self.classify(message)
+        if intent != UNKNOWN_INTENT and confidence >= self.threshold:
+            self._stats["confident"] += 1
+            self._stats[f"intent_{intent}"] += 1
+            return intent
+        return None
+
+    def template_reply(self, intent: str) -> dict:
+        self._stats["model_calls_avoided"] += 1
+        return {"detected_intent": intent, "reply_text": REPLY_TEMPLATES[intent], "is_return_prevented": True}
+
+    def observe_model_intent(self, local_intent, model_intent: str):
+        """Modelin bulduğu niyeti yerel tahminle karşılaştırır (shadow/record modlarında uyum ölçümü)."""
+        if local_intent is None: return
+        self._stats["compared"] += 1
+        if local_intent == model_intent: self._stats["agreed"] += 1
+
+    def stats(self) -> dict:
+        classified, compared = self._stats["classified"], self._stats["compared"]
+        return {
+            "mode": self.mode,
+            "threshold": self.threshold,
+            "classified": classified,
+            "confident": self._stats["confident"],
+            "model_calls_avoided": self._stats["model_calls_avoided"],
+            "by_intent": {k[len("intent_"):]: v for k, v in self._stats.items() if k.startswith("intent_")},
+            "agreement": round(self._stats["agreed"] / compared, 4) if compared else None,
+            "avg_classify_us": round(self._classify_seconds / classified * 1e6, 2) if classified else 0.0,
+        }
+
+
+intent_classifier = IntentClassifier()
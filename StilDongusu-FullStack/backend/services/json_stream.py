@@ -0,0 +1,112 @@
+import json
+
+# Model akışından gelen JSON'u parça parça okur. Kök nesnenin bir alanının değeri tamamlandığı
+# anda ("field", anahtar, değer), kök nesnedeki bir dizinin her elemanı tamamlandığında
+# ("item", anahtar, eleman) olayı üretilir. Böylece tüm yanıtı beklemeden ilk kombin ya da
+# ilk tavsiye alanı istemciye gönderilebilir. Kök '{' öncesindeki metin (```json gibi) atlanır.
+
+
+class IncrementalJSONParser:
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self._finished = False
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._expecting_key = False
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+        self._item_start = None
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    def feed(self, chunk: str) -> list:
+        self._buffer += chunk
+        events = []
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            if self._finished: break
+            self._step(buffer, i, buffer[i], events)
+        self._pos = len(buffer)
+        return events
+
+    def _in_root_array(self) -> bool:
+        return len(self._stack) == 2 and self._stack[-1] == "["
+
+    def _emit_field(self, end: int, events: list):
+        events.append(("field", self._key, json.loads(self._buffer[self._value_start:end])))
+        self._value_start = None
+
+    def _emit_item(self, end: int, events: list):
+        events.append(("item", self._key, json.loads(self._buffer[self._item_start:end])))
+        self._item_start = None
+
+    def _mark_value_start(self, i: int):
+        depth = len(self._stack)
+        if depth == 1 and not self._expecting_key and self._value_start is None:
+            self._value_start = i
+        elif self._in_root_array() and self._item_start is None:
+            self._item_start = i
+
+    def _step(self, buffer: str, i: int, c: str, events: list):
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif c == "\\":
+                self._escape = True
+            elif c == '"':
+                self._in_string = False
+                self._string_closed(i, events)
+            return
+        if not self._started:
+            if c == "{":
+                self._started = True
+                self._stack.append("{")
+                self._expecting_key = True
+            return
+        if c == '"':
+            self._in_string = True
+            self._string_start = i
+            if len(self._stack) == 1 and self._expecting_key: self._key_start = i
+            else: self._mark_value_start(i)
+        elif c in "{[":
+            self._mark_value_start(i)
+            self._stack.append(c)
+        elif c in "}]":
+            if len(self._stack) == 1 and self._value_start is not None:
+                self._emit_field(i, events)
+            elif self._in_root_array() and self._item_start is not None and c == "]":
+                self._emit_item(i, events)
+            self._stack.pop()
+            depth = len(self._stack)
+            if depth == 0:
+                self._finished = True
+            elif self._in_root_array() and self._item_start is not None:
+                self._emit_item(i + 1, events)
+            elif depth == 1 and self._value_start is not None:
+                self._emit_field(i + 1, events)
+        elif c == ",":
+            if len(self._stack) == 1:
+                if self._value_start is not None: self._emit_field(i, events)
+                self._expecting_key = True
+            elif self._in_root_array() and self._item_start is not None:
+                self._emit_item(i, events)
+        elif c == ":":
+            if len(self._stack) == 1: self._expecting_key = False
+        elif not c.isspace():
+            self._mark_value_start(i)
+
+    def _string_closed(self, i: int, events: list):
+        if self._key_start == self._string_start:
+            self._key = json.loads(self._buffer[self._key_start:i + 1])
+            self._key_start = None
+        elif self._value_start == self._string_start:
+            self._emit_field(i + 1, events)
+        elif self._item_start == self._string_start:
+            self._emit_item(i + 1, events)
@@ -0,0 +1,222 @@
+import os
+import re
+import sys
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+# Prometheus metin formatında sayaç, gösterge ve histogramlar. Ölçümler istek yolunda yalnızca bir
+# kilit ve birkaç toplama maliyetindedir; servislerin mevcut /stats sözlükleri ise ancak /metrics
+# okunurken (register_stats ile) metriklere çevrilir, scrape yapılmıyorsa hiç hesaplanmaz.
+# METRICS_ENABLED=0 ile tüm kayıtlar ve /metrics kapatılır.
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (100, 300, 1000, 3000, 10000, 30000, 100000, 300000)
+
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels: return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"): return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _labels(self, values: tuple) -> dict:
+        return dict(zip(self.labelnames, values))
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *labels, amount: float = 1.0):
+        if not METRICS_ENABLED: return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, self._labels(labels), value) for labels, value in self._values.items()]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, *labels, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels):
+        if not METRICS_ENABLED: return
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels):
+        if not METRICS_ENABLED: return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # [kova sayıları (sonuncusu +Inf), toplam, adet]
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def samples(self):
+        with self._lock:
+            snapshot = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._values.items()]
+        result = []
+        for labels, counts, total, count in snapshot:
+            base = self._labels(labels)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                result.append((f"{self.name}_bucket", {**base, "le": _format_value(bound)}, cumulative))
+            result.append((f"{self.name}_sum", base, total))
+            result.append((f"{self.name}_count", base, count))
+        return result
+
+
+def _flatten_stats(prefix: str, data: dict, label_levels: dict, labels: dict):
+    """İç içe bir /stats sözlüğünün sayısal yapraklarını (ad, etiketler, değer) olarak verir.
+    `label_levels`'taki anahtarların altındaki anahtarlar metrik adına değil etikete dönüşür."""
+    for key, value in data.items():
+        name = f"{prefix}_{key}"
+        if isinstance(value, dict):
+            label = label_levels.get(key)
+            if label is None:
+                yield from _flatten_stats(name, value, label_levels, labels)
+                continue
+            for child_key, child in value.items():
+                child_labels = {**labels, label: child_key}
+                if isinstance(child, dict): yield from _flatten_stats(name, child, label_levels, child_labels)
+                elif isinstance(child, (int, float)): yield name, child_labels, float(child)
+        elif isinstance(value, (int, float)):
+            yield name, labels, float(value)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._stats_sources = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple = ()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: tuple = ()) -> Gauge:
+        return self._add(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def register_stats(self, prefix: str, func, label_levels: dict = None):
+        """Scrape anında `func()` sözlüğünü `prefix_...` adlı göstergelere çevirir."""
+        self._stats_sources.append((prefix, func, label_levels or {}))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for prefix, func, label_levels in self._stats_sources:
+            try:
+                stats = func()
+            except Exception as e:
+                print(f"UYARI: '{prefix}' istatistikleri metriklere çevrilemedi: {e}", file=sys.stderr)
+                continue
+            grouped = {}
+            for name, labels, value in _flatten_stats(prefix, stats, label_levels, {}):
+                grouped.setdefault(_INVALID_NAME_CHARS.sub("_", name), []).append((labels, value))
+            for name, samples in grouped.items():
+                lines.append(f"# TYPE {name} gauge")
+                lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Her HTTP isteğinin süresini ve durum kodunu route şablonu (ör. /api/products/{product_id})
+    başına kaydeden ASGI middleware'i. Akış yanıtlarında süre, akışın sonuna kadar ölçülür."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start": status[0] = message["status"]
+            await send(message)
+
+        http_requests_in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_progress.dec()
+            # FastAPI eşleşen route'u scope'a yazar; eşleşmeyen yollar tek etikette toplanır.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            http_requests.inc(scope["method"], route, str(status[0]))
+            http_request_seconds.observe(time.perf_counter() - started, scope["method"], route)
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter("http_requests_total", "HTTP istekleri.", ("method", "route", "status"))
+http_request_seconds = registry.histogram("http_request_duration_seconds", "HTTP isteklerinin süresi.", ("method", "route"))
+http_requests_in_progress = registry.gauge("http_requests_in_progress", "İşlenmekte olan HTTP istekleri.")
+stage_seconds = registry.histogram("stage_duration_seconds", "İstek aşamalarının süresi.", ("pipeline", "stage"))
+model_call_seconds = registry.histogram("model_call_duration_seconds", "Havuzdaki model fonksiyonu çağrılarının süresi (kuyruk hariç).", ("endpoint", "function", "outcome"))
+model_call_queue_seconds = registry.histogram("model_call_queue_seconds", "Model çağrılarının eşzamanlılık limitinde bekleme süresi.", ("endpoint",))
+model_calls_in_flight = registry.gauge("model_calls_in_flight", "Çalışmakta olan model çağrıları.", ("endpoint",))
+model_backend_seconds = registry.histogram("model_backend_duration_seconds", "Model arka ucuna giden tekil çağrıların süresi.", ("backend", "kind"))
+model_prompt_chars = registry.histogram("model_prompt_chars", "Prompt'ların metin uzunluğu (karakter).", ("kind",), SIZE_BUCKETS)
+model_prompt_images = registry.counter("model_prompt_images_total", "Prompt'lara eklenen görseller.", ("kind",))
+model_response_chars = registry.histogram("model_response_chars", "Model yanıtlarının uzunluğu (karakter).", ("kind",), SIZE_BUCKETS)
+model_tokens = registry.counter("model_tokens_total", "Arka ucun bildirdiği token sayıları.", ("kind", "type"))
+model_json_parses = registry.counter("model_json_parse_total", "Model yanıtı ayrıştırmaları; method=invalid/unparseable hatalardır.", ("schema", "method"))
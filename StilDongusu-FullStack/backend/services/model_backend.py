@@ -0,0 +1,348 @@
+import os
+import re
+import sys
+import json
+import math
+import time
+import random
+import hashlib
+import threading
+from collections import Counter
+
+from services.metrics import model_tokens
+
+# gemini_service'teki tüm fonksiyonların arkasındaki model arka ucu. Arka uç yalnızca iki işlem
+# sunar: `generate(contents, kind)` yanıt metnini, `generate_stream(contents, kind)` ise metin
+# parçalarını döndürür; `kind` "text" ya da "vision"dır. MODEL_BACKEND ile seçilir:
+#   gemini:    gerçek Gemini API'si (GEMINI_API_KEY gerekir),
+#   record:    Gemini'ye gider ve her yanıtı MODEL_FIXTURES_DIR altına bir fixture olarak yazar,
+#   replay:    yalnızca kayıtlı fixture'lardan yanıt verir, ağa hiç çıkmaz,
+#   synthetic: prompt'a göre sabit JSON döndüren, gecikme dağılımı ve hata oranı ayarlanabilen
+#              yerel bir model; sunucunun kendi yükünü ve eşzamanlılık davranışını çevrimdışı ölçmek için.
+
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "gemini")
+MODEL_NAME = os.getenv("MODEL_NAME", "gemini-1.5-flash-latest")
+MODEL_FIXTURES_DIR = os.getenv("MODEL_FIXTURES_DIR", "fixtures/model_responses")
+MODEL_REPLAY_LATENCY = os.getenv("MODEL_REPLAY_LATENCY", "0") == "1"
+MODEL_SYNTHETIC_LATENCY = os.getenv("MODEL_SYNTHETIC_LATENCY", "fixed:0")
+MODEL_SYNTHETIC_SECONDS_PER_CHAR = float(os.getenv("MODEL_SYNTHETIC_SECONDS_PER_CHAR", "0"))
+MODEL_SYNTHETIC_FAILURE_RATE = float(os.getenv("MODEL_SYNTHETIC_FAILURE_RATE", "0"))
+MODEL_SYNTHETIC_MALFORMED_RATE = float(os.getenv("MODEL_SYNTHETIC_MALFORMED_RATE", "0"))
+MODEL_SYNTHETIC_SEED = os.getenv("MODEL_SYNTHETIC_SEED")
+
+STREAM_CHUNK_CHARS = 16
+
+
+class ModelBackendError(Exception):
+    pass
+
+
+def prompt_fingerprint(kind: str, contents) -> str:
+    digest = hashlib.sha256(kind.encode("utf-8"))
+    # PIL yalnızca görsel işleyen ilk istekte yüklenir; henüz yüklenmediyse içerikte görsel olamaz.
+    pil_image = sys.modules.get("PIL.Image")
+    for part in contents if isinstance(contents, list) else [contents]:
+        if isinstance(part, str):
+            digest.update(b"\x00s")
+            digest.update(part.encode("utf-8"))
+        elif pil_image is not None and isinstance(part, pil_image.Image):
+            digest.update(f"\x00i{part.mode}{part.size}".encode("utf-8"))
+            digest.update(part.tobytes())
+        else:
+            digest.update(b"\x00r")
+            digest.update(repr(part).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def prompt_text(contents) -> str:
+    """İçerikteki metin parçalarını birleştirir (görseller atlanır)."""
+    parts = contents if isinstance(contents, list) else [contents]
+    return "\n".join(p for p in parts if isinstance(p, str))
+
+
+def _record_usage(kind: str, response):
+    """Gemini yanıtındaki usage_metadata'dan prompt ve yanıt token sayılarını kaydeder."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None: return
+    model_tokens.inc(kind, "prompt", amount=getattr(usage, "prompt_token_count", 0) or 0)
+    model_tokens.inc(kind, "response", amount=getattr(usage, "candidates_token_count", 0) or 0)
+
+
+def _chunks(text: str, size: int = STREAM_CHUNK_CHARS):
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+
+class _BackendStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._seconds = Counter()
+
+    def record(self, kind: str, seconds: float, failed: bool = False):
+        with self._lock:
+            self._counts[f"{kind}_calls"] += 1
+            if failed: self._counts[f"{kind}_failed"] += 1
+            self._seconds[kind] += seconds
+
+    def count(self, key: str):
+        with self._lock:
+            self._counts[key] += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+            kinds = sorted({k.rsplit("_", 1)[0] for k in self._counts if k.endswith("_calls")})
+            avg = {k: round(self._seconds[k] / self._counts[f"{k}_calls"] * 1000, 2) for k in kinds}
+        return {"counts": counts, "avg_ms": avg}
+
+
+class GeminiBackend:
+    """google.generativeai (grpc ile birlikte ~0.8 sn) ilk çağrıda ya da warm_up() ile yüklenir;
+    böylece sunucu açılışı SDK'nın import süresini beklemez."""
+
+    name = "gemini"
+
+    def __init__(self, api_key: str, model_name: str = MODEL_NAME, json_mode: bool = True):
+        self.model_name = model_name
+        self._api_key = api_key
+        self._json_mode = json_mode
+        self._models = None
+        self._models_lock = threading.Lock()
+        self._stats = _BackendStats()
+
+    def _ensure_models(self) -> tuple:
+        models = self._models
+        if models is None:
+            with self._models_lock:
+                if self._models is None:
+                    import google.generativeai as genai
+                    genai.configure(api_key=self._api_key)
+                    generation_config = {"response_mime_type": "application/json"} if self._json_mode else None
+                    self._models = (genai.GenerativeModel(self.model_name, generation_config=generation_config),
+                                    genai.GenerativeModel(self.model_name, generation_config=generation_config))
+                models = self._models
+        return models
+
+    def warm_up(self):
+        self._ensure_models()
+
+    def _model(self, kind: str):
+        vision_model, text_model = self._ensure_models()
+        return vision_model if kind == "vision" else text_model
+
+    def generate(self, contents, kind: str) -> str:
+        started = time.perf_counter()
+        try:
+            response = self._model(kind).generate_content(contents)
+            text = response.text
+        except Exception:
+            self._stats.record(kind, time.perf_counter() - started, failed=True)
+            raise
+        self._stats.record(kind, time.perf_counter() - started)
+        _record_usage(kind, response)
+        return text
+
+    def generate_stream(self, contents, kind: str):
+        started, chunk = time.perf_counter(), None
+        for chunk in self._model(kind).generate_content(contents, stream=True):
+            if chunk.text: yield chunk.text
+        self._stats.record(kind, time.perf_counter() - started)
+        # Akışta kullanım bilgisi son parçada toplam olarak gelir.
+        if chunk is not None: _record_usage(kind, chunk)
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "model": self.model_name, "loaded": self._models is not None, **self._stats.as_dict()}
+
+
+class RecordReplayBackend:
+    """`inner` verilirse kayıt modunda çalışır: yanıtlar iletilir ve prompt parmak izine göre dosyaya
+    yazılır. `inner` yoksa yalnızca kayıtlı yanıtlar döndürülür; kaydı olmayan prompt hata verir."""
+
+    def __init__(self, fixtures_dir: str = MODEL_FIXTURES_DIR, inner=None, replay_latency: bool = MODEL_REPLAY_LATENCY):
+        self.fixtures_dir = fixtures_dir
+        self.inner = inner
+        self.replay_latency = replay_latency
+        self.name = "record" if inner is not None else "replay"
+        self._stats = _BackendStats()
+        os.makedirs(fixtures_dir, exist_ok=True)
+
+    def warm_up(self):
+        if self.inner is not None and hasattr(self.inner, "warm_up"): self.inner.warm_up()
+
+    def _path(self, kind: str, contents) -> str:
+        return os.path.join(self.fixtures_dir, f"{prompt_fingerprint(kind, contents)}.json")
+
+    def _save(self, path: str, kind: str, contents, text: str, elapsed: float):
+        fixture = {"kind": kind, "prompt": prompt_text(contents)[:300], "elapsed": round(elapsed, 4), "text": text}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(fixture, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def _load(self, path: str, kind: str) -> dict:
+        try:
+            with open(path, encoding="utf-8") as f:
+                fixture = json.load(f)
+        except FileNotFoundError:
+            self._stats.count("missing")
+            raise ModelBackendError(f"Bu prompt için kayıtlı yanıt yok: {os.path.basename(path)}")
+        if self.replay_latency: time.sleep(fixture.get("elapsed", 0))
+        self._stats.record(kind, fixture.get("elapsed", 0))
+        return fixture
+
+    def generate(self, contents, kind: str) -> str:
+        path = self._path(kind, contents)
+        if self.inner is None: return self._load(path, kind)["text"]
+        started = time.perf_counter()
+        text = self.inner.generate(contents, kind)
+        elapsed = time.perf_counter() - started
+        self._save(path, kind, contents, text, elapsed)
+        self._stats.record(kind, elapsed)
+        return text
+
+    def generate_stream(self, contents, kind: str):
+        path = self._path(kind, contents)
+        if self.inner is None:
+            yield from _chunks(self._load(path, kind)["text"])
+            return
+        started, parts = time.perf_counter(), []
+        for chunk in self.inner.generate_stream(contents, kind):
+            parts.append(chunk)
+            yield chunk
+        elapsed = time.perf_counter() - started
+        self._save(path, kind, contents, "".join(parts), elapsed)
+        self._stats.record(kind, elapsed)
+
+    def stats(self) -> dict:
+        fixtures = sum(1 for name in os.listdir(self.fixtures_dir) if name.endswith(".json"))
+        return {"backend": self.name, "fixtures_dir": self.fixtures_dir, "fixtures": fixtures, **self._stats.as_dict()}
+
+
+def fit_score_batch_response(prompt: str) -> str:
+    """Toplu fit puanı prompt'undaki her ürün için bir sonuç üretir."""
+    ids = re.findall(r'"product_id":(\d+)', prompt)
+    return json.dumps({"results": [{"product_id": int(pid), "fit_score": "8", "reasoning": "Kesim vücut tipinize uygun."} for pid in ids]}, ensure_ascii=False)
+
+
+# Değer bir fonksiyonsa prompt'a göre yanıt üretir; ilk eşleşen işaret kullanılır.
+SYNTHETIC_RESPONSES = {
+    "birden fazla ürünün": fit_score_batch_response,
+    "Uygunluk Puanı": '{"reasoning": "Kesim vücut tipinize uygun."}',
+    "Stil Gözü": '{"category": "giyim", "item_description": "Bej keten gömlek", "inferred_style": {"style_tags": ["klasik", "minimalist"], "color_tags": ["bej"], "justification": "Sade kesim."}, "contextual_use": {"seasons": ["yaz"], "environment": ["günlük"], "formality": "rahat (casual)"}}',
+    "stil profilini": '{"style_profile": [{"style": "klasik", "percentage": 100}], "dominant_colors": ["bej"], "summary": "Sade bir stil."}',
+    "vücut tipi ile": '{"fit_score": "8", "reasoning": "Kesim vücut tipinize uygun."}',
+    "etkinlik veya mekan": '{"combinations": [{"title": "Sade Şıklık", "vibe": "Rahat ama özenli.", "items": ["Bej Keten Gömlek", "Siyah Chino Pantolon", "Beyaz Deri Sneaker"]}, {"title": "Şehirli Rock", "vibe": "Cesur ve rahat.", "items": ["Deri Biker Ceket", "Mavi Yıpratmalı Mom Jean", "Beyaz Deri Sneaker"]}, {"title": "Bahar Daveti", "vibe": "Romantik ve hafif.", "items": ["Çiçek Desenli Maxi Elbise", "Beyaz Deri Sneaker"]}]}',
+    "strateji direktörü": '{"strategic_overview": {"trend_alarm": "-", "stock_optimization": "-", "product_development": "-"}}',
+    "ReturnLogic": '{"detected_intent": "BEDEN", "reply_text": "Üzgünüz, [STIL_ANALISTI_LINK] ile doğru bedeni bulabilirsiniz.", "is_return_prevented": true}',
+    "stil danışmanısın. Bir ana parça": '{"title": "Yaz Esintisi", "vibe_description": "Ferah.", "combination_logic": "Uyumlu tonlar.", "pro_tip": "Hasır şapka ekleyin."}',
+}
+
+
+def parse_latency(spec) -> tuple:
+    """'0.2', 'fixed:0.2', 'uniform:0.1,0.5', 'lognormal:0.4,0.6' (medyan, sigma) ya da 'exp:0.3' (ortalama)."""
+    spec = str(spec).strip()
+    name, _, raw = spec.partition(":") if ":" in spec else ("fixed", "", spec)
+    try:
+        params = tuple(float(v) for v in raw.split(",")) if raw else ()
+    except ValueError:
+        raise ValueError(f"Geçersiz gecikme dağılımı: {spec}")
+    expected = {"fixed": 1, "uniform": 2, "lognormal": 2, "exp": 1}
+    if expected.get(name) != len(params): raise ValueError(f"Geçersiz gecikme dağılımı: {spec}")
+    return name, params
+
+
+class SyntheticBackend:
+    name = "synthetic"
+
+    def __init__(self, latency="fixed:0", seconds_per_output_char: float = 0.0, failure_rate: float = 0.0,
+                 malformed_rate: float = 0.0, seed=None, responses: dict = None):
+        self.latency = parse_latency(latency)
+        self.seconds_per_output_char = seconds_per_output_char
+        self.failure_rate = failure_rate
+        self.malformed_rate = malformed_rate
+        self.responses = SYNTHETIC_RESPONSES if responses is None else responses
+        self._random = random.Random(int(seed) if seed is not None else None)
+        self._random_lock = threading.Lock()
+        self._stats = _BackendStats()
+
+    @classmethod
+    def from_env(cls) -> "SyntheticBackend":
+        return cls(MODEL_SYNTHETIC_LATENCY, MODEL_SYNTHETIC_SECONDS_PER_CHAR, MODEL_SYNTHETIC_FAILURE_RATE,
+                   MODEL_SYNTHETIC_MALFORMED_RATE, MODEL_SYNTHETIC_SEED)
+
+    def _sample(self):
+        """(ilk parçaya kadar gecikme, hata verilecek mi, yanıt bozulacak mı)"""
+        name, params = self.latency
+        with self._random_lock:
+            r = self._random
+            if name == "fixed": delay = params[0]
+            elif name == "uniform": delay = r.uniform(*params)
+            elif name == "lognormal": delay = r.lognormvariate(math.log(params[0]), params[1]) if params[0] > 0 else 0.0
+            else: delay = r.expovariate(1 / params[0]) if params[0] > 0 else 0.0
+            return delay, r.random() < self.failure_rate, r.random() < self.malformed_rate
+
+    def _respond(self, contents) -> str:
+        prompt = prompt_text(contents)
+        for marker, response in self.responses.items():
+            if marker in prompt:
+                return response(prompt) if callable(response) else response
+        return "{}"
+
+    def _plan(self, contents, kind: str):
+        delay, fail, malformed = self._sample()
+        text = self._respond(contents)
+        # Bozuk yanıt: kesilmiş çıktıyı taklit etmek için metnin yarısı döner.
+        if malformed:
+            self._stats.count("malformed")
+            text = text[:len(text) // 2]
+        return delay, fail, text
+
+    def generate(self, contents, kind: str) -> str:
+        delay, fail, text = self._plan(contents, kind)
+        if fail:
+            time.sleep(delay)
+            self._stats.record(kind, delay, failed=True)
+            raise ModelBackendError("Sentetik model hatası (MODEL_SYNTHETIC_FAILURE_RATE).")
+        seconds = delay + len(text) * self.seconds_per_output_char
+        time.sleep(seconds)
+        self._stats.record(kind, seconds)
+        return text
+
+    def generate_stream(self, contents, kind: str):
+        delay, fail, text = self._plan(contents, kind)
+        # Gecikme ilk parçadan önce, üretim süresi her parça için ayrı ayrı uygulanır.
+        time.sleep(delay)
+        if fail:
+            self._stats.record(kind, delay, failed=True)
+            raise ModelBackendError("Sentetik model hatası (MODEL_SYNTHETIC_FAILURE_RATE).")
+        for chunk in _chunks(text):
+            time.sleep(len(chunk) * self.seconds_per_output_char)
+            yield chunk
+        self._stats.record(kind, delay + len(text) * self.seconds_per_output_char)
+
+    def stats(self) -> dict:
+        name, params = self.latency
+        return {
+            "backend": self.name,
+            "latency": f"{name}:{','.join(str(p) for p in params)}",
+            "seconds_per_output_char": self.seconds_per_output_char,
+            "failure_rate": self.failure_rate,
+            "malformed_rate": self.malformed_rate,
+            **self._stats.as_dict(),
+        }
+
+
+def create_model_backend(api_key: str = None, kind: str = MODEL_BACKEND, json_mode: bool = True):
+    """MODEL_BACKEND'e göre arka ucu kurar; gerçek API gerekirken anahtar yoksa ya da kurulum başarısızsa None."""
+    try:
+        if kind == "synthetic": return SyntheticBackend.from_env()
+        if kind == "replay": return RecordReplayBackend(MODEL_FIXTURES_DIR)
+        if kind not in ("gemini", "record"):
+            print(f"UYARI: Bilinmeyen MODEL_BACKEND '{kind}', gemini kullanılıyor.", file=sys.stderr)
+        if not api_key: return None
+        backend = GeminiBackend(api_key, json_mode=json_mode)
+        return RecordReplayBackend(MODEL_FIXTURES_DIR, inner=backend) if kind == "record" else backend
+    except Exception as e:
+        print(f"HATA: Model arka ucu ({kind}) yapılandırılamadı: {e}", file=sys.stderr)
+        return None
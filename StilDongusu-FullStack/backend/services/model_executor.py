@@ -0,0 +1,234 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from services.metrics import model_call_seconds, model_call_queue_seconds, model_calls_in_flight
+from services.profiler import run_attached
+from services.single_flight import SingleFlight, call_fingerprint
+
+# Bloklayan Gemini çağrılarını event loop dışında, sınırlı bir thread havuzunda çalıştırır.
+# Her endpoint'in kendi eşzamanlılık limiti vardır; limit dolduğunda istekler kuyrukta bekler.
+
+MODEL_EXECUTOR_WORKERS = int(os.getenv("MODEL_EXECUTOR_WORKERS", "16"))
+MODEL_CALL_TIMEOUT = float(os.getenv("MODEL_CALL_TIMEOUT", "60"))
+DEFAULT_CONCURRENCY_LIMIT = int(os.getenv("MODEL_CONCURRENCY_DEFAULT", "4"))
+# Aynı fonksiyona aynı argümanlarla eşzamanlı gelen çağrılar (viral bir ürünün fit puanı, aynı anda
+# açılan paneller) havuza ve limite girmeden tek çağrıda birleştirilir. MODEL_SINGLE_FLIGHT=0 ile kapatılır.
+SINGLE_FLIGHT_ENABLED = os.getenv("MODEL_SINGLE_FLIGHT", "1") != "0"
+
+ENDPOINT_CONCURRENCY_LIMITS = {
+    "analyze_style": 4,
+    "chat": 8,
+    "create_style_profile": 2,
+    "fit_score": 8,
+    "event_stylist": 4,
+    "trend_analysis": 1,
+}
+
+
+class ModelCallTimeout(Exception):
+    pass
+
+
+class _StreamError:
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+def _parse_limits(raw: str) -> dict:
+    """'chat=8,fit_score=4' biçimindeki ortam değişkenini sözlüğe çevirir."""
+    limits = {}
+    for part in raw.split(","):
+        if "=" not in part: continue
+        name, value = part.split("=", 1)
+        try:
+            limits[name.strip()] = max(1, int(value))
+        except ValueError:
+            print(f"UYARI: Geçersiz eşzamanlılık limiti yok sayıldı: {part}", file=sys.stderr)
+    return limits
+
+
+class _EndpointStats:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.waiting = 0
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    def as_dict(self) -> dict:
+        finished = self.completed + self.failed
+        return {
+            "limit": self.limit,
+            "queue_depth": self.waiting,
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "avg_wait_ms": round(self.total_wait_seconds / finished * 1000, 2) if finished else 0.0,
+            "avg_run_ms": round(self.total_run_seconds / finished * 1000, 2) if finished else 0.0,
+        }
+
+
+class ModelCallExecutor:
+    def __init__(self, max_workers: int, timeout: float, limits: dict, default_limit: int):
+        self.timeout = timeout
+        self.default_limit = default_limit
+        self._limits = dict(limits)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="model-call")
+        self._semaphores = {}
+        self._stats = {}
+        self.single_flight = SingleFlight()
+
+    def _endpoint(self, endpoint: str):
+        if endpoint not in self._semaphores:
+            limit = self._limits.get(endpoint, self.default_limit)
+            self._semaphores[endpoint] = asyncio.Semaphore(limit)
+            self._stats[endpoint] = _EndpointStats(limit)
+        return self._semaphores[endpoint], self._stats[endpoint]
+
+    async def _acquire(self, endpoint: str):
+        semaphore, stats = self._endpoint(endpoint)
+        stats.waiting += 1
+        stats.max_queue_depth = max(stats.max_queue_depth, stats.waiting)
+        queued_at = time.perf_counter()
+        try:
+            await semaphore.acquire()
+        finally:
+            stats.waiting -= 1
+        started_at = time.perf_counter()
+        stats.total_wait_seconds += started_at - queued_at
+        stats.in_flight += 1
+        model_call_queue_seconds.observe(started_at - queued_at, endpoint)
+        model_calls_in_flight.inc(endpoint)
+
+        def _release(_):
+            # Slot, zaman aşımında bile thread gerçekten bitene kadar tutulur;
+            # böylece limit havuzdaki gerçek iş sayısını sınırlar.
+            stats.in_flight -= 1
+            model_calls_in_flight.dec(endpoint)
+            stats.total_run_seconds += time.perf_counter() - started_at
+            semaphore.release()
+
+        return stats, _release
+
+    async def run(self, endpoint: str, func, *args, timeout: float = None, key: str = None):
+        """`func(*args)` çağrısını havuzda çalıştırır ve sonucunu döndürür. `key` verilirse aynı anahtarla
+        süren bir çağrı varsa havuza girilmeden onun sonucu beklenir."""
+        timeout = self.timeout if timeout is None else timeout
+        if key is None: return await self._run(endpoint, func, *args, timeout=timeout)
+        try:
+            return await self.single_flight.do(key, lambda: self._run(endpoint, func, *args, timeout=timeout), kind=endpoint, timeout=timeout)
+        except asyncio.TimeoutError:
+            raise ModelCallTimeout(f"'{endpoint}' model çağrısı {timeout:.0f} saniyede tamamlanamadı.")
+
+    async def _run(self, endpoint: str, func, *args, timeout: float):
+        stats, release = await self._acquire(endpoint)
+        # Bağlam thread'e taşınır; böylece profillenen isteklerin model çağrıları profilde görünür.
+        future = asyncio.get_running_loop().run_in_executor(self._pool, contextvars.copy_context().run, run_attached, func, *args)
+        future.add_done_callback(release)
+        started, outcome = time.perf_counter(), "error"
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+            outcome = "ok"
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            stats.timed_out += 1
+            stats.failed += 1
+            raise ModelCallTimeout(f"'{endpoint}' model çağrısı {timeout:.0f} saniyede tamamlanamadı.")
+        except Exception:
+            stats.failed += 1
+            raise
+        finally:
+            model_call_seconds.observe(time.perf_counter() - started, endpoint, getattr(func, "__name__", "unknown"), outcome)
+        stats.completed += 1
+        return result
+
+    async def stream(self, endpoint: str, func, *args, timeout: float = None):
+        """`func(*args)` bir generator'dır; ürettiği parçaları havuzdaki thread'den geldikçe verir.
+        Zaman aşımı tüm akış için geçerlidir; tüketici erken çıkarsa thread bir sonraki parçada durur."""
+        timeout = self.timeout if timeout is None else timeout
+        stats, release = await self._acquire(endpoint)
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        cancelled = threading.Event()
+        done = object()
+
+        def _produce():
+            try:
+                for item in func(*args):
+                    if cancelled.is_set(): return
+                    loop.call_soon_threadsafe(queue.put_nowait, item)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, _StreamError(e))
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        future = loop.run_in_executor(self._pool, contextvars.copy_context().run, run_attached, _produce)
+        future.add_done_callback(release)
+        deadline = loop.time() + timeout
+        started, outcome = time.perf_counter(), "error"
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    outcome = "timeout"
+                    stats.timed_out += 1
+                    stats.failed += 1
+                    raise ModelCallTimeout(f"'{endpoint}' model çağrısı {timeout:.0f} saniyede tamamlanamadı.")
+                if item is done:
+                    outcome = "ok"
+                    break
+                if isinstance(item, _StreamError):
+                    stats.failed += 1
+                    raise item.error
+                yield item
+        finally:
+            cancelled.set()
+            model_call_seconds.observe(time.perf_counter() - started, endpoint, getattr(func, "__name__", "unknown"), outcome)
+        stats.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self._pool._max_workers,
+            "timeout_seconds": self.timeout,
+            "endpoints": {name: s.as_dict() for name, s in self._stats.items()},
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+executor = ModelCallExecutor(
+    max_workers=MODEL_EXECUTOR_WORKERS,
+    timeout=MODEL_CALL_TIMEOUT,
+    limits={**ENDPOINT_CONCURRENCY_LIMITS, **_parse_limits(os.getenv("MODEL_CONCURRENCY_LIMITS", ""))},
+    default_limit=DEFAULT_CONCURRENCY_LIMIT,
+)
+
+
+async def run_model_call(endpoint: str, func, *args, timeout: float = None):
+    key = call_fingerprint(endpoint, f"{func.__module__}.{func.__qualname__}", args) if SINGLE_FLIGHT_ENABLED else None
+    return await executor.run(endpoint, func, *args, timeout=timeout, key=key)
+
+
+def stream_model_call(endpoint: str, func, *args, timeout: float = None):
+    return executor.stream(endpoint, func, *args, timeout=timeout)
+
+
+def get_stats() -> dict:
+    return executor.stats()
+
+
+def get_single_flight_stats() -> dict:
+    return {"enabled": SINGLE_FLIGHT_ENABLED, **executor.single_flight.stats()}
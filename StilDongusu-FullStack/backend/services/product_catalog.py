@@ -0,0 +1,243 @@
+import gc
+import os
+import re
+import sys
+import json
+import pickle
+import hashlib
+import itertools
+import orjson
+import unicodedata
+from functools import lru_cache
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Türkçe karakterleri ASCII karşılıklarına indirger; "Gömlek", "gomlek" ve " GÖMLEK " aynı anahtara düşer.
+_TR_UPPER = str.maketrans({"İ": "i", "I": "i"})
+_TR_FOLD = str.maketrans({"ç": "c", "ğ": "g", "ı": "i", "ö": "o", "ş": "s", "ü": "u", "â": "a", "î": "i", "û": "u"})
+_WHITESPACE = re.compile(r"\s+")
+_WORD = re.compile(r"[a-z0-9]+")
+_anonymous_versions = itertools.count(1)
+
+# Kurulmuş indeksler products.json'un içerik özetiyle birlikte bu dosyaya yazılır; sonraki açılışlar
+# dosya değişmediyse indeksleri yeniden kurmak yerine buradan yükler (100k üründe ~4 kat hızlı).
+# Dosya yalnızca sunucunun kendisi tarafından yazılır; güvenilmeyen bir konuma işaret etmemelidir.
+# Boş bırakılırsa katalog her açılışta products.json'dan kurulur.
+CATALOG_SNAPSHOT_PATH = os.getenv("CATALOG_SNAPSHOT_PATH", "")
+# İndeks yapısı ya da normalize kuralları değiştiğinde artırılmalı; eski snapshot'lar yok sayılır.
+SNAPSHOT_FORMAT = 1
+
+
+def normalize_text(text: str) -> str:
+    if not text: return ""
+    text = str(text).translate(_TR_UPPER).lower().translate(_TR_FOLD)
+    if not text.isascii():
+        text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+# Etiketler katalog boyunca çok tekrar ettiği için normalize edilmiş halleri önbelleklenir.
+normalize_tag = lru_cache(maxsize=65536)(normalize_text)
+
+
+def tokenize(text: str) -> list:
+    """Normalize edilmiş metni kelimelere ayırır ("Kapadokya'da" -> ["kapadokya", "da"])."""
+    return _WORD.findall(normalize_text(text))
+
+
+@contextmanager
+def _gc_paused():
+    """Yüz binlerce küçük nesne üretilirken döngüsel GC taramalarını erteler."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled: gc.enable()
+
+
+CATEGORY_CLOTHING = "giyim"
+CATEGORY_FURNITURE = "mobilya"
+DEFAULT_SUBCATEGORY = "diger"
+
+# category alanı olmayan eski kayıtlar için yükleme anında bir kez uygulanan isim kuralları
+_SUBCATEGORY_KEYWORDS = (
+    ("kitaplik", CATEGORY_FURNITURE, "depolama"),
+    ("berjer", CATEGORY_FURNITURE, "oturma"),
+    ("koltuk", CATEGORY_FURNITURE, "oturma"),
+    ("elbise", CATEGORY_CLOTHING, "elbise"),
+    ("gomlek", CATEGORY_CLOTHING, "ust_giyim"),
+    ("hoodie", CATEGORY_CLOTHING, "ust_giyim"),
+    ("kazak", CATEGORY_CLOTHING, "ust_giyim"),
+    ("pantolon", CATEGORY_CLOTHING, "alt_giyim"),
+    ("jean", CATEGORY_CLOTHING, "alt_giyim"),
+    ("etek", CATEGORY_CLOTHING, "alt_giyim"),
+    ("ceket", CATEGORY_CLOTHING, "dis_giyim"),
+    ("sneaker", CATEGORY_CLOTHING, "ayakkabi"),
+    ("bot", CATEGORY_CLOTHING, "ayakkabi"),
+)
+
+
+def infer_category(product: dict):
+    """(kategori, alt kategori) döndürür; açık alanlar varsa onlar kullanılır."""
+    category = normalize_tag(product.get("category") or "")
+    subcategory = normalize_tag(product.get("subcategory") or "")
+    if category and subcategory: return category, subcategory
+    words = set(tokenize(product["name"]))
+    for keyword, inferred_category, inferred_subcategory in _SUBCATEGORY_KEYWORDS:
+        if keyword in words:
+            return category or inferred_category, subcategory or inferred_subcategory
+    return category or CATEGORY_CLOTHING, subcategory or DEFAULT_SUBCATEGORY
+
+
+class ProductCatalog:
+    """products.json'dan bir kez kurulan, indeksli ürün kataloğu."""
+
+    INDEXED_FIELDS = ("style_tags", "color_tags", "season_tags", "material", "uygun_vucut_tipleri")
+    KEYWORD_FIELDS = ("name", "style_tags", "color_tags", "material")
+    ALL_BODY_TYPES = "tumu"
+
+    def __init__(self, products: list, version: str = None):
+        self.products = products
+        # Katalogdan türetilen önbellekler (prompt projeksiyonları vb.) bu sürümle anahtarlanır.
+        self.version = version or f"mem-{next(_anonymous_versions)}"
+        self._by_id = {}
+        self._json = {}
+        self._by_name = {}
+        self._positions = {}
+        self._keywords = defaultdict(list)
+        self._by_category = defaultdict(list)
+        self._partitions = defaultdict(lambda: defaultdict(list))
+        self._index = {field: defaultdict(list) for field in self.INDEXED_FIELDS}
+        with _gc_paused():
+            for position, product in enumerate(products):
+                self._positions[product["id"]] = position
+                self._add_to_indexes(product)
+
+    @classmethod
+    def from_json(cls, path: str, snapshot_path: str = CATALOG_SNAPSHOT_PATH) -> "ProductCatalog":
+        with open(path, 'rb') as f:
+            raw = f.read()
+        version = hashlib.sha1(raw).hexdigest()[:12]
+        if snapshot_path:
+            catalog = cls.load_snapshot(snapshot_path, version)
+            if catalog is not None: return catalog
+        catalog = cls(json.loads(raw), version=version)
+        if snapshot_path: catalog.save_snapshot(snapshot_path)
+        return catalog
+
+    @classmethod
+    def load_snapshot(cls, path: str, version: str):
+        """Snapshot `version` ile kurulmuşsa kataloğu döndürür; dosya yoksa, eskiyse ya da okunamazsa None."""
+        try:
+            with open(path, "rb") as f, _gc_paused():
+                snapshot_format, snapshot_version, catalog = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"UYARI: Katalog snapshot'ı okunamadı, yeniden kurulacak: {e}", file=sys.stderr)
+            return None
+        if snapshot_format != SNAPSHOT_FORMAT or snapshot_version != version or not isinstance(catalog, cls): return None
+        return catalog
+
+    def save_snapshot(self, path: str):
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump((SNAPSHOT_FORMAT, self.version, self), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"UYARI: Katalog snapshot'ı yazılamadı: {e}", file=sys.stderr)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # İç içe defaultdict'teki lambda pickle'lanamaz; düz sözlüğe çevrilip yüklemede geri kurulur.
+        state["_partitions"] = {category: dict(parts) for category, parts in self._partitions.items()}
+        state["_json"] = {}
+        return state
+
+    def __setstate__(self, state):
+        partitions = defaultdict(lambda: defaultdict(list))
+        for category, parts in state["_partitions"].items():
+            partitions[category].update(parts)
+        state["_partitions"] = partitions
+        self.__dict__.update(state)
+
+    def _add_to_indexes(self, product: dict):
+        self._by_id[product["id"]] = product
+        product["category"], product["subcategory"] = infer_category(product)
+        self._by_category[product["category"]].append(product)
+        self._partitions[product["category"]][product["subcategory"]].append(product)
+        self._by_name.setdefault(normalize_text(product["name"]), product)
+        for field in self.INDEXED_FIELDS:
+            values = product.get(field) or []
+            if isinstance(values, str): values = [values]
+            for key in {normalize_tag(v) for v in values}:
+                if key: self._index[field][key].append(product)
+        words = set(tokenize(product["name"]))
+        for field in self.KEYWORD_FIELDS[1:]:
+            values = product.get(field) or []
+            for value in [values] if isinstance(values, str) else values:
+                words.update(_WORD.findall(normalize_tag(value)))
+        for word in words:
+            self._keywords[word].append(product)
+
+    def __len__(self):
+        return len(self.products)
+
+    def __iter__(self):
+        return iter(self.products)
+
+    def get(self, product_id: int):
+        return self._by_id.get(product_id)
+
+    def product_json(self, product_id: int):
+        """Ürünün serileştirilmiş JSON baytları; katalog değişmediği için ilk istekte bir kez üretilip saklanır."""
+        encoded = self._json.get(product_id)
+        if encoded is None:
+            product = self._by_id.get(product_id)
+            if product is None: return None
+            encoded = self._json[product_id] = orjson.dumps(product)
+        return encoded
+
+    def find_by_name(self, name: str):
+        return self._by_name.get(normalize_text(name))
+
+    def find_by_names(self, names: list) -> list:
+        """İsimleri ürünlere çevirir; katalogda olmayan isimler atlanır."""
+        return [p for p in (self.find_by_name(n) for n in names) if p is not None]
+
+    def with_value(self, field: str, value: str) -> list:
+        return self._index[field].get(normalize_tag(value), [])
+
+    def in_category(self, category: str) -> list:
+        return self._by_category.get(normalize_tag(category), [])
+
+    def in_subcategory(self, category: str, subcategory: str) -> list:
+        return self.subcategories(category).get(normalize_tag(subcategory), [])
+
+    def subcategories(self, category: str) -> dict:
+        """Kategorideki alt kategori -> ürün listesi bölümlerini döndürür."""
+        partitions = self._partitions.get(normalize_tag(category))
+        return dict(partitions) if partitions else {}
+
+    def with_keyword(self, word: str) -> list:
+        """İsim ve etiketlerdeki kelimelerden birebir eşleşen ürünler; `word` normalize edilmiş olmalı."""
+        return self._keywords.get(word, [])
+
+    def with_any(self, field: str, values) -> list:
+        """Verilen değerlerden en az birine sahip ürünleri katalog sırasıyla döndürür."""
+        found = {}
+        for value in values:
+            for product in self.with_value(field, value):
+                found[product["id"]] = product
+        return sorted(found.values(), key=lambda p: self._positions[p["id"]])
+
+    def suitable_for_body_type(self, body_type: str) -> list:
+        return self.with_any("uygun_vucut_tipleri", [body_type, self.ALL_BODY_TYPES])
+
+    def position(self, product_id: int) -> int:
+        return self._positions[product_id]
+
+    def values(self, field: str) -> list:
+        return list(self._index[field].keys())
@@ -0,0 +1,359 @@
+import os
+import sys
+import time
+import uuid
+import hmac
+import itertools
+import asyncio
+import threading
+import contextvars
+from collections import Counter, OrderedDict, deque
+
+# Canlı bir worker'ın nereye zaman harcadığını yeniden dağıtım yapmadan görmek için örnekleyici
+# profiler. Üç kullanım vardır:
+#   1. SamplingProfiler: süreçteki tüm thread'lerin yığınlarını N saniye boyunca örnekler. cpu
+#      modunda her örnek, thread'in son örnekten beri harcadığı CPU süresiyle ağırlıklandırılır
+#      (bekleyen thread'ler görünmez); wall modunda bekleme de sayılır.
+#   2. İstek profili: X-Profile başlığıyla gelen isteğin yığını (bekleyen coroutine zinciri dahil)
+#      istek boyunca örneklenir; sonuç X-Profile-Id ile geri alınır. İsteğin model çağrıları gibi
+#      thread havuzunda yürüyen işleri run_attached ile isteğe bağlanır ve ayrı bir grupta görünür.
+#   3. Yavaş istek kaydı: SLOW_REQUEST_THRESHOLD'u aşan isteklerin yığınları eşik aşıldıktan sonra
+#      örneklenir ve istek bitince kayda yazılır.
+# Örnekleme sys._current_frames() ile ayrı bir thread'den yapılır; izlenen bir şey yoksa thread
+# uyur. Görsel ön işleme süreç havuzundaki işler bu süreçte olmadığı için görünmez.
+
+PROFILER_ADMIN_TOKEN = os.getenv("PROFILER_ADMIN_TOKEN", "")
+PROFILER_INTERVAL = float(os.getenv("PROFILER_INTERVAL", "0.01"))
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "60"))
+SLOW_REQUEST_THRESHOLD = float(os.getenv("SLOW_REQUEST_THRESHOLD", "5"))
+SLOW_REQUEST_LOG_SIZE = int(os.getenv("SLOW_REQUEST_LOG_SIZE", "50"))
+REQUEST_PROFILES_KEPT = 20
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+_current_request = contextvars.ContextVar("profiled_request", default=None)
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+def is_admin(token: str) -> bool:
+    return bool(PROFILER_ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, PROFILER_ADMIN_TOKEN)
+
+
+def _frame_key(frame) -> tuple:
+    code = frame.f_code
+    return code.co_name, code.co_filename, code.co_firstlineno
+
+
+def thread_stack(frame, stop=None) -> list:
+    """Kökten yaprağa yığın; `stop` çerçevesine gelinirse (dahil) orada kesilir."""
+    stack = []
+    while frame is not None:
+        stack.append(_frame_key(frame))
+        if frame is stop: break
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _coroutine_chain(coro) -> tuple:
+    """Bir task'ın coroutine'inden başlayıp await edilen coroutine'ler boyunca çerçeveleri toplar.
+    (çerçeveler, zincirin ucunda beklenen coroutine olmayan nesne ya da None) döndürür."""
+    frames = []
+    while coro is not None:
+        if not any(hasattr(coro, attr) for attr in ("cr_frame", "gi_frame", "ag_frame")): return frames, coro
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is not None: frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return frames, None
+
+
+def task_stack(task, loop_frame) -> tuple:
+    """(yığın, durum): task event loop thread'inde çalışıyorsa gerçek yığını, bekliyorsa coroutine
+    zincirini ve en uçta beklenen nesneyi döndürür."""
+    frames, awaited = _coroutine_chain(task.get_coro())
+    if not frames: return [], "done"
+    root, leaf = frames[0], frames[-1]
+    frame = loop_frame
+    while frame is not None:
+        if frame is leaf: return thread_stack(loop_frame, stop=root), "running"
+        frame = frame.f_back
+    stack = [_frame_key(f) for f in frames]
+    if awaited is not None:
+        # Future/Task'ların __await__'i FutureIter döndürür; beklenen şey aslında bir Future'dır.
+        stack.append((f"<await {type(awaited).__name__.replace('FutureIter', 'Future')}>", "", 0))
+    return stack, "awaiting"
+
+
+def run_attached(func, *args):
+    """İzlenen bir isteğin başka bir thread'de çalışan işini (ör. model çağrısı) o isteğin profiline bağlar.
+    Bağlamın (contextvars) thread'e taşınmış olması gerekir."""
+    key = _current_request.get()
+    if key is None: return func(*args)
+    ident = threading.get_ident()
+    request_monitor.attach(key, ident)
+    try:
+        return func(*args)
+    finally:
+        request_monitor.attach(key, ident, attached=False)
+
+
+def _worker_stack(frame) -> list:
+    stack = thread_stack(frame)
+    for i, (name, path, _) in enumerate(stack):
+        if name == "run_attached" and path == __file__: return stack[i + 1:]
+    return stack
+
+
+class StackProfile:
+    """Grup (thread ya da istek) başına ağırlıklı yığın toplamları. Örnekleyici thread yazarken
+    istek bitişi ya da admin endpoint'i okuyabildiği için okumalar kilit altında alınan kopyadan yapılır."""
+
+    def __init__(self, name: str, unit: str = "milliseconds"):
+        self.name = name
+        self.unit = unit
+        self.started_at = time.time()
+        self.samples = 0
+        self._stacks = {}
+        self._lock = threading.Lock()
+
+    def add(self, group: str, stack: list, weight: float):
+        if not stack: return
+        with self._lock:
+            counts = self._stacks.setdefault(group, Counter())
+            counts[tuple(stack)] += weight
+            self.samples += 1
+
+    def _snapshot(self) -> dict:
+        with self._lock:
+            return {group: dict(counts) for group, counts in self._stacks.items()}
+
+    def top(self, limit: int = 5) -> list:
+        merged = Counter()
+        for counts in self._snapshot().values(): merged.update(counts)
+        return [(" > ".join(f[0] for f in stack[-6:]), round(weight, 2)) for stack, weight in merged.most_common(limit)]
+
+    def collapsed(self) -> str:
+        """flamegraph.pl / speedscope'un okuduğu 'kök;...;yaprak ağırlık' biçimi."""
+        lines = []
+        for group, counts in self._snapshot().items():
+            for stack, weight in counts.items():
+                frames = ";".join([group] + [f"{name} ({os.path.basename(path)}:{line})" if path else name for name, path, line in stack])
+                lines.append(f"{frames} {max(1, round(weight))}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> dict:
+        frames, index = [], {}
+        profiles = []
+        for group, counts in self._snapshot().items():
+            samples, weights = [], []
+            for stack, weight in counts.items():
+                ids = []
+                for key in stack:
+                    if key not in index:
+                        index[key] = len(frames)
+                        name, path, line = key
+                        frames.append({"name": name, "file": path, "line": line} if path else {"name": name})
+                    ids.append(index[key])
+                samples.append(ids)
+                weights.append(round(weight, 3))
+            profiles.append({"type": "sampled", "name": group, "unit": self.unit, "startValue": 0,
+                             "endValue": round(sum(weights), 3), "samples": samples, "weights": weights})
+        return {"$schema": SPEEDSCOPE_SCHEMA, "name": self.name, "exporter": "stildongusu-profiler",
+                "shared": {"frames": frames}, "profiles": profiles}
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = PROFILER_INTERVAL):
+        self.interval = interval
+        self._lock = threading.Lock()
+
+    def _thread_cpu(self, ident: int):
+        try:
+            return time.clock_gettime(time.pthread_getcpuclockid(ident))
+        except (OSError, AttributeError, OverflowError):
+            return None
+
+    def run(self, seconds: float, mode: str = "cpu") -> StackProfile:
+        """Çağıran thread'de `seconds` saniye örnekler; aynı anda yalnızca bir profil alınabilir."""
+        if not self._lock.acquire(blocking=False): raise ProfilerBusy("Başka bir profil zaten alınıyor.")
+        try:
+            return self._sample(seconds, mode)
+        finally:
+            self._lock.release()
+
+    def _sample(self, seconds: float, mode: str) -> StackProfile:
+        profile = StackProfile(f"{mode} {seconds:g}s")
+        me = threading.get_ident()
+        last_cpu = {}
+        deadline = time.perf_counter() + seconds
+        previous = time.perf_counter()
+        while True:
+            time.sleep(self.interval)
+            now = time.perf_counter()
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me or names.get(ident) == RequestMonitor.THREAD_NAME: continue
+                if mode == "cpu":
+                    cpu = self._thread_cpu(ident)
+                    if cpu is None: continue
+                    weight = cpu - last_cpu.get(ident, cpu)
+                    last_cpu[ident] = cpu
+                    if weight <= 0: continue
+                else:
+                    weight = now - previous
+                profile.add(names.get(ident, str(ident)), thread_stack(frame), weight * 1000)
+            previous = now
+            if now >= deadline: return profile
+
+
+class _TrackedRequest:
+    def __init__(self, label: str, task, loop_thread: int, profile: bool):
+        self.label = label
+        self.task = task
+        self.loop_thread = loop_thread
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.profile = StackProfile(label) if profile else None
+        self.slow_samples = None
+        self.states = Counter()
+        self.workers = set()
+
+
+class RequestMonitor:
+    """İzlenen isteklerin yığınlarını ayrı bir thread'den örnekler."""
+    THREAD_NAME = "request-profiler"
+
+    def __init__(self, interval: float = PROFILER_INTERVAL, slow_threshold: float = SLOW_REQUEST_THRESHOLD,
+                 log_size: int = SLOW_REQUEST_LOG_SIZE):
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self._requests = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self.slow_log = deque(maxlen=log_size)
+        self.profiles = OrderedDict()
+        self._slow_count = 0
+        self._keys = itertools.count()
+
+    def track(self, label: str, profile: bool = False):
+        """Çalışan task'ı izlemeye alır ve bir anahtar döndürür (izlenmiyorsa None)."""
+        if not profile and self.slow_threshold <= 0: return None
+        key = uuid.uuid4().hex[:12] if profile else next(self._keys)
+        request = _TrackedRequest(label, asyncio.current_task(), threading.get_ident(), profile)
+        with self._lock:
+            was_idle = not self._requests
+            self._requests[key] = request
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.THREAD_NAME, daemon=True)
+                self._thread.start()
+        _current_request.set(key)
+        # Thread zaten en eski isteğin eşiği aşacağı ana kadar uyuyor; yeni istek ondan önce aşamaz.
+        if was_idle or profile: self._wake.set()
+        return key
+
+    def attach(self, key, ident: int, attached: bool = True):
+        with self._lock:
+            request = self._requests.get(key)
+            if request is None: return
+            if attached: request.workers.add(ident)
+            else: request.workers.discard(ident)
+
+    def finish(self, key: str, status: int, streaming: bool = False):
+        with self._lock:
+            request = self._requests.pop(key, None)
+        if request is None: return
+        elapsed = time.perf_counter() - request.started
+        if request.profile is not None:
+            self.profiles[key] = request.profile
+            while len(self.profiles) > REQUEST_PROFILES_KEPT: self.profiles.popitem(last=False)
+        # Akış (SSE) yanıtları doğası gereği uzun sürer; yavaş istek sayılmaz.
+        if request.slow_samples is not None and not streaming:
+            self._slow_count += 1
+            top = request.slow_samples.top()
+            self.slow_log.append({
+                "request": request.label, "status": status, "duration_ms": round(elapsed * 1000, 1),
+                "started_at": round(request.started_at, 3),
+                "samples": request.slow_samples.samples, "states": dict(request.states), "top_stacks": top,
+                "collapsed": request.slow_samples.collapsed(),
+            })
+            hottest = top[0][0] if top else "-"
+            print(f"UYARI: Yavaş istek {request.label} {elapsed * 1000:.0f} ms; en sık yığın: {hottest}", file=sys.stderr)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                requests = list(self._requests.values())
+            now = time.perf_counter()
+            due = [r for r in requests if r.profile is not None or now - r.started >= self.slow_threshold > 0]
+            if not due:
+                # Örneklenecek istek yoksa ilk isteğin eşiği aşacağı ana kadar (ya da yeni istek gelene kadar) uyunur.
+                timeout = min(r.started for r in requests) + self.slow_threshold - now if requests and self.slow_threshold > 0 else None
+                self._wake.wait(timeout)
+                self._wake.clear()
+                continue
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            for request in due:
+                slow = self.slow_threshold > 0 and now - request.started >= self.slow_threshold
+                try:
+                    stack, state = task_stack(request.task, frames.get(request.loop_thread))
+                except Exception:
+                    continue
+                request.states[state] += 1
+                samples = [(request.label, stack)]
+                for ident in list(request.workers):
+                    if ident in frames: samples.append((f"{request.label} [thread]", _worker_stack(frames[ident])))
+                weight = self.interval * 1000
+                if slow and request.slow_samples is None: request.slow_samples = StackProfile(request.label)
+                for group, sample in samples:
+                    if request.profile is not None: request.profile.add(group, sample, weight)
+                    if slow: request.slow_samples.add(group, sample, weight)
+
+    def stats(self) -> dict:
+        with self._lock:
+            tracked = len(self._requests)
+        return {"slow_threshold_seconds": self.slow_threshold, "tracked_requests": tracked,
+                "slow_requests": self._slow_count, "kept_profiles": len(self.profiles)}
+
+
+class ProfilingMiddleware:
+    """`X-Profile: 1` ve geçerli `X-Admin-Token` ile gelen isteği profiller (yanıtta X-Profile-Id);
+    eşik tanımlıysa diğer tüm istekleri yavaş istek kaydı için izler."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # Yönetici endpoint'leri (ör. N saniyelik profil) doğası gereği uzun sürer; izlenmez.
+        if scope["type"] != "http" or scope["path"].startswith("/api/admin/"):
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        profile = headers.get(b"x-profile") == b"1" and is_admin(headers.get(b"x-admin-token", b"").decode("latin-1"))
+        key = request_monitor.track(f"{scope['method']} {scope['path']}", profile=profile)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        status, streaming = [500], [False]
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                response_headers = list(message.get("headers", []))
+                streaming[0] = any(k.lower() == b"content-type" and v.startswith(b"text/event-stream") for k, v in response_headers)
+                if profile:
+                    message = {**message, "headers": response_headers + [(b"x-profile-id", key.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            request_monitor.finish(key, status[0], streaming[0])
+
+
+sampling_profiler = SamplingProfiler()
+request_monitor = RequestMonitor()
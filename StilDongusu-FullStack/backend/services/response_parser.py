@@ -0,0 +1,170 @@
+import re
+import sys
+import time
+import orjson
+import threading
+from collections import Counter, deque
+from pydantic import ValidationError
+
+from services.metrics import model_json_parses
+from services.stats_utils import percentile
+
+# Model yanıtlarındaki JSON nesnesini çıkarır ve endpoint şemasına göre doğrular. Sırasıyla:
+#   1. direct:   yanıt zaten yalnızca JSON ise (JSON modu) doğrudan çözülür,
+#   2. scanned:  ```json çiti varsa onun içi, yoksa tüm metin taranır; her '{' sırayla denenir ve
+#                çözülebilen ilk dengeli {...} bloğu alınır (açıklama metnindeki parantezler atlanır),
+#   3. repaired: kesilmiş ya da sondaki virgül gibi küçük hatalar içeren çıktı onarılır.
+# Hiçbiri işe yaramazsa ya da şema tutmazsa ModelResponseError fırlatılır; yeniden deneme
+# gemini_service'tedir. Yöntem dağılımı, hata oranı ve ayrıştırma süresi şema başına tutulur.
+
+PARSE_TIMINGS_WINDOW = 1024
+
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+# Kapanmamış çit de (kesilmiş yanıt) metnin sonuna kadar alınır.
+_JSON_FENCE = re.compile(r"```json[ \t]*\n?(.*?)(?:```|$)", re.S | re.I)
+
+
+class ModelResponseError(ValueError):
+    pass
+
+
+def scan_json_object(text: str, start: int = 0):
+    """`start`tan sonraki ilk '{' ile onu kapatan '}' arasını döndürür; tırnak içindeki parantezler
+    sayılmaz. Nesne kapanmadan metin biterse None döner."""
+    start = text.find("{", start)
+    if start == -1: return None
+    depth, in_string, escape = 0, False, False
+    for i in range(start, len(text)):
+        c = text[i]
+        if in_string:
+            if escape: escape = False
+            elif c == "\\": escape = True
+            elif c == '"': in_string = False
+        elif c == '"': in_string = True
+        elif c in "{[": depth += 1
+        elif c in "}]":
+            depth -= 1
+            if depth == 0: return text[start:i + 1]
+    return None
+
+
+def repair_json(text: str) -> str:
+    """Ucuz onarım: sondaki virgülleri siler, kesilmiş çıktıda açık kalan metni ve parantezleri kapatır."""
+    start = text.find("{")
+    if start == -1: raise ModelResponseError("Yanıt metninde JSON nesnesi bulunamadı.")
+    text = text[start:]
+    stack, in_string, escape, end = [], False, False, len(text)
+    for i, c in enumerate(text):
+        if in_string:
+            if escape: escape = False
+            elif c == "\\": escape = True
+            elif c == '"': in_string = False
+        elif c == '"': in_string = True
+        elif c in "{[": stack.append("}" if c == "{" else "]")
+        elif c in "}]":
+            if stack: stack.pop()
+            if not stack:
+                end = i + 1
+                break
+    text = text[:end]
+    if stack:
+        if in_string: text += '"'
+        text = text.rstrip().rstrip(",")
+        if text.endswith(":"): text += " null"
+        elif text.endswith('"') and stack[-1] == "}" and re.search(r'[{,]\s*"(?:[^"\\]|\\.)*"$', text):
+            # Değeri gelmeden kesilmiş bir anahtar
+            text += ": null"
+        text += "".join(reversed(stack))
+    return _TRAILING_COMMA.sub(r"\1", text)
+
+
+class ModelResponseParser:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._durations = {}
+
+    def parse(self, text: str, schema=None) -> dict:
+        """`text` içindeki JSON nesnesini döndürür; `schema` verilirse pydantic ile doğrulanmış halini."""
+        name = schema.__name__ if schema else "untyped"
+        started = time.perf_counter()
+        method = None
+        try:
+            data, method = self._extract(text or "")
+            if not isinstance(data, dict):
+                method = "invalid"
+                raise ModelResponseError("Yanıt bir JSON nesnesi değil.")
+            if schema is not None:
+                try:
+                    data = schema.model_validate(data).model_dump()
+                except ValidationError as e:
+                    method = "invalid"
+                    raise ModelResponseError(f"Yanıt beklenen formata uymuyor: {e.error_count()} alan hatalı.")
+            return data
+        except ModelResponseError as e:
+            print(f"JSON Ayrıştırma Hatası ({name}): {e}\n--- Sorunlu Metin ---\n{(text or '')[:500]}...", file=sys.stderr)
+            method = method or "unparseable"
+            raise
+        finally:
+            self._record(name, method, time.perf_counter() - started)
+
+    def record_retry(self, schema=None):
+        name = schema.__name__ if schema else "untyped"
+        model_json_parses.inc(name, "retried")
+        with self._lock:
+            self._counts.setdefault(name, Counter())["retried"] += 1
+
+    def _extract(self, text: str):
+        stripped = text.strip()
+        if stripped.startswith("{"):
+            try:
+                return orjson.loads(stripped), "direct"
+            except orjson.JSONDecodeError:
+                pass
+        fence = _JSON_FENCE.search(text)
+        if fence: text = fence.group(1)
+        start, failed = text.find("{"), []
+        while start != -1:
+            candidate = scan_json_object(text, start)
+            if candidate is None:
+                # Kapanmayan nesne metnin sonuna kadar sürer; sonraki '{'ler onun içindedir.
+                failed.append(start)
+                break
+            try:
+                return orjson.loads(candidate), "scanned"
+            except orjson.JSONDecodeError:
+                failed.append(start)
+                start = text.find("{", start + 1)
+        # Çözülemeyen adaylar sırayla onarılır; açıklama metnindeki {...} onarılamayıp atlanır.
+        error = None
+        for start in failed:
+            try:
+                return orjson.loads(repair_json(text[start:])), "repaired"
+            except orjson.JSONDecodeError as e:
+                error = error or e
+        raise ModelResponseError(f"Gemini'den gelen yanıt geçerli bir JSON formatı içermiyor: {error}"
+                                 if error else "Yanıt metninde JSON nesnesi bulunamadı.")
+
+    def _record(self, name: str, method: str, seconds: float):
+        model_json_parses.inc(name, method)
+        with self._lock:
+            self._counts.setdefault(name, Counter())[method] += 1
+            self._durations.setdefault(name, deque(maxlen=PARSE_TIMINGS_WINDOW)).append(seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            by_schema = {}
+            for name, counts in sorted(self._counts.items()):
+                failed = counts["invalid"] + counts["unparseable"]
+                parsed = counts["direct"] + counts["scanned"] + counts["repaired"]
+                durations = self._durations.get(name, ())
+                by_schema[name] = {
+                    **{k: counts[k] for k in ("direct", "scanned", "repaired", "invalid", "unparseable", "retried")},
+                    "failure_rate": round(failed / (parsed + failed), 4) if parsed + failed else 0.0,
+                    "p50_us": round(percentile(durations, 0.5) * 1e6, 1),
+                    "p99_us": round(percentile(durations, 0.99) * 1e6, 1),
+                }
+            return {"by_schema": by_schema}
+
+
+response_parser = ModelResponseParser()
@@ -0,0 +1,170 @@
+import time
+import threading
+from collections import Counter, deque
+
+# İade niyetlerini geldikçe toplar: ürün başına niyet sayaçları O(1) güncellenir, sıralı panel
+# görünümü yalnızca veri değiştiğinde yeniden üretilir. Son saat/gün/hafta görünümleri için
+# dakikalık ve saatlik kovalarda sayaç tutulur; böylece hiçbir sorgu tüm iade geçmişini taramaz.
+
+WINDOWS = {"hour": 60 * 60, "day": 24 * 60 * 60, "week": 7 * 24 * 60 * 60}
+RECENT_MESSAGES_PER_PRODUCT = 20
+
+
+class _BucketRing:
+    """Sabit genişlikte zaman kovalarında ürün -> niyet sayaçları."""
+
+    def __init__(self, bucket_seconds: int, bucket_count: int):
+        self.bucket_seconds = bucket_seconds
+        self.bucket_count = bucket_count
+        self._buckets = deque()
+
+    def add(self, product_name: str, intent: str, timestamp: float):
+        start = int(timestamp // self.bucket_seconds) * self.bucket_seconds
+        if not self._buckets or self._buckets[-1][0] < start:
+            counts = {}
+            self._buckets.append((start, counts))
+        else:
+            counts = self._find_or_insert(start)
+        _increment(counts, product_name, intent)
+        self._expire(timestamp)
+
+    def _find_or_insert(self, start: int) -> dict:
+        # Sıra dışı gelen kayıtlar için kova sondan başa doğru aranır; olağan durumda ilk adımda bulunur.
+        for index in range(len(self._buckets) - 1, -1, -1):
+            bucket_start, counts = self._buckets[index]
+            if bucket_start == start: return counts
+            if bucket_start < start:
+                counts = {}
+                self._buckets.insert(index + 1, (start, counts))
+                return counts
+        counts = {}
+        self._buckets.appendleft((start, counts))
+        return counts
+
+    def _expire(self, now: float):
+        oldest = now - self.bucket_seconds * self.bucket_count
+        while self._buckets and self._buckets[0][0] + self.bucket_seconds <= oldest:
+            self._buckets.popleft()
+
+    def snapshot(self) -> list:
+        return [[start, {name: dict(intents) for name, intents in counts.items()}] for start, counts in self._buckets]
+
+    def restore(self, buckets: list):
+        self._buckets = deque((start, {name: Counter(intents) for name, intents in counts.items()}) for start, counts in buckets)
+
+    def rollup(self, window_seconds: int, now: float) -> dict:
+        self._expire(now)
+        since = now - window_seconds
+        totals = {}
+        for bucket_start, counts in self._buckets:
+            if bucket_start + self.bucket_seconds <= since: continue
+            for product_name, intents in counts.items():
+                totals.setdefault(product_name, Counter()).update(intents)
+        return totals
+
+
+def _increment(counts: dict, product_name: str, intent: str):
+    # setdefault her çağrıda boş bir Counter oluşturacağı için önce mevcut sayaca bakılır.
+    intents = counts.get(product_name)
+    if intents is None: intents = counts[product_name] = Counter()
+    intents[intent] += 1
+
+
+def _product_entry(product_name: str, counts: Counter) -> dict:
+    total = sum(counts.values())
+    return {
+        "product_name": product_name,
+        "total_returns": total,
+        "reasons": sorted([{"intent": i, "count": c, "percentage": round((c / total) * 100, 1)} for i, c in counts.items()], key=lambda x: x['percentage'], reverse=True),
+    }
+
+
+class ReturnAnalytics:
+    def __init__(self, recent_messages: int = RECENT_MESSAGES_PER_PRODUCT):
+        self.recent_messages = recent_messages
+        self.version = 0
+        self._lock = threading.Lock()
+        self._total = 0
+        self._intents = {}
+        self._messages = {}
+        self._entries = {}
+        self._dirty = set()
+        self._sorted_view = []
+        self._minutes = _BucketRing(60, 60)
+        self._hours = _BucketRing(60 * 60, 24 * 7)
+
+    def _apply(self, product_name: str, intent: str, message: str, timestamp: float):
+        self._total += 1
+        _increment(self._intents, product_name, intent)
+        messages = self._messages.get(product_name)
+        if messages is None: messages = self._messages[product_name] = deque(maxlen=self.recent_messages)
+        messages.append(message)
+        self._minutes.add(product_name, intent, timestamp)
+        self._hours.add(product_name, intent, timestamp)
+        self._dirty.add(product_name)
+
+    def record(self, product_name: str, intent: str, message: str, timestamp: float = None) -> int:
+        """İadeyi sayaçlara ekler ve kalıcı kayıtta sıra numarası olarak kullanılan sürümü döndürür."""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            self._apply(product_name, intent, message, timestamp)
+            self.version += 1
+            return self.version
+
+    def replay(self, rows):
+        """(seq, ürün, niyet, mesaj, zaman) satırlarını tek kilitte uygular; sürüm son sıra numarasına eşitlenir."""
+        with self._lock:
+            for seq, product_name, intent, message, timestamp in rows:
+                self._apply(product_name, intent, message, timestamp)
+                self.version = max(self.version, seq)
+
+    def snapshot(self) -> dict:
+        """Sayaçların JSON'a yazılabilir anlık görüntüsü; `version` görüntüye dahil son kaydın sıra numarasıdır."""
+        with self._lock:
+            return {
+                "version": self.version,
+                "total": self._total,
+                "intents": {name: dict(counts) for name, counts in self._intents.items()},
+                "messages": {name: list(messages) for name, messages in self._messages.items()},
+                "minutes": self._minutes.snapshot(),
+                "hours": self._hours.snapshot(),
+            }
+
+    def restore(self, state: dict):
+        with self._lock:
+            self.version = state["version"]
+            self._total = state["total"]
+            self._intents = {name: Counter(counts) for name, counts in state["intents"].items()}
+            self._messages = {name: deque(messages, maxlen=self.recent_messages) for name, messages in state["messages"].items()}
+            self._minutes.restore(state["minutes"])
+            self._hours.restore(state["hours"])
+            self._entries = {}
+            self._dirty = set(self._intents)
+
+    @property
+    def total_returns(self) -> int:
+        return self._total
+
+    def product_analysis(self) -> list:
+        """Toplam iadeye göre sıralı ürün analizi; yalnızca değişen ürünler yeniden hesaplanır."""
+        with self._lock:
+            if self._dirty:
+                for product_name in self._dirty:
+                    self._entries[product_name] = _product_entry(product_name, self._intents[product_name])
+                self._dirty.clear()
+                self._sorted_view = sorted(self._entries.values(), key=lambda x: x['total_returns'], reverse=True)
+            return self._sorted_view
+
+    def window_analysis(self, window: str, now: float = None) -> dict:
+        """Son saat/gün/hafta için kovalardan toplanan ürün analizi."""
+        now = time.time() if now is None else now
+        ring = self._minutes if window == "hour" else self._hours
+        with self._lock:
+            totals = ring.rollup(WINDOWS[window], now)
+        analysis = sorted((_product_entry(name, counts) for name, counts in totals.items()), key=lambda x: x['total_returns'], reverse=True)
+        return {"total_returns": sum(e["total_returns"] for e in analysis), "product_analysis": analysis}
+
+    def feedback_summary(self) -> dict:
+        """Ürün başına son müşteri mesajları (trend analizi prompt'u için)."""
+        with self._lock:
+            return {product_name: list(messages) for product_name, messages in self._messages.items()}
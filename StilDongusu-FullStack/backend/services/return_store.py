@@ -0,0 +1,177 @@
+import os
+import sys
+import json
+import time
+import queue
+import sqlite3
+import threading
+
+# İade niyetlerinin kalıcı kaydı. Kayıtlar SQLite'ta (WAL modu) yalnızca eklenen bir log tablosuna
+# yazılır; yazma işi ayrı bir thread'deki kuyruktan toplu olarak yapıldığı için chat isteği diski
+# hiç beklemez. Belirli aralıklarla sayaçların anlık görüntüsü alınır; açılışta son görüntü yüklenip
+# yalnızca ondan sonraki log kayıtları yeniden oynatılır.
+# Kalıcılık isteğe bağlıdır: RETURN_STORE_DB verilmezse kayıtlar yalnızca bellekte tutulur.
+
+RETURN_STORE_DB = os.getenv("RETURN_STORE_DB", "")
+RETURN_STORE_BATCH_SIZE = int(os.getenv("RETURN_STORE_BATCH_SIZE", "512"))
+RETURN_SNAPSHOT_EVERY = int(os.getenv("RETURN_SNAPSHOT_EVERY", "50000"))
+
+_STOP = object()
+
+
+class MemoryReturnStore:
+    """Kalıcılığı olmayan arka uç; iadeler yalnızca bellekteki sayaçlarda yaşar."""
+
+    persistent = False
+
+    def load(self, analytics): pass
+
+    def start(self): pass
+
+    def append(self, seq: int, product_name: str, intent: str, message: str, timestamp: float): pass
+
+    def close(self): pass
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "persistent": False}
+
+
+class SQLiteReturnStore:
+    persistent = True
+
+    def __init__(self, db_path: str, batch_size: int = RETURN_STORE_BATCH_SIZE, snapshot_every: int = RETURN_SNAPSHOT_EVERY):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.snapshot_every = snapshot_every
+        self.analytics = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._last_snapshot = 0
+        self._stats = {"written": 0, "batches": 0, "write_errors": 0, "snapshots": 0}
+        self._recovery = {}
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS return_intents (seq INTEGER PRIMARY KEY, product TEXT, intent TEXT, message TEXT, created_at REAL)")
+                conn.execute("CREATE TABLE IF NOT EXISTS return_snapshots (version INTEGER PRIMARY KEY, created_at REAL, state TEXT)")
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def load(self, analytics):
+        """Son anlık görüntüyü yükler ve sonrasındaki log kayıtlarını `analytics` üzerine oynatır."""
+        self.analytics = analytics
+        started = time.perf_counter()
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT version, state FROM return_snapshots ORDER BY version DESC LIMIT 1").fetchone()
+            if row is not None:
+                analytics.restore(json.loads(row[1]))
+            snapshot_version = analytics.version
+            tail = conn.execute("SELECT seq, product, intent, message, created_at FROM return_intents WHERE seq > ? ORDER BY seq", (snapshot_version,))
+            analytics.replay(tail)
+        finally:
+            conn.close()
+        self._last_snapshot = snapshot_version
+        self._recovery = {
+            "snapshot_version": snapshot_version,
+            "replayed": analytics.version - snapshot_version,
+            "ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+        # Uzun bir kuyruk oynatıldıysa bir sonraki açılış için hemen yeni görüntü alınır.
+        if self._recovery["replayed"] >= self.snapshot_every:
+            self._write_snapshot_now()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._writer, name="return-store-writer", daemon=True)
+            self._thread.start()
+
+    def append(self, seq: int, product_name: str, intent: str, message: str, timestamp: float):
+        """Kaydı yazma kuyruğuna bırakır; çağıranı diske yazma için bekletmez."""
+        self._queue.put_nowait((seq, product_name, intent, message, timestamp))
+
+    def close(self):
+        """Kuyruktaki kayıtları yazar, son anlık görüntüyü alır ve yazma thread'ini durdurur."""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def _writer(self):
+        conn = self._connect()
+        stopping = False
+        while not stopping:
+            batch = []
+            item = self._queue.get()
+            while item is not _STOP:
+                batch.append(item)
+                if len(batch) >= self.batch_size: break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            stopping = item is _STOP
+            if batch: self._write_batch(conn, batch)
+            if self.analytics is not None and (stopping or self.analytics.version - self._last_snapshot >= self.snapshot_every):
+                self._write_snapshot(conn)
+        conn.close()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: list):
+        try:
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO return_intents VALUES (?, ?, ?, ?, ?)", batch)
+            self._stats["written"] += len(batch)
+            self._stats["batches"] += 1
+        except sqlite3.Error as e:
+            print(f"İade Kaydı Yazma Hatası: {e}", file=sys.stderr)
+            self._stats["write_errors"] += 1
+
+    def _write_snapshot(self, conn: sqlite3.Connection):
+        # Görüntü, henüz yazılmamış kayıtları da içerebilir; sürümü bunları kapsadığı için
+        # açılışta yalnızca sürümden büyük sıra numaralı kayıtlar oynatılır.
+        state = self.analytics.snapshot()
+        if state["version"] <= self._last_snapshot: return
+        try:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO return_snapshots VALUES (?, ?, ?)",
+                             (state["version"], time.time(), json.dumps(state, ensure_ascii=False)))
+                conn.execute("DELETE FROM return_snapshots WHERE version < ?", (state["version"],))
+            self._last_snapshot = state["version"]
+            self._stats["snapshots"] += 1
+        except sqlite3.Error as e:
+            print(f"İade Anlık Görüntüsü Hatası: {e}", file=sys.stderr)
+
+    def _write_snapshot_now(self):
+        conn = self._connect()
+        try:
+            self._write_snapshot(conn)
+        finally:
+            conn.close()
+
+    def stats(self) -> dict:
+        batches = self._stats["batches"]
+        return {
+            "backend": "sqlite",
+            "persistent": True,
+            "db_path": self.db_path,
+            "queued": self._queue.qsize(),
+            **self._stats,
+            "avg_batch_size": round(self._stats["written"] / batches, 1) if batches else 0.0,
+            "last_snapshot_version": self._last_snapshot,
+            "recovery": self._recovery,
+        }
+
+
+def create_return_store(db_path: str = RETURN_STORE_DB):
+    if not db_path: return MemoryReturnStore()
+    try:
+        return SQLiteReturnStore(db_path)
+    except sqlite3.Error as e:
+        print(f"Uyarı: İade kaydı veritabanı açılamadı ({e}), yalnızca bellek kullanılacak.", file=sys.stderr)
+        return MemoryReturnStore()
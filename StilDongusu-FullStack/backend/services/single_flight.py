@@ -0,0 +1,87 @@
+import asyncio
+import hashlib
+from collections import Counter
+
+# Aynı anahtarla eşzamanlı gelen çağrıları tek bir çağrıda birleştirir (single-flight).
+# İlk gelen çağrıyı (lider) bir asyncio görevi olarak başlatır; o sürerken aynı anahtarla gelenler
+# event loop'ta bu görevi bekleyip sonucunu paylaşır. Birleştirme model havuzuna ve endpoint
+# eşzamanlılık limitine girmeden önce yapılır; bekleyenler ne thread ne de limit slotu tutar.
+# Sonuç saklanmaz: çağrı bittiği anda anahtar serbest kalır, sonraki istek yeni bir çağrı başlatır.
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+def _update(digest, value) -> bool:
+    if value is None or isinstance(value, (bool, int, float)):
+        digest.update(f"\x00{type(value).__name__}{value!r}".encode("utf-8"))
+    elif isinstance(value, str):
+        digest.update(b"\x00s%d:" % len(value))
+        digest.update(value.encode("utf-8"))
+    elif isinstance(value, (bytes, bytearray)):
+        digest.update(b"\x00b%d:" % len(value))
+        digest.update(value)
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"\x00l%d" % len(value))
+        return all(_update(digest, item) for item in value)
+    elif isinstance(value, dict):
+        digest.update(b"\x00d%d" % len(value))
+        return all(_update(digest, k) and _update(digest, v) for k, v in value.items())
+    elif isinstance(getattr(value, "version", None), str):
+        # Katalog gibi sürümlü nesneler içerikleri yerine sürümleriyle temsil edilir.
+        digest.update(f"\x00v{type(value).__name__}:{value.version}".encode("utf-8"))
+    else:
+        return False
+    return True
+
+
+def call_fingerprint(*parts):
+    """Çağrıyı içeriğine göre anahtarlar; parmak izi alınamayan bir argüman varsa None (birleştirilmez)."""
+    digest = hashlib.sha256()
+    return digest.hexdigest() if _update(digest, parts) else None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._stats = Counter()
+        self._max_waiters = 0
+
+    async def do(self, key: str, start, kind: str = "default", timeout: float = None):
+        """`start()` bir coroutine döndürür. Aynı anahtarla süren bir çağrı varsa en fazla `timeout`
+        saniye onun sonucu beklenir (aşılırsa asyncio.TimeoutError); yoksa çağrı başlatılır."""
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _Call(asyncio.ensure_future(start()))
+            call.task.add_done_callback(lambda task: self._finish(key, call))
+            self._stats[f"{kind}_calls"] += 1
+            # Lider iptal edilse de (istemci bağlantıyı kapatırsa) bekleyenler için çağrı sürer.
+            return await asyncio.shield(call.task)
+        call.waiters += 1
+        self._max_waiters = max(self._max_waiters, call.waiters)
+        self._stats[f"{kind}_coalesced"] += 1
+        return await asyncio.wait_for(asyncio.shield(call.task), timeout)
+
+    def _finish(self, key: str, call: _Call):
+        if self._calls.get(key) is call: del self._calls[key]
+        # Bekleyen kalmadıysa hatanın "retrieved" sayılması için okunur.
+        if not call.task.cancelled(): call.task.exception()
+
+    def stats(self) -> dict:
+        # /metrics başka bir thread'den okuyabilir; sayaçların kopyası üzerinden hesaplanır.
+        counts = dict(self._stats)
+        kinds = sorted({k.rsplit("_", 1)[0] for k in counts})
+        by_kind = {}
+        for kind in kinds:
+            calls, coalesced = counts.get(f"{kind}_calls", 0), counts.get(f"{kind}_coalesced", 0)
+            by_kind[kind] = {
+                "calls": calls,
+                "coalesced": coalesced,
+                "coalesced_ratio": round(coalesced / (calls + coalesced), 4) if calls + coalesced else 0.0,
+            }
+        return {"in_flight": len(self._calls), "max_waiters": self._max_waiters, "by_kind": by_kind}
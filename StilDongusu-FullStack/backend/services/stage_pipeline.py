@@ -0,0 +1,121 @@
+import sys
+import time
+import asyncio
+from collections import deque
+
+from services.metrics import stage_seconds
+from services.stats_utils import percentile
+
+# Bir isteğin işlem adımlarını küçük bir bağımlılık grafiği (DAG) olarak çalıştırır. Her aşama
+# bağımlılıkları biter bitmez kendi task'ında başlar; böylece birbirine bağlı olmayan aşamalar
+# (ör. stil tavsiyesi ile fit puanları) eşzamanlı yürür. Zorunlu olmayan bir aşama zaman aşımına
+# uğrar ya da hata verirse ona bağlı aşamalar atlanır ve sonuç kısmi (partial) olarak döner;
+# zorunlu bir aşamanın hatası ise çağırana iletilir ve kalan aşamalar iptal edilir.
+
+STAGE_TIMINGS_WINDOW = 1024
+
+
+class StageTimeout(Exception):
+    pass
+
+
+class Stage:
+    def __init__(self, name: str, func, deps: tuple = (), timeout: float = None, required: bool = True):
+        """`func(results)` bir coroutine fonksiyonudur; `results` bağlamı ve önceki aşamaların sonuçlarını içerir."""
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.timeout = timeout
+        self.required = required
+
+
+class PipelineResult:
+    def __init__(self, results: dict, timings: dict, failed: dict):
+        self.results = results
+        self.timings = timings
+        self.failed = failed
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.failed)
+
+    def get(self, name: str, default=None):
+        return self.results.get(name, default)
+
+    def server_timing(self) -> str:
+        """Aşama sürelerini Server-Timing başlığı biçiminde döndürür."""
+        return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.timings.items())
+
+
+class StagePipeline:
+    def __init__(self, stages: list, name: str = "pipeline"):
+        # Aşamalar bağımlılık sırasıyla verilmelidir; bu kural grafikte döngü olmasını engeller.
+        seen = set()
+        for stage in stages:
+            unknown = [d for d in stage.deps if d not in seen]
+            if unknown: raise ValueError(f"'{stage.name}' aşaması tanımsız ya da sonra gelen aşamalara bağlı: {unknown}")
+            seen.add(stage.name)
+        self.name = name
+        self.stages = stages
+        self._durations = {stage.name: deque(maxlen=STAGE_TIMINGS_WINDOW) for stage in stages}
+        self._counts = {stage.name: {"completed": 0, "timed_out": 0, "failed": 0, "skipped": 0} for stage in stages}
+        self._runs = 0
+        self._partial_runs = 0
+
+    async def run(self, **context) -> PipelineResult:
+        results, timings, failed = dict(context), {}, {}
+        tasks = {}
+
+        async def run_stage(stage: Stage):
+            if stage.deps: await asyncio.gather(*(tasks[d] for d in stage.deps))
+            counts = self._counts[stage.name]
+            if any(d in failed for d in stage.deps):
+                failed[stage.name] = "skipped"
+                counts["skipped"] += 1
+                return
+            started = time.perf_counter()
+            try:
+                results[stage.name] = await asyncio.wait_for(stage.func(results), timeout=stage.timeout)
+                counts["completed"] += 1
+            except asyncio.TimeoutError:
+                counts["timed_out"] += 1
+                if stage.required: raise StageTimeout(f"'{stage.name}' aşaması {stage.timeout:.0f} saniyede tamamlanamadı.")
+                failed[stage.name] = "timeout"
+            except Exception as e:
+                counts["failed"] += 1
+                if stage.required: raise
+                print(f"UYARI: '{stage.name}' aşaması başarısız, yanıt kısmi dönecek: {e}", file=sys.stderr)
+                failed[stage.name] = "error"
+            finally:
+                timings[stage.name] = time.perf_counter() - started
+                self._durations[stage.name].append(timings[stage.name])
+                stage_seconds.observe(timings[stage.name], self.name, stage.name)
+
+        for stage in self.stages:
+            tasks[stage.name] = asyncio.create_task(run_stage(stage))
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values(): task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+        self._runs += 1
+        if failed: self._partial_runs += 1
+        for name in context: results.pop(name)
+        return PipelineResult(results, timings, failed)
+
+    def stats(self) -> dict:
+        return {
+            "runs": self._runs,
+            "partial_runs": self._partial_runs,
+            "stages": {
+                stage.name: {
+                    "deps": list(stage.deps),
+                    "required": stage.required,
+                    "timeout": stage.timeout,
+                    **self._counts[stage.name],
+                    "p50_ms": round(percentile(self._durations[stage.name], 0.5) * 1000, 2),
+                    "p99_ms": round(percentile(self._durations[stage.name], 0.99) * 1000, 2),
+                }
+                for stage in self.stages
+            },
+        }
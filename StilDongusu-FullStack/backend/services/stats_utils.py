@@ -0,0 +1,8 @@
+# /stats endpoint'lerinin gecikme özetlerinde ortak kullanılan yardımcılar.
+
+
+def percentile(samples, q: float) -> float:
+    """Örneklerin `q` yüzdeliği (en yakın sıra yöntemi); örnek yoksa 0. Birim çevirisi çağırana aittir."""
+    if not samples: return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
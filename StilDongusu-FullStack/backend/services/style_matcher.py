@@ -0,0 +1,99 @@
+import math
+import heapq
+from collections import defaultdict
+
+from services.product_catalog import normalize_tag
+
+# Görsel analizindeki etiketleri katalogdaki posting listeleri üzerinden puanlar.
+# Adaylar yalnızca ayırt edici alanların (stil, yoksa renk) posting'lerinden toplanır; renk ve
+# mevsim gibi az sayıda değeri olan alanlar sadece bu adayların puanını artırır. Böylece sorgu
+# maliyeti katalog boyutuyla değil, eşleşen posting sayısıyla orantılı kalır.
+
+FIELD_WEIGHTS = {
+    "style_tags": 1.0,
+    "color_tags": 0.6,
+    "season_tags": 0.4,
+}
+CANDIDATE_FIELDS = ("style_tags", "color_tags")
+ALL_SEASONS = "tum mevsimler"
+DEFAULT_MATCH_LIMIT = 6
+FALLBACK_LIMIT = 3
+# Çok etiketli ürünlerin sırf etiket sayısı yüzünden öne geçmemesi için BM25'teki uzunluk normalizasyonu
+LENGTH_NORM = 0.5
+
+
+class StyleMatcher:
+    def __init__(self, catalog, field_weights: dict = None):
+        self.catalog = catalog
+        self.field_weights = field_weights or FIELD_WEIGHTS
+        self._total = len(catalog) or 1
+        self._avg_lengths = {}
+        for field in self.field_weights:
+            lengths = sum(len(p.get(field) or []) for p in catalog)
+            self._avg_lengths[field] = (lengths / self._total) or 1.0
+
+    def _idf(self, document_frequency: int) -> float:
+        return math.log(1 + (self._total - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    @staticmethod
+    def query_from_analysis(analysis_data: dict) -> dict:
+        """Görsel analizi JSON'undan alan -> etiket listesi biçiminde bir sorgu çıkarır."""
+        inferred_style = analysis_data.get("inferred_style", {}) or {}
+        contextual_use = analysis_data.get("contextual_use", {}) or {}
+        return {
+            "style_tags": inferred_style.get("style_tags", []) or [],
+            "color_tags": inferred_style.get("color_tags", []) or analysis_data.get("color_tags", []) or [],
+            "season_tags": contextual_use.get("seasons", []) or [],
+        }
+
+    def _field_score(self, product: dict, field: str, tag_weights: dict) -> float:
+        values = product.get(field) or []
+        matched = sum(tag_weights.get(normalize_tag(v), 0.0) for v in values)
+        if not matched: return 0.0
+        return matched / (1 - LENGTH_NORM + LENGTH_NORM * (len(values) or 1) / self._avg_lengths[field])
+
+    def score(self, query: dict, category: str = None) -> dict:
+        """Sorguyla eşleşen aday ürünlerin id -> puan sözlüğünü döndürür; `category` verilirse adaylar ona göre süzülür."""
+        category = normalize_tag(category) if category else None
+        tag_weights = {}
+        for field, weight in self.field_weights.items():
+            tags = {normalize_tag(t) for t in query.get(field, []) if t}
+            if field == "season_tags" and tags: tags.add(ALL_SEASONS)
+            postings = {tag: self.catalog.with_value(field, tag) for tag in tags}
+            tag_weights[field] = {tag: weight * self._idf(len(p)) for tag, p in postings.items() if p}
+
+        candidates = {}
+        for field in CANDIDATE_FIELDS:
+            for tag in tag_weights[field]:
+                for product in self.catalog.with_value(field, tag):
+                    if category is None or product["category"] == category:
+                        candidates[product["id"]] = product
+            if candidates: break
+
+        scores = defaultdict(float)
+        for product_id, product in candidates.items():
+            for field, weights in tag_weights.items():
+                if weights: scores[product_id] += self._field_score(product, field, weights)
+        return scores
+
+    def search(self, query: dict, limit: int = DEFAULT_MATCH_LIMIT, offset: int = 0, category: str = None) -> dict:
+        scores = self.score(query, category=category)
+        # Eşit puanlarda katalog sırası korunur.
+        top = heapq.nlargest(offset + limit, scores.items(), key=lambda item: (item[1], -self.catalog.position(item[0])))
+        page = top[offset:offset + limit]
+        return {
+            "total": len(scores),
+            "offset": offset,
+            "limit": limit,
+            "items": [dict(self.catalog.get(pid), match_score=round(score, 4)) for pid, score in page],
+        }
+
+    def match(self, analysis_data: dict, limit: int = DEFAULT_MATCH_LIMIT, offset: int = 0) -> list:
+        # Analiz edilen parçanın kategorisi katalogda varsa (giyim/mobilya) adaylar o bölümle sınırlanır.
+        category = analysis_data.get("category")
+        partition = self.catalog.in_category(category) if category else []
+        if not partition: category = None
+        result = self.search(self.query_from_analysis(analysis_data), limit=limit, offset=offset, category=category)
+        if result["total"] == 0 and offset == 0:
+            return (partition or self.catalog.products)[:FALLBACK_LIMIT]
+        return result["items"]
@@ -0,0 +1,142 @@
+import os
+import math
+import json
+import heapq
+import threading
+from collections import OrderedDict, defaultdict
+
+from services.product_catalog import tokenize, CATEGORY_CLOTHING
+
+# Etkinlik stilisti için aday ürün seçimi ve prompt'a giren kompakt katalog projeksiyonu.
+# Tüm kataloğu prompt'a dökmek yerine istekle ilgili en fazla EVENT_STYLIST_MAX_ITEMS ürün
+# seçilir ve yalnızca id, isim ve temel etiketleri JSON'a yazılır.
+
+EVENT_STYLIST_MAX_ITEMS = int(os.getenv("EVENT_STYLIST_MAX_ITEMS", "40"))
+PROJECTION_CACHE_SIZE = 256
+MIN_STEM_LENGTH = 4
+MIN_TOKEN_LENGTH = 3
+SYNONYM_WEIGHT = 0.8
+
+# Kullanıcıların etkinlik/mekan için kullandığı kelimeleri katalogdaki stil etiketlerine bağlar.
+EVENT_KEYWORDS = {
+    "dugun": ["davet", "şık", "özel gün"],
+    "nisan": ["davet", "şık", "özel gün"],
+    "davet": ["davet", "şık", "gece"],
+    "parti": ["gece", "şık"],
+    "gece": ["gece", "şık"],
+    "ofis": ["ofis", "smart-casual", "klasik"],
+    "toplanti": ["ofis", "klasik", "smart-casual"],
+    "mulakat": ["ofis", "klasik"],
+    "konser": ["rock", "sokak modası"],
+    "festival": ["bohem", "rahat", "sokak modası"],
+    "plaj": ["yazlık", "rahat"],
+    "sahil": ["yazlık", "rahat", "bohem"],
+    "tatil": ["yazlık", "rahat", "bohem"],
+    "piknik": ["rahat", "günlük", "bohem"],
+    "brunch": ["günlük", "smart-casual"],
+    "kahvalti": ["günlük", "rahat"],
+    "yemek": ["şık", "smart-casual"],
+    "randevu": ["romantik", "şık"],
+    "spor": ["spor", "rahat"],
+    "gezi": ["rahat", "günlük", "şehirli"],
+    "sehir": ["şehirli", "günlük"],
+}
+
+
+def is_clothing(product: dict) -> bool:
+    return product["category"] == CATEGORY_CLOTHING
+
+
+def _expand_token(catalog, token: str):
+    """Türkçe ekleri atmak için en uzun eşleşen öneki arar ("düğünde" -> "dugun")."""
+    for end in range(len(token), MIN_STEM_LENGTH - 1, -1):
+        stem = token[:end]
+        postings = catalog.with_keyword(stem)
+        synonyms = EVENT_KEYWORDS.get(stem)
+        if postings or synonyms: return postings, synonyms or []
+    return catalog.with_keyword(token), []
+
+
+def retrieve_candidates(catalog, user_request: str, limit: int = EVENT_STYLIST_MAX_ITEMS) -> list:
+    total = len(catalog) or 1
+    idf = lambda df: math.log(1 + total / (df + 1))
+    scores = defaultdict(float)
+    by_id = {}
+
+    for token in set(tokenize(user_request)):
+        if len(token) < MIN_TOKEN_LENGTH: continue
+        postings, synonyms = _expand_token(catalog, token)
+        weight = idf(len(postings))
+        for product in postings:
+            scores[product["id"]] += weight
+            by_id[product["id"]] = product
+        for tag in synonyms:
+            tag_postings = catalog.with_value("style_tags", tag)
+            weight = SYNONYM_WEIGHT * idf(len(tag_postings))
+            for product in tag_postings:
+                scores[product["id"]] += weight
+                by_id[product["id"]] = product
+
+    ranked = heapq.nlargest(limit, (pid for pid in scores if is_clothing(by_id[pid])),
+                            key=lambda pid: (scores[pid], -catalog.position(pid)))
+    candidates = [by_id[pid] for pid in ranked]
+    # İstekle eşleşen ürün azsa, modelin üst/alt/ayakkabı içeren kombin kurabilmesi için
+    # giyim alt kategorilerinden sırayla birer ürün alınarak tamamlanır.
+    if len(candidates) < limit:
+        chosen = set(ranked)
+        partitions = [iter(items) for items in catalog.subcategories(CATEGORY_CLOTHING).values()]
+        while partitions and len(candidates) < limit:
+            for partition in list(partitions):
+                product = next(partition, None)
+                if product is None:
+                    partitions.remove(partition)
+                elif product["id"] not in chosen and len(candidates) < limit:
+                    candidates.append(product)
+    return candidates
+
+
+class CatalogProjection:
+    """Ürünlerin prompt için kompakt JSON parçalarını katalog sürümü başına önbellekler."""
+
+    def __init__(self, max_cached: int = PROJECTION_CACHE_SIZE):
+        self.max_cached = max_cached
+        self._version = None
+        self._fragments = {}
+        self._serialized = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def project(product: dict) -> dict:
+        return {
+            "id": product["id"],
+            "name": product["name"],
+            "tags": (product.get("style_tags") or [])[:4],
+            "colors": (product.get("color_tags") or [])[:2],
+        }
+
+    def serialize(self, catalog, products: list) -> str:
+        key = tuple(p["id"] for p in products)
+        with self._lock:
+            if self._version != catalog.version:
+                self._version = catalog.version
+                self._fragments.clear()
+                self._serialized.clear()
+            cached = self._serialized.get(key)
+            if cached is not None:
+                self._serialized.move_to_end(key)
+                return cached
+            parts = []
+            for product in products:
+                fragment = self._fragments.get(product["id"])
+                if fragment is None:
+                    fragment = json.dumps(self.project(product), ensure_ascii=False, separators=(",", ":"))
+                    self._fragments[product["id"]] = fragment
+                parts.append(fragment)
+            serialized = "[" + ",".join(parts) + "]"
+            self._serialized[key] = serialized
+            if len(self._serialized) > self.max_cached:
+                self._serialized.popitem(last=False)
+            return serialized
+
+
+catalog_projection = CatalogProjection()
@@ -0,0 +1,110 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+
+# Satıcı panelindeki stratejik trend analizini istek anında değil arka planda üretir.
+# Analiz belirli aralıklarla ya da son hesaplamadan bu yana yeterince yeni iade geldiğinde
+# yenilenir; panel her zaman önbellekteki sonucu (sürüm ve ETag ile) anında alır.
+# "stale-while-revalidate" modunda bayat bir sonuç okunduğunda arka planda yenileme tetiklenir.
+
+TREND_REFRESH_INTERVAL = float(os.getenv("TREND_REFRESH_INTERVAL", str(15 * 60)))
+TREND_CHANGE_THRESHOLD = int(os.getenv("TREND_CHANGE_THRESHOLD", "10"))
+TREND_ANALYSIS_MODE = os.getenv("TREND_ANALYSIS_MODE", "stale-while-revalidate")
+TREND_CHECK_INTERVAL = 5.0
+TREND_RETRY_DELAY = 60.0
+
+PENDING_OVERVIEW = {
+    "trend_alarm": "Stratejik analiz hazırlanıyor...",
+    "stock_optimization": "Stratejik analiz hazırlanıyor...",
+    "product_development": "Stratejik analiz hazırlanıyor...",
+}
+
+
+class TrendAnalysisScheduler:
+    def __init__(self, analytics, compute, interval: float = TREND_REFRESH_INTERVAL,
+                 change_threshold: int = TREND_CHANGE_THRESHOLD, mode: str = TREND_ANALYSIS_MODE):
+        """`compute` bir coroutine fonksiyonudur ve strategic_overview sözlüğünü döndürür."""
+        self.analytics = analytics
+        self.compute = compute
+        self.interval = interval
+        self.change_threshold = change_threshold
+        self.mode = mode
+        self._overview = None
+        self._etag = None
+        self._computed_at = None
+        self._source_version = None
+        self._last_error = None
+        self._next_attempt = 0.0
+        self._refresh_task = None
+        self._loop_task = None
+
+    def is_stale(self) -> bool:
+        if self._overview is None: return True
+        if time.time() - self._computed_at >= self.interval: return True
+        return self.analytics.version - self._source_version >= self.change_threshold
+
+    def _should_refresh(self) -> bool:
+        return self.is_stale() and time.time() >= self._next_attempt
+
+    def refresh(self) -> asyncio.Task:
+        """Yenilemeyi başlatır; zaten süren bir yenileme varsa onu döndürür."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+        return self._refresh_task
+
+    async def _refresh(self):
+        source_version = self.analytics.version
+        try:
+            overview = await self.compute()
+        except Exception as e:
+            print(f"Stratejik Trend Analizi Hatası: {e}", file=sys.stderr)
+            self._last_error = str(e)
+            # Model hata verirken her kontrolde yeniden denenmesin
+            self._next_attempt = time.time() + min(self.interval, TREND_RETRY_DELAY)
+            return
+        self._overview = overview
+        self._etag = hashlib.sha1(json.dumps(overview, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+        self._computed_at = time.time()
+        self._source_version = source_version
+        self._last_error = None
+
+    def get(self) -> dict:
+        """Önbellekteki analizi bekletmeden döndürür."""
+        stale = self.is_stale()
+        if self.mode == "stale-while-revalidate" and self._should_refresh():
+            self.refresh()
+        refreshing = self._refresh_task is not None and not self._refresh_task.done()
+        return {
+            "strategic_overview": self._overview or PENDING_OVERVIEW,
+            "meta": {
+                "status": "ready" if self._overview is not None else "pending",
+                "etag": self._etag,
+                "version": self._source_version,
+                "computed_at": self._computed_at,
+                "stale": stale,
+                "refreshing": refreshing,
+                "last_error": self._last_error,
+            },
+        }
+
+    async def _run(self):
+        while True:
+            if self._should_refresh(): await self.refresh()
+            await asyncio.sleep(TREND_CHECK_INTERVAL)
+
+    def start(self):
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        for task in (self._loop_task, self._refresh_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._loop_task = None
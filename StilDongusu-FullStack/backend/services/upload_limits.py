@@ -0,0 +1,135 @@
+import os
+import asyncio
+import hashlib
+import tempfile
+from fastapi import UploadFile, HTTPException
+from starlette.responses import JSONResponse
+
+# Görsel yüklemelerini parça parça okur: istek ve dosya başına bayt sınırı uygular, türü
+# content_type yerine dosya imzasından tespit eder ve büyük dosyaları belleğe almak yerine
+# diske yazar. Böylece istek başına bellek kullanımı yükleme boyutundan bağımsız kalır.
+# Disk işlemleri, Starlette'in UploadFile'ında olduğu gibi event loop dışında yapılır.
+
+UPLOAD_MAX_FILE_BYTES = int(os.getenv("UPLOAD_MAX_FILE_BYTES", str(15 * 1024 * 1024)))
+UPLOAD_MAX_REQUEST_BYTES = int(os.getenv("UPLOAD_MAX_REQUEST_BYTES", str(40 * 1024 * 1024)))
+UPLOAD_SPOOL_THRESHOLD = int(os.getenv("UPLOAD_SPOOL_THRESHOLD", str(1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+UPLOAD_PATHS = ("/api/analyze-style", "/api/create-style-profile")
+# BMP'de "BM" imzası tek başına zayıf; 14. bayttaki DIB başlık boyutu da Pillow'un tanıdıklarından olmalı.
+BMP_DIB_HEADER_SIZES = (12, 40, 52, 56, 64, 108, 124)
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class InvalidImage(Exception):
+    pass
+
+
+def sniff_image_type(header: bytes):
+    """Dosyanın ilk baytlarından görsel MIME türünü döndürür; görsel değilse None.
+    HEIC/HEIF/AVIF kabul edilmez: Pillow bunları eklentisiz çözemez ve hata ancak model çağrısında çıkar."""
+    if header.startswith(b"\xff\xd8\xff"): return "image/jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"): return "image/png"
+    if header[:6] in (b"GIF87a", b"GIF89a"): return "image/gif"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP": return "image/webp"
+    if header.startswith(b"BM") and len(header) >= 18 and int.from_bytes(header[14:18], "little") in BMP_DIB_HEADER_SIZES:
+        return "image/bmp"
+    return None
+
+
+def _discard_spool(spool):
+    spool.close()
+    os.unlink(spool.name)
+
+
+class UploadedImage:
+    """Doğrulanmış bir yükleme. `source` küçük dosyalarda bayt, büyüklerde geçici dosya yoludur."""
+
+    def __init__(self, source, size: int, sha256: str, mime: str):
+        self.source = source
+        self.size = size
+        self.sha256 = sha256
+        self.mime = mime
+
+    @property
+    def on_disk(self) -> bool:
+        return isinstance(self.source, str)
+
+    def close(self):
+        if self.on_disk:
+            try:
+                os.unlink(self.source)
+            except FileNotFoundError:
+                pass
+
+
+async def read_image_upload(file: UploadFile, max_bytes: int = UPLOAD_MAX_FILE_BYTES) -> UploadedImage:
+    digest = hashlib.sha256()
+    buffer = bytearray()
+    spool = None
+    size = 0
+    mime = None
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk: break
+            if mime is None:
+                mime = sniff_image_type(chunk[:32])
+                if mime is None: raise InvalidImage("Dosya geçerli bir resim değil.")
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(f"Dosya boyutu {max_bytes // (1024 * 1024)} MB sınırını aşıyor.")
+            digest.update(chunk)
+            if spool is None and len(buffer) + len(chunk) > UPLOAD_SPOOL_THRESHOLD:
+                spool = await asyncio.to_thread(tempfile.NamedTemporaryFile, prefix="upload-", delete=False)
+                await asyncio.to_thread(spool.write, buffer)
+                buffer = bytearray()
+            if spool is not None:
+                await asyncio.to_thread(spool.write, chunk)
+            else:
+                buffer.extend(chunk)
+    except BaseException:
+        if spool is not None: await asyncio.to_thread(_discard_spool, spool)
+        raise
+    finally:
+        await file.close()
+
+    if mime is None: raise InvalidImage("Dosya boş.")
+    if spool is not None:
+        await asyncio.to_thread(spool.close)
+        return UploadedImage(spool.name, size, digest.hexdigest(), mime)
+    return UploadedImage(bytes(buffer), size, digest.hexdigest(), mime)
+
+
+class UploadSizeLimitMiddleware:
+    """Yükleme endpoint'lerinde gövdeyi okunurken sayar; sınır aşılınca ayrıştırma kesilir ve 413 döner."""
+
+    def __init__(self, app, max_bytes: int = UPLOAD_MAX_REQUEST_BYTES, paths=UPLOAD_PATHS):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            return await self.app(scope, receive, send)
+
+        detail = f"İstek boyutu {self.max_bytes // (1024 * 1024)} MB sınırını aşıyor."
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            return await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                # FastAPI, gövde ayrıştırılırken fırlatılan HTTPException'ı olduğu gibi yanıta çevirir.
+                if received > self.max_bytes: raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
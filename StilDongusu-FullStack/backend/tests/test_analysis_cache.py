@@ -0,0 +1,39 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.analysis_cache import AnalysisCache
+
+TOP_BIT_HASH = 0xFFFFFFFFFFFFFFFF
+
+
+class AnalysisCacheDiskTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "cache.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _cache(self, phash_distance: int = 0) -> AnalysisCache:
+        return AnalysisCache(max_entries=16, max_bytes=1 << 20, ttl_seconds=60, db_path=self.db_path, phash_distance=phash_distance)
+
+    def test_hash_with_top_bit_set_round_trips_through_disk(self):
+        self._cache().store("k", TOP_BIT_HASH, {"category": "giyim"}, 0.1)
+        entry = self._cache()._get_disk("k", 0)
+        self.assertEqual(entry.phash, TOP_BIT_HASH)
+        self.assertEqual(entry.payload, '{"category": "giyim"}')
+
+    def test_near_duplicate_matches_after_reload(self):
+        self._cache(phash_distance=2).store("k", TOP_BIT_HASH, {"category": "giyim"}, 0.1)
+        cache = self._cache(phash_distance=2)
+        self.assertEqual(cache.lookup("k"), {"category": "giyim"})
+        with cache._lock:
+            self.assertIsNotNone(cache._find_near_duplicate(TOP_BIT_HASH ^ 1, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.update(RETURN_STORE_DB="", ANALYSIS_CACHE_DB="", CATALOG_SNAPSHOT_PATH="", MODEL_WARMUP="0")
+
+from main import etag_matches
+
+
+class EtagMatchesTest(unittest.TestCase):
+    def test_exact_tag(self):
+        self.assertTrue(etag_matches('"abc"', "abc"))
+        self.assertFalse(etag_matches('"abd"', "abc"))
+        self.assertFalse(etag_matches(None, "abc"))
+        self.assertFalse(etag_matches("", "abc"))
+
+    def test_weak_tag(self):
+        self.assertTrue(etag_matches('W/"abc"', "abc"))
+
+    def test_list_of_tags(self):
+        self.assertTrue(etag_matches('"x", W/"abc" ,"y"', "abc"))
+        self.assertFalse(etag_matches('"x", "y"', "abc"))
+
+    def test_wildcard(self):
+        self.assertTrue(etag_matches("*", "abc"))
+
+
+if __name__ == "__main__":
+    unittest.main()
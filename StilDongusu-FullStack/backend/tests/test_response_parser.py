@@ -0,0 +1,49 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.response_parser import ModelResponseError, ModelResponseParser
+
+
+class ModelResponseParserTest(unittest.TestCase):
+    def setUp(self):
+        self.parser = ModelResponseParser()
+
+    def test_direct_json(self):
+        self.assertEqual(self.parser._extract('{"a": 1}'), ({"a": 1}, "direct"))
+
+    def test_fenced_json(self):
+        text = 'İşte sonuç:\n```json\n{"a": {"b": [1, 2]}}\n```\nBaşka bir şey?'
+        self.assertEqual(self.parser._extract(text), ({"a": {"b": [1, 2]}}, "scanned"))
+
+    def test_fence_is_preferred_over_braces_in_prose(self):
+        text = 'Here {not json} then ```json\n{"a": 1}\n```'
+        self.assertEqual(self.parser._extract(text), ({"a": 1}, "scanned"))
+
+    def test_leading_prose_with_braces(self):
+        text = 'Şablon {isim} ve {renk} olarak düşünüldü: {"a": "{değil}"} bitti.'
+        self.assertEqual(self.parser._extract(text), ({"a": "{değil}"}, "scanned"))
+
+    def test_truncated_output_is_repaired(self):
+        text = 'Sonuç {kısaca}: {"combinations": [{"vibe": "rahat"}, {"vibe": "şı'
+        data, method = self.parser._extract(text)
+        self.assertEqual(method, "repaired")
+        self.assertEqual(data, {"combinations": [{"vibe": "rahat"}, {"vibe": "şı"}]})
+
+    def test_truncated_fence_is_repaired(self):
+        data, method = self.parser._extract('```json\n{"a": [1, 2')
+        self.assertEqual((data, method), ({"a": [1, 2]}, "repaired"))
+
+    def test_trailing_comma_is_repaired(self):
+        text = 'Not: {x} sonra {"a": [1, 2,], "b": 3,}'
+        self.assertEqual(self.parser._extract(text), ({"a": [1, 2], "b": 3}, "repaired"))
+
+    def test_text_without_json_raises(self):
+        with self.assertRaises(ModelResponseError):
+            self.parser.parse("JSON yok, sadece {metin} var.")
+
+
+if __name__ == "__main__":
+    unittest.main()
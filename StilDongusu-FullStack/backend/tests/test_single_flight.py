@@ -0,0 +1,94 @@
+import os
+import sys
+import asyncio
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.single_flight import SingleFlight, call_fingerprint
+
+
+class SingleFlightTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    def _start(self, result=None, error=None):
+        async def call():
+            self.calls += 1
+            await self.release.wait()
+            if error: raise error
+            return result
+        return call
+
+    async def test_concurrent_calls_are_coalesced(self):
+        start = self._start({"a": 1})
+        tasks = [asyncio.create_task(self.flight.do("k", start, kind="chat")) for _ in range(5)]
+        await asyncio.sleep(0)
+        self.release.set()
+        results = await asyncio.gather(*tasks)
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(r is results[0] for r in results))
+        stats = self.flight.stats()
+        self.assertEqual(stats["in_flight"], 0)
+        self.assertEqual(stats["by_kind"]["chat"], {"calls": 1, "coalesced": 4, "coalesced_ratio": 0.8})
+
+    async def test_key_is_released_after_the_call(self):
+        self.release.set()
+        await self.flight.do("k", self._start(1))
+        await self.flight.do("k", self._start(2))
+        self.assertEqual(self.calls, 2)
+
+    async def test_cancelled_leader_does_not_cancel_waiters(self):
+        leader = asyncio.create_task(self.flight.do("k", self._start("sonuç")))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(self.flight.do("k", self._start("başka")))
+        await asyncio.sleep(0)
+        leader.cancel()
+        self.release.set()
+        self.assertEqual(await waiter, "sonuç")
+        self.assertTrue(leader.cancelled())
+        self.assertEqual(self.calls, 1)
+
+    async def test_cancelled_waiter_does_not_cancel_the_call(self):
+        leader = asyncio.create_task(self.flight.do("k", self._start("sonuç")))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(self.flight.do("k", self._start("başka")))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        self.release.set()
+        self.assertEqual(await leader, "sonuç")
+        self.assertTrue(waiter.cancelled())
+
+    async def test_waiter_timeout(self):
+        leader = asyncio.create_task(self.flight.do("k", self._start("sonuç")))
+        await asyncio.sleep(0)
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.flight.do("k", self._start("başka"), timeout=0.01)
+        self.release.set()
+        self.assertEqual(await leader, "sonuç")
+
+    async def test_error_is_propagated_to_all_callers(self):
+        start = self._start(error=RuntimeError("model hatası"))
+        tasks = [asyncio.create_task(self.flight.do("k", start)) for _ in range(3)]
+        await asyncio.sleep(0)
+        self.release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual(self.flight.stats()["in_flight"], 0)
+
+
+class CallFingerprintTest(unittest.TestCase):
+    def test_equal_arguments_share_a_key(self):
+        self.assertEqual(call_fingerprint("chat", "f", ("mesaj", {"a": [1, 2]})), call_fingerprint("chat", "f", ("mesaj", {"a": [1, 2]})))
+        self.assertNotEqual(call_fingerprint("chat", "f", ("1",)), call_fingerprint("chat", "f", (1,)))
+
+    def test_unsupported_argument_is_not_coalesced(self):
+        self.assertIsNone(call_fingerprint("chat", "f", (object(),)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import sys
+import json
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.update(RETURN_STORE_DB="", ANALYSIS_CACHE_DB="", CATALOG_SNAPSHOT_PATH="", MODEL_WARMUP="0")
+
+from fastapi.testclient import TestClient
+
+import main
+from services import gemini_service
+from services.model_backend import SYNTHETIC_RESPONSES, SyntheticBackend
+
+IMAGE_PATH = os.path.join(os.path.dirname(main.__file__), "..", "frontend", "public", "img", "gomlek1.webp")
+
+# Kod çiti ve açıklama metniyle; ikinci kombinde vibe yok (varsayılanı alır).
+COMBINATIONS_TEXT = 'Öneriler:\n```json\n{"combinations": [{"title": "Sade", "vibe": "Rahat.", "items": ["Bej Keten Gömlek", "Siyah Chino Pantolon"]}, {"title": "Vibesiz", "items": ["Beyaz Deri Sneaker"]}]}\n```'
+ADVICE_TEXT = '```json\n{"title": "Yaz", "vibe_description": "Ferah.", "combination_logic": "Uyumlu.", "pro_tip": "Şapka.", "ekstra": 1}\n```'
+
+
+def sse_events(text: str) -> list:
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class StreamingEndpointsTest(unittest.TestCase):
+    # Lifespan model havuzunu kapattığı için uygulama sınıf başına bir kez açılır.
+    @classmethod
+    def setUpClass(cls):
+        cls.previous_backend = gemini_service.backend
+        gemini_service.set_backend(SyntheticBackend())
+        cls.client = TestClient(main.app)
+        cls.client.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+        gemini_service.set_backend(cls.previous_backend)
+
+    def _client(self, **responses) -> TestClient:
+        gemini_service.set_backend(SyntheticBackend(responses={**SYNTHETIC_RESPONSES, **responses}))
+        return self.client
+
+    def test_event_stylist_stream_matches_non_stream(self):
+        client = self._client(**{"etkinlik veya mekan": COMBINATIONS_TEXT})
+        expected = client.post("/api/event-stylist", json={"user_request": "piknik"}).json()["combinations"]
+        events = sse_events(client.post("/api/event-stylist/stream", json={"user_request": "piknik"}).text)
+        self.assertEqual([data for kind, data in events if kind == "combination"], expected)
+        self.assertEqual(events[-1][0], "done")
+        self.assertEqual(expected[1]["vibe"], "")
+
+    def test_event_stylist_stream_drops_invalid_combinations(self):
+        text = '{"combinations": [{"vibe": "Başlıksız", "items": ["Bej Keten Gömlek"]}, "metin", {"title": "Sade", "items": ["Bej Keten Gömlek"]}]}'
+        client = self._client(**{"etkinlik veya mekan": text})
+        events = sse_events(client.post("/api/event-stylist/stream", json={"user_request": "piknik"}).text)
+        self.assertEqual([data["title"] for kind, data in events if kind == "combination"], ["Sade"])
+        self.assertEqual(events[-1], ("done", {"count": 1, "timings": events[-1][1]["timings"]}))
+
+    def test_analyze_style_stream_advice_matches_non_stream(self):
+        client = self._client(**{"stil danışmanısın. Bir ana parça": ADVICE_TEXT})
+        with open(IMAGE_PATH, "rb") as f:
+            image = f.read()
+        upload = lambda: {"file": ("gomlek.webp", image, "image/webp")}
+        expected = client.post("/api/analyze-style", files=upload()).json()["style_advice"]
+        events = dict(sse_events(client.post("/api/analyze-style/stream", files=upload()).text))
+        self.assertEqual(events["advice"], expected)
+
+    def test_analyze_style_stream_rejects_invalid_advice(self):
+        client = self._client(**{"stil danışmanısın. Bir ana parça": '{"title": "Yalnızca başlık"}'})
+        with open(IMAGE_PATH, "rb") as f:
+            events = sse_events(client.post("/api/analyze-style/stream", files={"file": ("gomlek.webp", f.read(), "image/webp")}).text)
+        self.assertNotIn("advice", [kind for kind, _ in events])
+        self.assertEqual(events[-1][0], "error")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+from fastapi import UploadFile
+
+from services import upload_limits
+from services.upload_limits import UploadTooLarge, read_image_upload, sniff_image_type
+
+
+def bmp_bytes() -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (4, 4), "white").save(out, format="BMP")
+    return out.getvalue()
+
+
+class SniffImageTypeTest(unittest.TestCase):
+    def test_bmp_requires_a_known_dib_header(self):
+        self.assertEqual(sniff_image_type(bmp_bytes()[:32]), "image/bmp")
+        self.assertIsNone(sniff_image_type(b"BM bu bir metin dosyasi, resim degil"))
+        self.assertIsNone(sniff_image_type(b"BM"))
+
+
+class ReadImageUploadTest(unittest.IsolatedAsyncioTestCase):
+    async def test_spool_is_removed_when_the_upload_is_rejected(self):
+        data = bmp_bytes() + b"\x00" * (4 * upload_limits.UPLOAD_CHUNK_SIZE)
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(tempfile, "tempdir", tmp), \
+                mock.patch.object(upload_limits, "UPLOAD_SPOOL_THRESHOLD", upload_limits.UPLOAD_CHUNK_SIZE):
+            with self.assertRaises(UploadTooLarge):
+                await read_image_upload(UploadFile(io.BytesIO(data)), max_bytes=3 * upload_limits.UPLOAD_CHUNK_SIZE)
+            self.assertEqual(os.listdir(tmp), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -123,7 +123,7 @@ const HomePage = () => {
         ))}
     </div>
 )}
-        {results && (<><div className="results-card mb-5"><h2 className="text-center mb-3 display-6">✨ {results.style_advice.title} ✨</h2><p className="lead text-center text-muted">"{results.style_advice.vibe_description}"</p><hr className="my-4" /><h5>Kombinasyon Mantığı</h5><p>{results.style_advice.combination_logic}</p><h5>💡 Profesyonel İpucu</h5><p className="fst-italic">{results.style_advice.pro_tip}</p></div><h3 className="text-center mb-4 display-5">Bu Stile Uyumlu Ürünler</h3><div className="row">{results.matched_products.map((product) => (<div key={product.id} className="col-md-4 mb-4 fade-in"><div className="product-card h-100"><img src={product.image.replace('static/img/', '/img/')} className="card-img-top" alt={product.name} /><div className="card-body d-flex flex-column p-4"><h5 className="card-title">{product.name}</h5><p className="card-text text-muted flex-grow-1">{product.style_tags.join(', ')}</p><div className="d-flex justify-content-between align-items-center mt-3"><span className="fw-bold fs-5" style={{color: 'var(--primary-color)'}}>{product.price}</span><Link to={`/product/${product.id}`} className="btn btn-sm btn-outline-light">İncele</Link></div></div></div></div>))}</div></>)}
+        {results && (<>{results.style_advice && (<div className="results-card mb-5"><h2 className="text-center mb-3 display-6">✨ {results.style_advice.title} ✨</h2><p className="lead text-center text-muted">"{results.style_advice.vibe_description}"</p><hr className="my-4" /><h5>Kombinasyon Mantığı</h5><p>{results.style_advice.combination_logic}</p><h5>💡 Profesyonel İpucu</h5><p className="fst-italic">{results.style_advice.pro_tip}</p></div>)}<h3 className="text-center mb-4 display-5">Bu Stile Uyumlu Ürünler</h3><div className="row">{results.matched_products.map((product) => (<div key={product.id} className="col-md-4 mb-4 fade-in"><div className="product-card h-100"><img src={product.image.replace('static/img/', '/img/')} className="card-img-top" alt={product.name} /><div className="card-body d-flex flex-column p-4"><h5 className="card-title">{product.name}</h5><p className="card-text text-muted flex-grow-1">{product.style_tags.join(', ')}</p><div className="d-flex justify-content-between align-items-center mt-3"><span className="fw-bold fs-5" style={{color: 'var(--primary-color)'}}>{product.price}</span><Link to={`/product/${product.id}`} className="btn btn-sm btn-outline-light">İncele</Link></div></div></div></div>))}</div></>)}
       </div>
     </div>
   );